@@ -14,11 +14,14 @@ migrate = Migrate()
 csrf = CSRFProtect() #her form gönderildiğinde token kontrolü yapar
 
 
-def create_app(config_name='default'):
+def create_app(config_name='default', test_config=None):
     
     app = Flask(__name__)
     
     app.config.from_object('app.config.Config')
+    # Testler kendi veritabanı ve klasörlerini verir (tests/conftest.py)
+    if test_config:
+        app.config.update(test_config)
     
 
     db.init_app(app)
@@ -37,7 +40,8 @@ def create_app(config_name='default'):
     
     @login_manager.user_loader
     def load_user(user_id):
-        return Account.query.get(int(user_id))
+        from app.utils.user_cache import load_account
+        return load_account(int(user_id))
     
     # Blueprints'leri kaydet ve bağlantıla
     from app.auth import auth_bp
@@ -50,6 +54,38 @@ def create_app(config_name='default'):
     app.register_blueprint(club_bp, url_prefix='/club')
     app.register_blueprint(main_bp)  
     
+    # Mesaj olaylarını SSE akışlarına dağıtan pub/sub
+    from app.utils.pubsub import init_broker
+    init_broker(app)
+    
+    # /search için bellekte kulüp adı önek indeksi (arka planda oluşturulur)
+    from app.utils.autocomplete import club_autocomplete
+    club_autocomplete.init_app(app)
+    
+    # Herkese açık sayfalar için tam sayfa önbelleği
+    from app.utils.page_cache import init_page_cache
+    init_page_cache(app)
+    
+    # Hava durumu önbelleği ve bağlantı havuzu
+    from app.utils.weather import weather_service
+    weather_service.init_app(app)
+    
+    # Yüklenen dosyalar için içerik adresli depolama
+    from app.utils.storage import init_storage
+    init_storage(app)
+    
+    # Yüklenen resimlerin varyantlarını üreten worker havuzu
+    from app.utils.images import image_pipeline
+    image_pipeline.init_app(app)
+    
+    # Büyük dışa aktarmaları hazırlayan process havuzu
+    from app.utils.export_jobs import export_runner
+    export_runner.init_app(app)
+    
+    # Admin paneli sayaçları (kısa süreli, arka planda yenilenen kopya)
+    from app.utils.admin_stats import admin_stats
+    admin_stats.init_app(app)
+    
     #veritabanından gelen ham tarih verisi filtrelenir
     #jinja2 html de {{datetime}} ile okunması sağlanır
     @app.template_filter('datetime')
@@ -59,6 +95,12 @@ def create_app(config_name='default'):
             return ""
         return value.strftime(format)
     
+    # Kenar çubuğu rozetleri: şablonda çağrıldığında istek başına tek PK okuması
+    @app.context_processor
+    def inject_notification_counts():
+        from app.utils.notifications import get_notification_counts
+        return {'notification_counts': get_notification_counts}
+    
     @app.errorhandler(404)
     def not_found_error(error):
         from flask import render_template
@@ -3,16 +3,26 @@ Admin Routes
 Üniversite yönetimi route'ları
 """
 import os
-from flask import render_template, redirect, url_for, flash, request, current_app, Response
+from flask import (render_template, redirect, url_for, flash, request, current_app, Response, jsonify,
+                   stream_with_context, send_file, abort)
 from flask_login import login_required, current_user
 from app.admin import admin_bp
 from app.admin.forms import PostForm, EditPostForm, ClubEditForm, FeedbackForm
-from app.models import Account, Club, Post, Feedback
+from app.models import Account, Club, Post, PostImage, Feedback, AccountCounter, ExportJob
 from app import db
-from openpyxl import Workbook
-from io import BytesIO
 
-from app.club.routes import save_image, delete_image, handle_post_images
+from app.club.routes import handle_post_images
+from app.utils.storage import save_upload, delete_upload, remove_uploads
+from app.utils.queries import (with_post_authors, with_post_images, with_club_accounts,
+                               with_account_clubs, with_feedback_relations)
+from app.utils.user_cache import invalidate_account
+from app.utils.exports import EXPORT_FORMATS, filter_clubs, club_export_count, club_export_rows
+from app.utils.export_jobs import export_runner, export_path
+from app.utils.autocomplete import club_autocomplete
+from app.utils.directory import invalidate_directory
+from app.utils.page_cache import page_cache, invalidate_club_pages
+from app.utils.admin_stats import admin_stats, invalidate_admin_stats
+from app.utils.images import image_pipeline, process_post_images, process_club_logo
 
 
 def admin_required(f):
@@ -30,38 +40,83 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def _bulk_ids():
+    """Formdaki 'ids' alanları veya JSON gövdesindeki {"ids": [...]}, tekilleştirilmiş ve sınırlı"""
+    if request.is_json:
+        raw = (request.get_json(silent=True) or {}).get('ids') or []
+    else:
+        raw = request.form.getlist('ids')
+
+    ids = []
+    for value in raw:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            continue
+        if value not in ids:
+            ids.append(value)
+    return ids[:current_app.config.get('BULK_ACTION_LIMIT', 200)]
+
+
+def _remove_later(keys):
+    """
+    Toplu silmelerde referansları delete_upload ile aynı transaction'da bırakılan dosyaları
+    commit'ten sonra arka planda siler (kuyruk doluysa hemen). İş kaybolursa sadece sahipsiz
+    dosya kalır, referans sayıları doğru kalır
+    """
+    if keys and not image_pipeline.submit(remove_uploads, keys):
+        remove_uploads(keys)
+
+
+def _bulk_response(ids, done, status, message, endpoint):
+    """JSON isteğe id bazında sonuç ({id: durum}), form isteğine özet mesaj döndürür"""
+    done = set(done)
+    results = {item_id: status if item_id in done else 'not_found' for item_id in ids}
+
+    if request.is_json:
+        return jsonify({'results': {str(k): v for k, v in results.items()}})
+
+    if not ids:
+        flash('Hiçbir kayıt seçilmedi.', 'warning')
+    if done:
+        flash(message.format(count=len(done)), 'success')
+    if len(done) < len(ids):
+        flash(f'{len(ids) - len(done)} kayıt bulunamadı, işlem yapılmadı.', 'warning')
+    return redirect(url_for(endpoint))
+
+
 @admin_bp.route('/dashboard')
 @login_required
 @admin_required
 def dashboard():
+    """Admin paneli: sayaçlar önbellekteki tek sorgudan, son kayıtlar yazar/kulüp bilgisiyle tek sorguda"""
+    stats = admin_stats.get()
     
+    recent_posts = with_post_authors(Post.query).order_by(Post.created_at.desc()).limit(5).all()
     
-    total_clubs = Club.query.count()
-    pending_clubs = Account.query.filter_by(account_type='club', is_approved=False).count()
-    approved_clubs = Account.query.filter_by(account_type='club', is_approved=True).count()
-    
-    posts_query = Post.query
-    
-    total_posts = posts_query.count()
     
-    
-    recent_posts = posts_query.order_by(Post.created_at.desc()).limit(5).all()
-    
-    
-    recent_applications = Account.query.filter_by(
+    recent_applications = with_account_clubs(Account.query).filter_by(
         account_type='club', 
         is_approved=False
     ).order_by(Account.created_at.desc()).limit(5).all()
     
     return render_template('admin/dashboard.html',
-                         total_clubs=total_clubs,
-                         pending_clubs=pending_clubs,
-                         approved_clubs=approved_clubs,
-                         total_posts=total_posts,
+                         total_clubs=stats['total_clubs'],
+                         pending_clubs=stats['pending_clubs'],
+                         approved_clubs=stats['approved_clubs'],
+                         total_posts=stats['total_posts'],
                          recent_posts=recent_posts,
                          recent_applications=recent_applications)
 
 
+@admin_bp.route('/cache-stats')
+@login_required
+@admin_required
+def cache_stats():
+    """Tam sayfa önbelleğinin bu worker'daki isabet/ıskalama sayıları (JSON)"""
+    return jsonify(page_cache.stats())
+
+
 @admin_bp.route('/clubs/pending')
 @login_required
 @admin_required
@@ -71,7 +126,7 @@ def pending_clubs():
     page = request.args.get('page', 1, type=int)
     per_page = current_app.config.get('CLUBS_PER_PAGE', 12)
     
-    pagination = Account.query.filter_by(
+    pagination = with_account_clubs(Account.query).filter_by(
         account_type='club',
         is_approved=False
     ).order_by(Account.created_at.desc()).paginate(
@@ -99,19 +154,15 @@ def all_clubs():
     status = request.args.get('status', 'all')
     search = request.args.get('search', '')
     
-    query = Club.query.join(Account)
-    
-    #HTML den gelen verileri tabloda Arama
-    if search:
-        query = query.filter(Club.name.ilike(f'%{search}%'))  #Büyük/küçük harf duyarlılığını kaldırır
+    query = with_club_accounts(Club.query.join(Account))
+    order = [Club.created_at.desc()]
     
-    # Durum filtresi
-    if status == 'approved':
-        query = query.filter(Account.is_approved == True)
-    elif status == 'pending':
-        query = query.filter(Account.is_approved == False)
+    #HTML den gelen verileri tabloda Arama (Türkçe karakter ve büyük/küçük harf duyarsız) ve durum filtresi
+    query, rank = filter_clubs(query, status, search)
+    if rank is not None:
+        order.insert(0, rank.desc())
     
-    pagination = query.order_by(Club.created_at.desc()).paginate(
+    pagination = query.order_by(*order).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
@@ -127,41 +178,88 @@ def all_clubs():
 @login_required
 @admin_required
 def download_clubs(file_type):
-    """Filtrelenmiş kulüp listesini PDF veya Excel olarak indirir."""
+    """Filtrelenmiş kulüp listesini Excel, CSV veya PDF olarak, üretildikçe istemciye akıtarak indirir."""
     status = request.args.get('status', 'all')
     search = request.args.get('search', '')
-    
-    query = Club.query.join(Account)
-    
-    if search:
-        query = query.filter(Club.name.ilike(f'%{search}%'))
-    
-    if status == 'approved':
-        query = query.filter(Account.is_approved == True)
-    elif status == 'pending':
-        query = query.filter(Account.is_approved == False)
-        
-    clubs = query.order_by(Club.name).all()
 
-    if file_type == 'excel':
-        wb = Workbook()  #Bellekte boş bir Excel çalışma kitabı oluşturur.
-        ws = wb.active   #Excel'deki ilk sayfayı (Sheet) seçer.
-        ws.title = "Kulüpler"
-        ws.append(['ID', 'Kulüp Adı', 'Slug', 'E-posta', 'Onay Durumu', 'Üye Sayısı', 'Konum', 'Telefon', 'Oluşturulma Tarihi'])
+    export = EXPORT_FORMATS.get(file_type)
+    if export is None:
+        flash('Geçersiz dosya türü.', 'danger')
+        return redirect(url_for('admin.all_clubs'))
 
-        for club in clubs:
-            status_text = 'Onaylı' if club.account.is_approved else 'Bekliyor'
-            ws.append([club.id, club.name, club.slug, club.account.email, status_text, club.member_count or 0, club.location, club.phone, club.created_at.strftime('%Y-%m-%d %H:%M')])
-        
-        buffer = BytesIO()  #hard diskine kaydetmek yerine geçici olarak RAM üzerinde tutar.
-        wb.save(buffer)
-        buffer.seek(0)  #Dosyanın yazılması bittiğinde okuma imlecini dosyanın en başına getirir
-
-        return Response(buffer, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', headers={'Content-Disposition': 'attachment;filename=kulupler.xlsx'})
-        #Bu sefer bir HTML sayfası değil, bir dosya döndür -response
-        #Mimetype: İnternet üzerindeki dosya türlerini tanımla
-    flash('Geçersiz dosya türü.', 'danger')
-    return redirect(url_for('admin.all_clubs'))
+    # Büyük PDF'in çizimi uzun sürer, büyük Excel dosyası ise tamamı yazılmadan gönderilemez;
+    # ikisi de isteği uzun süre tutmasın diye arka plan işine yönlendirilir (CSV sınırsız)
+    limit = current_app.config.get(f'{file_type.upper()}_INLINE_MAX_ROWS')
+    if limit is not None and club_export_count(status, search) > limit:
+        flash('Liste doğrudan indirmek için çok büyük, lütfen "Arka planda hazırla" ile oluşturun.', 'warning')
+        return redirect(url_for('admin.all_clubs', status=status, search=search))
+
+    stream, mimetype, filename = export
+    rows = club_export_rows(status, search)
+    # stream_with_context: generator yanıt gönderilirken de veritabanı oturumu açık kalır
+    return Response(stream_with_context(stream(rows)), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment;filename={filename}'})
+
+
+@admin_bp.route('/clubs/export/<file_type>', methods=['POST'])
+@login_required
+@admin_required
+def export_clubs(file_type):
+    """Filtrelenmiş kulüp listesini arka planda hazırlatır (büyük listeler için)."""
+    if file_type not in EXPORT_FORMATS:
+        flash('Geçersiz dosya türü.', 'danger')
+        return redirect(url_for('admin.all_clubs'))
+
+    params = {
+        'status': request.form.get('status', 'all'),
+        'search': request.form.get('search', '')
+    }
+    job, created = ExportJob.submit('clubs', file_type, params, current_user.id)
+    db.session.commit()
+    # Takılı kalan aynı iş yenisini engellemesin diye temizlik de havuzda çalışır
+    export_runner.submit_cleanup()
+
+    if created:
+        export_runner.submit(job.id)
+        flash('Dosya hazırlanıyor, hazır olduğunda bu sayfadan indirebilirsiniz.', 'info')
+    else:
+        flash('Aynı dosya zaten hazırlanıyor.', 'info')
+    return redirect(url_for('admin.exports'))
+
+
+@admin_bp.route('/exports')
+@login_required
+@admin_required
+def exports():
+    """Arka planda hazırlanan dışa aktarmalar"""
+    jobs = ExportJob.query.order_by(ExportJob.created_at.desc()).limit(20).all()
+    return render_template('admin/exports.html', jobs=jobs, formats=EXPORT_FORMATS)
+
+
+@admin_bp.route('/exports/<job_id>/status')
+@login_required
+@admin_required
+def export_status(job_id):
+    """İşin ilerlemesi (JSON)"""
+    job = ExportJob.query.get_or_404(job_id)
+    return jsonify(job.to_dict())
+
+
+@admin_bp.route('/exports/<job_id>/download')
+@login_required
+@admin_required
+def download_export(job_id):
+    """Hazırlanan dosyayı indirir"""
+    job = ExportJob.query.get_or_404(job_id)
+    if not job.is_downloadable():
+        flash('Dosya hazır değil veya süresi dolmuş.', 'warning')
+        return redirect(url_for('admin.exports'))
+
+    path = export_path(job)
+    if not os.path.exists(path):
+        abort(404)
+    _, mimetype, filename = EXPORT_FORMATS[job.file_type]
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=filename)
 
 
 @admin_bp.route('/club/<int:id>/approve', methods=['POST'])
@@ -176,7 +274,13 @@ def approve_club(id):
         return redirect(url_for('admin.pending_clubs'))
     
     account.is_approved = True
+    Post.set_account_visibility(account.id, True)
     db.session.commit()
+    invalidate_account(account.id)
+    club_autocomplete.upsert(account.club)
+    invalidate_directory()
+    invalidate_club_pages(account.club.id)
+    invalidate_admin_stats()
     
     flash(f'{account.club.name} kulübü onaylandı!', 'success')
     return redirect(url_for('admin.pending_clubs'))
@@ -194,7 +298,13 @@ def reject_club(id):
         return redirect(url_for('admin.pending_clubs'))
     
     account.is_approved = False
+    Post.set_account_visibility(account.id, False)
     db.session.commit()
+    invalidate_account(account.id)
+    club_autocomplete.upsert(account.club)
+    invalidate_directory()
+    invalidate_club_pages(account.club.id)
+    invalidate_admin_stats()
     
     flash(f'{account.club.name} kulübünün onayı kaldırıldı.', 'warning')
     return redirect(url_for('admin.all_clubs'))
@@ -213,23 +323,66 @@ def delete_club(id):
     
     club_name = account.club.name if account.club else account.username
     
-    # Kulüp logosunu sil
-    if account.club and account.club.logo:
-        delete_image(account.club.logo)
-    
-    
-    # Paylaşım resimlerini sil
-    for post in account.posts.all():
-        for img_path in post.get_images():
-            delete_image(img_path)
-    
-    db.session.delete(account)
+    # Toplu silmeyle aynı yol: alıcıların okunmamış mesaj sayaçları düşülür, mesajlar,
+    # paylaşımlar ve geri bildirimler silinir. Dosya referansları aynı transaction'da
+    # bırakılır, dosyalar commit'ten sonra silinir
+    ids, club_ids, keys = Account.delete_clubs([account.id])
+    removable = delete_upload(*keys)
     db.session.commit()
+    remove_uploads(removable)
+    for account_id in ids:
+        invalidate_account(account_id)
+    for club_id in club_ids:
+        club_autocomplete.remove(club_id)
+    invalidate_directory()
+    invalidate_club_pages(*club_ids)
+    invalidate_admin_stats()
     
     flash(f'{club_name} kulübü silindi.', 'success')
     return redirect(url_for('admin.all_clubs'))
 
 
+@admin_bp.route('/clubs/bulk/<any(approve, reject, delete):action>', methods=['POST'])
+@login_required
+@admin_required
+def bulk_clubs(action):
+    """Seçilen kulüpleri tek transaction'da toplu onayla / onayı kaldır / sil"""
+    ids = _bulk_ids()
+    keys = []
+    if not ids:
+        done, club_ids = [], []
+    elif action == 'delete':
+        done, club_ids, keys = Account.delete_clubs(ids)
+        keys = delete_upload(*keys)
+    else:
+        done = Account.set_clubs_approval(ids, action == 'approve')
+    db.session.commit()
+
+    for account_id in done:
+        invalidate_account(account_id)
+    if action == 'delete':
+        for club_id in club_ids:
+            club_autocomplete.remove(club_id)
+        _remove_later(keys)
+    elif done:
+        clubs = with_club_accounts(Club.query.join(Account)).filter(Club.account_id.in_(done)).all()
+        for club in clubs:
+            club_autocomplete.upsert(club)
+        club_ids = [club.id for club in clubs]
+
+    if done:
+        invalidate_directory()
+        invalidate_club_pages(*club_ids)
+        invalidate_admin_stats()
+
+    status, message, endpoint = {
+        'approve': ('approved', '{count} kulüp onaylandı!', 'admin.pending_clubs'),
+        'reject': ('rejected', '{count} kulübün onayı kaldırıldı.', 'admin.all_clubs'),
+        'delete': ('deleted', '{count} kulüp silindi.', 'admin.all_clubs'),
+    }[action]
+    return _bulk_response(ids, done, status, message, endpoint)
+
+
 @admin_bp.route('/club/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
 @admin_required
@@ -265,20 +418,27 @@ def edit_club(id):
         club.website = form.website.data
         
         # Logo güncelle
+        removable = []
         if form.logo.data:
-            # Eski logoyu sil
-            if club.logo:
-                delete_image(club.logo)
-            
-            # Yeni logoyu kaydet
-            logo_path = save_image(form.logo.data, 'club_logos')
+            # Yeni logo önce kaydedilir: aynı dosya tekrar yüklenirse referansı silinmez
+            logo_path = save_upload(form.logo.data, 'club_logos')
             if logo_path:
+                # Eski logonun referansı bırakılır, dosya commit'ten sonra silinir
+                removable = delete_upload(club.logo)
                 club.logo = logo_path
+                club.logo_variants = None
         
-        # Slug güncelle
-        club.generate_slug()
+        # Slug güncelle (isim değişmediyse dokunulmaz)
+        club.assign_slug()
         
         db.session.commit()
+        remove_uploads(removable)
+        if club.logo and not club.logo_variants:
+            image_pipeline.submit(process_club_logo, club.id)
+        invalidate_account(account.id)
+        club_autocomplete.upsert(club)
+        invalidate_directory()
+        invalidate_club_pages(club.id)
         flash('Kulüp bilgileri güncellendi!', 'success')
         return redirect(url_for('admin.all_clubs'))
     
@@ -308,7 +468,7 @@ def all_posts():
     page = request.args.get('page', 1, type=int)
     per_page = current_app.config.get('POSTS_PER_PAGE', 10)
     
-    pagination = Post.query.order_by(Post.created_at.desc()).paginate(
+    pagination = with_post_images(with_post_authors(Post.query)).order_by(Post.created_at.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
@@ -332,18 +492,23 @@ def create_post():
         if form.images.data:
             image_paths = handle_post_images(form.images.data)
         
-        image_str = ','.join(image_paths) if image_paths else None
-        
         # Paylaşımı oluştur
         post = Post(
             account_id=current_user.id,
             title=form.title.data,
             content=form.content.data,
-            image=image_str
+            is_public=True
         )
+        post.add_images(image_paths)
         
         db.session.add(post)
+        Club.adjust_post_count(current_user.id, 1)  # Admin hesabının kulübü yoksa etkisiz
         db.session.commit()
+        if image_paths:
+            image_pipeline.submit(process_post_images, post.id)
+        invalidate_directory()
+        invalidate_club_pages(current_user.club.id if current_user.club else None)
+        invalidate_admin_stats()
         
         flash('Paylaşım başarıyla oluşturuldu!', 'success')
         return redirect(url_for('admin.all_posts'))
@@ -363,18 +528,17 @@ def edit_post(id):
         post.title = form.title.data
         post.content = form.content.data
         
-        # Yeni resimler yüklendiyse
-        existing_images = post.get_images() if post.image else []
+        # Yeni resimler yüklendiyse mevcutların sonuna ekle
+        image_paths = []
         if form.images.data:
             image_paths = handle_post_images(form.images.data)
             #her bir resmi sunucuya kaydeder,isimlerini benzersiz yapar dosya yolunu döndürür
-        
-        # Yeni resimler varsa ekle
-        if image_paths:
-            all_images = existing_images + image_paths
-            post.image = ','.join(all_images)
+        post.add_images(image_paths)
         
         db.session.commit()
+        if image_paths:
+            image_pipeline.submit(process_post_images, post.id)
+        invalidate_club_pages(post.author.club.id if post.author.club else None)
         flash('Paylaşım güncellendi!', 'success')
         return redirect(url_for('admin.all_posts'))
     
@@ -388,18 +552,78 @@ def delete_post(id):
     """Paylaşımı sil"""
     post = Post.query.get_or_404(id)
     
-    # Tüm resimleri sil
-    if post.image:
-        for img_path in post.get_images():
-            delete_image(img_path)
+    # Resimlerin referansları bırakılır, dosyalar commit'ten sonra silinir
+    removable = delete_upload(*post.get_images())
     
+    club_id = post.author.club.id if post.author.club else None
     db.session.delete(post)
+    Club.adjust_post_count(post.account_id, -1)
     db.session.commit()
+    remove_uploads(removable)
+    invalidate_directory()
+    invalidate_club_pages(club_id)
+    invalidate_admin_stats()
     
     flash('Paylaşım silindi.', 'success')
     return redirect(url_for('admin.all_posts'))
 
 
+@admin_bp.route('/posts/bulk-delete', methods=['POST'])
+@login_required
+@admin_required
+def bulk_delete_posts():
+    """Seçilen paylaşımları tek DELETE ile sil"""
+    ids = _bulk_ids()
+    deleted, keys = Post.delete_many(ids) if ids else ({}, [])
+    removable = delete_upload(*keys)
+    db.session.commit()
+
+    _remove_later(removable)
+    if deleted:
+        club_ids = db.session.scalars(
+            db.select(Club.id).where(Club.account_id.in_(set(deleted.values())))
+        ).all()
+        invalidate_directory()
+        invalidate_club_pages(*club_ids)
+        invalidate_admin_stats()
+
+    return _bulk_response(ids, deleted, 'deleted', '{count} paylaşım silindi.', 'admin.all_posts')
+
+
+@admin_bp.route('/post/<int:id>/image/<int:image_id>/delete', methods=['POST'])
+@login_required
+@admin_required
+def delete_post_image(id, image_id):
+    """Paylaşımdan tek bir resmi sil"""
+    post = Post.query.get_or_404(id)
+    
+    image_path = PostImage.remove(post.id, image_id)
+    if image_path:
+        removable = delete_upload(image_path)
+        post.touch()
+        db.session.commit()
+        remove_uploads(removable)
+        invalidate_club_pages(post.author.club.id if post.author.club else None)
+        flash('Görsel silindi.', 'success')
+    
+    return redirect(url_for('admin.edit_post', id=post.id))
+
+
+@admin_bp.route('/post/<int:id>/image/<int:image_id>/move/<any(up, down):direction>', methods=['POST'])
+@login_required
+@admin_required
+def move_post_image(id, image_id, direction):
+    """Resmi bir öne (up) veya bir arkaya (down) taşı"""
+    post = Post.query.get_or_404(id)
+    
+    if PostImage.move(post.id, image_id, -1 if direction == 'up' else 1):
+        post.touch()
+        db.session.commit()
+        invalidate_club_pages(post.author.club.id if post.author.club else None)
+    
+    return redirect(url_for('admin.edit_post', id=post.id))
+
+
 @admin_bp.route('/feedback/new', methods=['GET', 'POST'])
 @login_required
 @admin_required
@@ -427,6 +651,7 @@ def send_feedback():
         
         try:
             db.session.add(feedback)
+            AccountCounter.bump(club.account_id, unread_feedbacks=1, total_feedbacks=1)
             db.session.commit()
             flash(f'{club.name} kulübüne geri bildirim gönderildi!', 'success')
             return redirect(url_for('admin.all_feedbacks'))
@@ -448,7 +673,7 @@ def all_feedbacks():
     
     try:
         # Sadece feedback'leri getir
-        pagination = Feedback.query.order_by(Feedback.created_at.desc()).paginate(
+        pagination = with_feedback_relations(Feedback.query).order_by(Feedback.created_at.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
@@ -469,6 +694,8 @@ def all_feedbacks():
 def delete_feedback(id):
     """Feedback sil"""
     feedback = Feedback.query.get_or_404(id)
+    AccountCounter.bump(feedback.club.account_id, total_feedbacks=-1,
+                        unread_feedbacks=0 if feedback.is_read else -1)
     db.session.delete(feedback)
     db.session.commit()
     flash('Geri bildirim silindi.', 'success')
@@ -2,34 +2,16 @@
 Auth Routes
 Kimlik doğrulama route'ları
 """
-import os
 from flask import render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, current_user
 from app.auth import auth_bp
 from app.auth.forms import LoginForm, RegisterForm
 from app.models import Account, Club
 from app import db
-from werkzeug.utils import secure_filename
-import uuid
-
-
-def save_image(file, folder):
-    """Resim kaydetme yardımcı fonksiyonu"""
-    if file:
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4().hex[:10]}_{filename}" 
-        #Dosya isminin başına rastgele 10 karakterli benzersiz bir kod ekle
-        
-        #Klasör yollarını bilgisayarın işletim sistemine uygun şekilde birleştirir.
-        upload_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], folder)
-        os.makedirs(upload_folder, exist_ok=True)
-        
-        file_path = os.path.join(upload_folder, unique_filename)
-        file.save(file_path)
-        #Dosyayı RAM'den alıp fiziksel olarak diske yazar.
-        
-        return f"{folder}/{unique_filename}"
-    return None
+from app.utils.autocomplete import club_autocomplete
+from app.utils.images import image_pipeline, process_club_logo
+from app.utils.storage import save_upload
+from app.utils.admin_stats import invalidate_admin_stats
 
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
@@ -111,7 +93,7 @@ def register():
         # Logo kaydet
         logo_path = None
         if form.logo.data:
-            logo_path = save_image(form.logo.data, 'club_logos')
+            logo_path = save_upload(form.logo.data, 'club_logos')
         
         member_count = 0
         if form.member_count.data:
@@ -134,10 +116,13 @@ def register():
             twitter=form.twitter.data,
             logo=logo_path  
         )
-        club.generate_slug()
-        
         db.session.add(club)
+        club.assign_slug()
         db.session.commit()
+        club_autocomplete.upsert(club)  # Onay bekliyor, onaylanınca listeye girer
+        invalidate_admin_stats()
+        if logo_path:
+            image_pipeline.submit(process_club_logo, club.id)
         
         flash(
             'Kayıt başarılı! Hesabınız yönetici onayı bekliyor. '
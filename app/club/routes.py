@@ -2,17 +2,26 @@
 Club Routes
 Kulüp paneli route'ları
 """
-import os
+import json
 from functools import wraps
-from flask import render_template, redirect, url_for, flash, request, current_app
+from flask import render_template, redirect, url_for, flash, request, current_app, jsonify, Response
 from flask_login import login_required, current_user
 from sqlalchemy import and_
 from app.club import club_bp
 from app.club.forms import (PostForm, EditPostForm, ClubProfileForm, MessageForm)
-from app.models import Post, Club, Message, Feedback, Account
+from app.models import Post, PostImage, Club, Message, Feedback, Account, Conversation, AccountCounter
 from app import db
-from werkzeug.utils import secure_filename
-import uuid
+from app.utils.pagination import keyset_paginate
+from app.utils.queries import with_post_images
+from app.utils.pubsub import get_broker
+from app.utils.notifications import get_notification_counts, reset_notification_counts
+from app.utils.user_cache import invalidate_account
+from app.utils.autocomplete import club_autocomplete
+from app.utils.directory import invalidate_directory
+from app.utils.page_cache import invalidate_club_pages
+from app.utils.admin_stats import invalidate_admin_stats
+from app.utils.images import image_pipeline, process_post_images, process_club_logo
+from app.utils.storage import save_upload, delete_upload, remove_uploads
 
 
 #f çalışmadan önce yetki kontrolü yapar
@@ -34,44 +43,70 @@ def club_required(f):
     return decorated_function
 
 
-def save_image(file, folder):
-    """Resim kaydetme yardımcı fonksiyonu"""
-    if file:
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4().hex[:10]}_{filename}"
-        
-        upload_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], folder)
-        os.makedirs(upload_folder, exist_ok=True)
-        
-        file_path = os.path.join(upload_folder, unique_filename)
-        file.save(file_path)
-        
-        return f"{folder}/{unique_filename}"
-    return None
-
-
-def delete_image(image_path):
-    """Resim silme yardımcı fonksiyonu"""
-    if image_path:
-        full_path = os.path.join(current_app.config['UPLOAD_FOLDER'], image_path)
-        if os.path.exists(full_path):
-            try:
-                os.remove(full_path)
-            except Exception as e:
-                print(f"Resim silinirken hata: {e}")
-
-
 def handle_post_images(files):
     """Formdan gelen resim listesini işler ve kaydeder"""
     image_paths = []
     for img_file in files:
         if img_file and img_file.filename:
-            img_path = save_image(img_file, 'post_images')
+            img_path = save_upload(img_file, 'post_images')
             if img_path:
                 image_paths.append(img_path)
     return image_paths
 
 
+def conversation_messages(my_id, partner_id):
+    """
+    İki hesap arasındaki mesajlar, yön başına bir sorgu (gidenler, gelenler).
+    keyset_paginate her birini (sender_id, recipient_id, created_at, id) indeksinden
+    sıralı okur ve UNION ALL ile birleştirir; OR filtresi bu sıralı taramayı yapamaz
+    """
+    return [
+        Message.query.filter(Message.sender_id == my_id, Message.recipient_id == partner_id),
+        Message.query.filter(Message.sender_id == partner_id, Message.recipient_id == my_id),
+    ]
+
+
+def message_to_dict(msg):
+    """Mesajı JSON/SSE için sözlüğe çevirir"""
+    return {
+        'id': msg.id,
+        'sender_id': msg.sender_id,
+        'recipient_id': msg.recipient_id,
+        'content': msg.content,
+        'created_at': msg.created_at.isoformat(),
+        'time': msg.created_at.strftime('%H:%M')
+    }
+
+
+def deliver_message(sender_id, recipient_id, content):
+    """Mesajı kaydeder, sohbet özetini günceller ve açık SSE akışlarına yayınlar"""
+    msg = Message(
+        sender_id=sender_id,
+        recipient_id=recipient_id,
+        content=content
+    )
+    db.session.add(msg)
+    unread = Conversation.record_message(msg)
+    counters = AccountCounter.bump(recipient_id, unread_messages=1)
+    data = message_to_dict(msg)  # commit nesneyi expire etmeden önce
+    db.session.commit()
+    
+    # Yayın hatası mesajın kaydını etkilemesin
+    try:
+        broker = get_broker()
+        broker.publish(recipient_id, 'message', data)
+        broker.publish(sender_id, 'message', data)  # Göndericinin diğer sekmeleri
+        broker.publish(recipient_id, 'unread', {
+            'partner_id': sender_id,
+            'unread': unread,
+            'total_unread': counters['unread_messages']
+        })
+    except Exception as e:
+        current_app.logger.error(f"Message publish error: {str(e)}")
+    
+    return data
+
+
 @club_bp.route('/dashboard')
 @login_required
 @club_required
@@ -85,7 +120,7 @@ def dashboard():
     
     # Filtreleme kriterleri (Mesajlar ve Feedback'ler hariç)
     # Yeni veritabanında Post tablosunda sadece paylaşımlar var
-    posts_query = Post.query.filter_by(account_id=current_user.id)
+    posts_query = with_post_images(Post.query.filter_by(account_id=current_user.id))
     
     pagination = posts_query.order_by(Post.created_at.desc()).paginate(
         page=page, per_page=per_page, error_out=False
@@ -95,7 +130,7 @@ def dashboard():
     
     # Bu kulübe gönderilen feedback'ler
     feedbacks = club.feedbacks.order_by(Feedback.created_at.desc()).limit(5).all()
-    feedback_count = club.feedbacks.count()
+    feedback_count = get_notification_counts().total_feedbacks
     
     return render_template('club/dashboard.html',
                          club=club,
@@ -106,6 +141,16 @@ def dashboard():
                          feedback_count=feedback_count)
 
 
+@club_bp.route('/feedbacks/read', methods=['POST'])
+@login_required
+@club_required
+def mark_feedbacks_read():
+    """Tüm geri bildirimleri okundu olarak işaretle"""
+    if Feedback.mark_read_for_club(current_user.club):
+        db.session.commit()
+    return redirect(url_for('club.dashboard', _anchor='feedbacks-section'))
+
+
 @club_bp.route('/profile/edit', methods=['GET', 'POST'])
 @login_required
 @club_required
@@ -124,18 +169,18 @@ def edit_profile():
                 return redirect(url_for('club.edit_profile'))
             
             club.name = form.name.data
-            club.generate_slug()
+            club.assign_slug()
         
         # Logo güncelle
+        removable = []
         if form.logo.data:
-            # Eski logoyu sil
-            if club.logo:
-                delete_image(club.logo)
-            
-            # Yeni logoyu kaydet
-            logo_path = save_image(form.logo.data, 'club_logos')
+            # Yeni logo önce kaydedilir: aynı dosya tekrar yüklenirse referansı silinmez
+            logo_path = save_upload(form.logo.data, 'club_logos')
             if logo_path:
+                # Eski logonun referansı bırakılır, dosya commit'ten sonra silinir
+                removable = delete_upload(club.logo)
                 club.logo = logo_path
+                club.logo_variants = None
         
         # Diğer bilgileri güncelle
         club.about = form.about.data
@@ -160,6 +205,13 @@ def edit_profile():
         club.website = form.website.data
         
         db.session.commit()
+        remove_uploads(removable)
+        if club.logo and not club.logo_variants:
+            image_pipeline.submit(process_club_logo, club.id)
+        invalidate_account(current_user.id)
+        club_autocomplete.upsert(club)
+        invalidate_directory()
+        invalidate_club_pages(club.id)
         flash('Profil başarıyla güncellendi!', 'success')
         return redirect(url_for('club.dashboard'))
     
@@ -180,18 +232,23 @@ def create_post():
         if form.images.data:
             image_paths = handle_post_images(form.images.data)
         
-        image_str = ','.join(image_paths) if image_paths else None
-        
         # Paylaşımı oluştur
         post = Post(
             account_id=current_user.id,
             title=form.title.data,
             content=form.content.data,
-            image=image_str
+            is_public=current_user.can_post()
         )
+        post.add_images(image_paths)
         
         db.session.add(post)
+        Club.adjust_post_count(current_user.id, 1)
         db.session.commit()
+        if image_paths:
+            image_pipeline.submit(process_post_images, post.id)
+        invalidate_directory()
+        invalidate_club_pages(club.id)
+        invalidate_admin_stats()
         
         flash('Paylaşım başarıyla oluşturuldu!', 'success')
         return redirect(url_for('club.dashboard'))
@@ -218,18 +275,16 @@ def edit_post(id):
         post.title = form.title.data
         post.content = form.content.data
         
-        # Yeni resimler yüklendiyse
+        # Yeni resimler yüklendiyse mevcutların sonuna ekle
         image_paths = []
-        existing_images = post.get_images() if post.image else []
         if form.images.data:
             image_paths = handle_post_images(form.images.data)
-        
-        # Yeni resimler varsa ekle
-        if image_paths:
-            all_images = existing_images + image_paths
-            post.image = ','.join(all_images)
+        post.add_images(image_paths)
         
         db.session.commit()
+        if image_paths:
+            image_pipeline.submit(process_post_images, post.id)
+        invalidate_club_pages(club.id)
         flash('Paylaşım güncellendi!', 'success')
         return redirect(url_for('club.dashboard'))
     
@@ -248,17 +303,62 @@ def delete_post(id):
         flash('Bu paylaşımı silme yetkiniz yok.', 'danger')
         return redirect(url_for('club.dashboard'))
     
-    # Tüm resimleri sil
-    if post.image:
-        for img_path in post.get_images():
-            delete_image(img_path)
+    # Resimlerin referansları bırakılır, dosyalar commit'ten sonra silinir
+    removable = delete_upload(*post.get_images())
     
     db.session.delete(post)
+    Club.adjust_post_count(post.account_id, -1)
     db.session.commit()
+    remove_uploads(removable)
+    invalidate_directory()
+    invalidate_club_pages(current_user.club.id)
+    invalidate_admin_stats()
     
     flash('Paylaşım silindi.', 'success')
     return redirect(url_for('club.dashboard'))
 
+
+@club_bp.route('/post/<int:id>/image/<int:image_id>/delete', methods=['POST'])
+@login_required
+@club_required
+def delete_post_image(id, image_id):
+    """Paylaşımdan tek bir resmi sil"""
+    post = Post.query.get_or_404(id)
+    
+    if post.account_id != current_user.id:
+        flash('Bu paylaşımı düzenleme yetkiniz yok.', 'danger')
+        return redirect(url_for('club.dashboard'))
+    
+    image_path = PostImage.remove(post.id, image_id)
+    if image_path:
+        removable = delete_upload(image_path)
+        post.touch()
+        db.session.commit()
+        remove_uploads(removable)
+        invalidate_club_pages(current_user.club.id)
+        flash('Görsel silindi.', 'success')
+    
+    return redirect(url_for('club.edit_post', id=post.id))
+
+
+@club_bp.route('/post/<int:id>/image/<int:image_id>/move/<any(up, down):direction>', methods=['POST'])
+@login_required
+@club_required
+def move_post_image(id, image_id, direction):
+    """Resmi bir öne (up) veya bir arkaya (down) taşı"""
+    post = Post.query.get_or_404(id)
+    
+    if post.account_id != current_user.id:
+        flash('Bu paylaşımı düzenleme yetkiniz yok.', 'danger')
+        return redirect(url_for('club.dashboard'))
+    
+    if PostImage.move(post.id, image_id, -1 if direction == 'up' else 1):
+        post.touch()
+        db.session.commit()
+        invalidate_club_pages(current_user.club.id)
+    
+    return redirect(url_for('club.edit_post', id=post.id))
+
 # app/club/routes.py içine eklenecek kodlar:
 
 @club_bp.route('/messages')
@@ -267,32 +367,28 @@ def delete_post(id):
 def messages():
     """Sohbet listesi (Son konuşulanlar)"""
     my_id = current_user.id
+    per_page = current_app.config.get('CONVERSATIONS_PER_PAGE', 20)
     
-    # Mesajları konuşmalara göre grupla
-    chats = {}
+    # Sohbet özetleri son aktiviteye göre, cursor ile sayfalanır (OFFSET ve COUNT yok);
+    # kulübü olmayan karşı taraflar SQL'de elendiği için sayfalar eksik kalmaz
+    inbox = keyset_paginate(
+        Conversation.for_account(my_id), Conversation, per_page,
+        before=request.args.get('before'),
+        after=request.args.get('after'),
+        column='last_activity_at'
+    )
     
-    # Tüm mesajlarımı getir (Gelen ve Giden)
-    all_messages = Message.query.filter(
-        (Message.sender_id == my_id) | (Message.recipient_id == my_id)
-    ).order_by(Message.created_at.desc()).all()
+    # Karşı tarafların kulüpleri tek sorguda
+    partner_ids = [conversation.partner_id_of(my_id) for conversation in inbox.items]
+    clubs = {club.account_id: club for club in Club.query.filter(Club.account_id.in_(partner_ids))} if partner_ids else {}
     
-    for msg in all_messages:
-        # Konuşulan kişiyi belirle
-        partner_id = msg.recipient_id if msg.sender_id == my_id else msg.sender_id
-        
-        if partner_id not in chats:
-            partner_account = Account.query.get(partner_id)
-            # Sadece kulüplerle olan mesajlaşmaları listele (veya admin)
-            if partner_account and partner_account.club:
-                chats[partner_id] = {
-                    'club': partner_account.club,
-                    'last_msg': msg
-                }
-            
-    # Tarihe göre sırala (En yeni en üstte)
-    sorted_chats = sorted(chats.values(), key=lambda x: x['last_msg'].created_at, reverse=True)
+    chats = [{
+        'club': clubs[conversation.partner_id_of(my_id)],
+        'conversation': conversation,
+        'unread': conversation.unread_for(my_id)
+    } for conversation in inbox.items]
     
-    return render_template('club/messages.html', chats=sorted_chats)
+    return render_template('club/messages.html', chats=chats, inbox=inbox)
 
 @club_bp.route('/chat/<slug>', methods=['GET', 'POST'])
 @login_required
@@ -303,30 +399,119 @@ def chat(slug):
     target_id = target_club.account_id
     
     if request.method == 'POST':
+        # JavaScript kapalıysa form ile gönderim (JS açıkken chat_send kullanılır)
         content = request.form.get('content')
         if content:
-            msg = Message(
-                sender_id=current_user.id,
-                recipient_id=target_id,
-                content=content
-            )
-            db.session.add(msg)
-            db.session.commit()
+            deliver_message(current_user.id, target_id, content)
         return redirect(url_for('club.chat', slug=slug))
     
-    # Mesaj geçmişini getir (Gelenler ve Gidenler)
-    messages = Message.query.filter(
-        ((Message.sender_id == current_user.id) & (Message.recipient_id == target_id)) |
-        ((Message.sender_id == target_id) & (Message.recipient_id == current_user.id))
-    ).order_by(Message.created_at).all()
+    # Mesaj geçmişinin sadece en yeni kısmını getir, eskiler chat_history ile yüklenir
+    history = keyset_paginate(
+        conversation_messages(current_user.id, target_id), Message,
+        current_app.config.get('CHAT_MESSAGES_PER_PAGE', 50)
+    )
+    messages = list(reversed(history.items))  # Ekranda eskiden yeniye
+    
+    # Okundu olarak işaretle (nesne yüklemeden tek UPDATE)
+    if Message.mark_read(current_user.id, target_id):
+        Conversation.mark_read(current_user.id, target_id)
+        db.session.commit()
+        reset_notification_counts()  # Kenar çubuğu güncel sayıyı göstersin
+    
+    return render_template('club/chat.html', target_club=target_club, messages=messages,
+                           older_cursor=history.older_cursor)
+
+
+@club_bp.route('/chat/<slug>/history')
+@login_required
+@club_required
+def chat_history(slug):
+    """Daha eski mesajları JSON olarak döndürür (?before=<cursor>)"""
+    target_club = Club.query.filter_by(slug=slug).first_or_404()
+    
+    history = keyset_paginate(
+        conversation_messages(current_user.id, target_club.account_id), Message,
+        current_app.config.get('CHAT_MESSAGES_PER_PAGE', 50),
+        before=request.args.get('before')
+    )
+    
+    results = []
+    for msg in reversed(history.items):
+        item = message_to_dict(msg)
+        item['is_me'] = msg.sender_id == current_user.id
+        results.append(item)
+    
+    return jsonify({
+        'messages': results,
+        'has_more': history.has_older,
+        'next_cursor': history.older_cursor
+    })
+
+
+@club_bp.route('/chat/<slug>/send', methods=['POST'])
+@login_required
+@club_required
+def chat_send(slug):
+    """JSON ile mesaj gönder (sayfa yenilenmeden)"""
+    target_club = Club.query.filter_by(slug=slug).first_or_404()
+    data = request.get_json(silent=True) or {}
+    content = (data.get('content') or '').strip()
+    
+    if not content:
+        return jsonify({'error': 'Mesaj boş olamaz.'}), 400
+    
+    message = deliver_message(current_user.id, target_club.account_id, content)
+    message['is_me'] = True
+    return jsonify(message), 201
+
+
+@club_bp.route('/chat/<slug>/read', methods=['POST'])
+@login_required
+@club_required
+def chat_read(slug):
+    """Sohbet açıkken gelen mesajları okundu işaretle"""
+    target_club = Club.query.filter_by(slug=slug).first_or_404()
     
-    # Okundu olarak işaretle
-    unread = Message.query.filter_by(recipient_id=current_user.id, sender_id=target_id, is_read=False).all()
-    if unread:
-        for m in unread: m.is_read = True
+    updated = Message.mark_read(current_user.id, target_club.account_id)
+    if updated:
+        Conversation.mark_read(current_user.id, target_club.account_id)
         db.session.commit()
+        reset_notification_counts()
+    return jsonify({
+        'updated': updated,
+        'total_unread': get_notification_counts().unread_messages
+    })
+
+
+@club_bp.route('/events')
+@login_required
+@club_required
+def events():
+    """
+    Server-Sent Events akışı: yeni mesajlar ve okunmamış sayaç değişiklikleri.
+    Akış boyunca veritabanı bağlantısı tutulmaz
+    """
+    account_id = current_user.id
+    keepalive = current_app.config.get('SSE_KEEPALIVE_SECONDS', 15)
+    subscription = get_broker().subscribe(account_id)
+    
+    # Kullanıcı yüklenirken alınan bağlantıyı havuza geri ver
+    db.session.remove()
+    
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = subscription.get(timeout=keepalive)
+                if event is None:
+                    yield ': keepalive\n\n'  # Proxy bağlantıyı kapatmasın
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            subscription.close()
     
-    return render_template('club/chat.html', target_club=target_club, messages=messages)
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @club_bp.route('/message/new', methods=['GET', 'POST'])
 @login_required
@@ -341,13 +526,7 @@ def send_message():
     if form.validate_on_submit():
         target_club = Club.query.get(form.recipient_id.data)
         if target_club:
-            msg = Message(
-                sender_id=current_user.id,
-                recipient_id=target_club.account_id,
-                content=form.content.data
-            )
-            db.session.add(msg)
-            db.session.commit()
+            deliver_message(current_user.id, target_club.account_id, form.content.data)
             flash('Mesajınız gönderildi.', 'success')
             return redirect(url_for('club.chat', slug=target_club.slug))
     
@@ -22,10 +22,39 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.path.dirname(basedir), 'app', 'static', 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max dosya boyutu
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    # Yüklenen dosyaların deposu: 'local' (UPLOAD_FOLDER) veya 's3' (S3 uyumlu nesne deposu)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND') or 'local'
+    STORAGE_S3_BUCKET = os.environ.get('STORAGE_S3_BUCKET')
+    STORAGE_S3_ENDPOINT = os.environ.get('STORAGE_S3_ENDPOINT')  # MinIO vb. için
+    STORAGE_PUBLIC_URL = os.environ.get('STORAGE_PUBLIC_URL')
+    # Yüklenen resimlerden üretilen WebP/JPEG varyant genişlikleri (klasöre göre)
+    IMAGE_VARIANT_WIDTHS = {
+        'club_logos': (80, 160, 320, 640),
+        'post_images': (320, 640, 1280),
+    }
+    IMAGE_WORKERS = 2  # Arka planda resim işleyen thread sayısı
+    IMAGE_QUEUE_SIZE = 32  # Bekleyen en fazla iş, doluysa flask process-images tamamlar
+    # PDF dışa aktarma fontu (Türkçe karakter içeren TTF), boşsa sistemdeki DejaVu/Arial aranır
+    PDF_FONT_PATH = os.environ.get('PDF_FONT_PATH')
+    PDF_FONT_BOLD_PATH = os.environ.get('PDF_FONT_BOLD_PATH')
+    # Arka planda hazırlanan dışa aktarma dosyaları (herkese açık static klasörü dışında)
+    EXPORT_FOLDER = os.path.join(os.path.dirname(basedir), 'instance', 'exports')
+    EXPORT_WORKERS = 2  # Dışa aktarma process sayısı
+    EXPORT_TTL = 3600  # Hazırlanan dosyanın saklanma süresi (saniye)
+    EXPORT_JOB_TIMEOUT = 1800  # Bu süreden uzun aktif kalan iş başarısız sayılır
+    EXPORT_CLEANUP_INTERVAL = 300  # Havuzda en fazla bu sıklıkta temizlik (cleanup_exports) yapılır
+    # Daha büyük PDF'ler sadece arka planda hazırlanır (çizim yavaş, isteği uzun süre tutar)
+    PDF_INLINE_MAX_ROWS = 2000
+    # Excel zip'i dosya bitince gönderilir, daha büyük listelerde ilk bayt çok gecikir
+    EXCEL_INLINE_MAX_ROWS = 20000
     
     # Pagination
     POSTS_PER_PAGE = 10
     CLUBS_PER_PAGE = 12
+    CONVERSATIONS_PER_PAGE = 20
+    CLUB_DIRECTORY_TTL = 60  # /clubs rehber önbelleği (saniye)
+    ADMIN_STATS_TTL = 30  # Admin sayaçları, süresi dolunca arka planda yenilenir (saniye)
+    CHAT_MESSAGES_PER_PAGE = 50
     
     # Security
     WTF_CSRF_ENABLED = True #token
@@ -38,10 +67,46 @@ class Config:
     ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME') or 'admin'
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL') or 'admin@uni.edu.tr'
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD') or 'admin123'
+    BULK_ACTION_LIMIT = 200  # Toplu onay/silme işleminde en fazla kayıt
+    
+    # Giriş yapmış hesap + kulüp önbelleği (worker başına, saniye)
+    USER_CACHE_ENABLED = os.environ.get('USER_CACHE_ENABLED', 'true').lower() != 'false'
+    USER_CACHE_TTL = 30
+    
+    # Kulüp arama otomatik tamamlama indeksi (worker başına)
+    AUTOCOMPLETE_ENABLED = True
+    AUTOCOMPLETE_REFRESH_SECONDS = 300
+    
+    # Giriş yapmamış ziyaretçiler için tam sayfa önbelleği (worker başına)
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() != 'false'
+    PAGE_CACHE_TTL = 60
+    PAGE_CACHE_MAXSIZE = 256
+    
+    # HTTP önbellek politikaları (Cache-Control, saniye)
+    HTTP_CACHE_MAX_AGE = 0  # Tarayıcı her seferinde ETag ile doğrular
+    HTTP_CACHE_SHARED_MAX_AGE = 30  # Ters proxy bu süre boyunca doğrulamadan sunabilir
+    SEARCH_CACHE_MAX_AGE = 60
+    WEATHER_CACHE_MAX_AGE = 300
+    
+    # Gerçek zamanlı mesajlaşma (SSE)
+    # 'local': tek worker, 'postgres': birden fazla worker için LISTEN/NOTIFY
+    EVENT_BROKER = os.environ.get('EVENT_BROKER') or 'local'
+    EVENT_CHANNEL = 'club_events'
+    SSE_KEEPALIVE_SECONDS = 15
     
     # Hava durumu API ayarları
     WEATHER_API_KEY = os.environ.get('WEATHER_API_KEY') or None
     WEATHER_CITY = os.environ.get('WEATHER_CITY') or 'Trabzon'
+    # WEATHER_CITY dışında sorulabilen şehirler (virgülle), listede olmayanlar API'ye gitmez
+    WEATHER_CITIES = [city.strip() for city in (os.environ.get('WEATHER_CITIES') or '').split(',') if city.strip()]
+    WEATHER_API_URL = os.environ.get('WEATHER_API_URL') or 'http://api.openweathermap.org/data/2.5/weather'
+    WEATHER_TIMEOUT = 3  # saniye
+    WEATHER_CACHE_TTL = 600  # bu süreden eski veri arka planda yenilenir
+    WEATHER_NEGATIVE_TTL = 300  # API'nin reddettiği (4xx) şehir bu süre yeniden sorulmaz
+    WEATHER_CACHE_MAXSIZE = 64
+    WEATHER_POOL_SIZE = 4
+    WEATHER_FAILURE_THRESHOLD = 3  # art arda bu kadar hatadan sonra devre açılır
+    WEATHER_COOLDOWN = 60  # devre açıkken API'ye istek atılmayan süre
 
 
 class DevelopmentConfig(Config):
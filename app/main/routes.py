@@ -1,38 +1,80 @@
 
 from flask import render_template, request, current_app, jsonify
 from app.main import main_bp
-from app.models import Post, Club, Account
+from app.models import Post, Club, Account, ContentVersion
 from app import db
 from sqlalchemy import func
 from app.utils.weather import get_weather_data
+from app.utils.pagination import keyset_paginate
+from app.utils.queries import with_post_authors, with_post_images
+from app.utils.search import search_clubs, search_posts
+from app.utils.autocomplete import club_autocomplete
+from app.utils.directory import paginate_directory
+from app.utils.page_cache import cached_page, add_page_tags
+from app.utils.http_cache import conditional_get, cacheable_json
+
+
+def _feed_validator():
+    """Ana sayfa akışının sürümü: paylaşım/kulüp değişikliklerinde artan tek satır"""
+    row = db.session.query(ContentVersion.version, ContentVersion.updated_at)\
+        .filter(ContentVersion.key == ContentVersion.FEED).first()
+    if row is None:
+        return (0,), None
+    return (row.version,), row.updated_at
+
+
+def _club_validator(slug):
+    """Kulüp profil sayfasının sürümü, kulüp yoksa veya onaysızsa None (view 404 döndürür)"""
+    club = db.session.query(
+        Club.id, Club.updated_at, Account.is_approved, ContentVersion.version,
+        ContentVersion.updated_at.label('changed_at')
+    ).join(Account).outerjoin(
+        ContentVersion, ContentVersion.key == func.concat('club:', Club.id)
+    ).filter(Club.slug == slug).first()
+    if club is None or not club.is_approved:
+        return None
+    
+    last_modified = max(filter(None, [club.changed_at, club.updated_at]), default=None)
+    return (club.id, club.updated_at, club.version or 0), last_modified
 
 
 @main_bp.route('/')
+@conditional_get(_feed_validator)
+@cached_page('home')
 def home():
     
-    page = request.args.get('page', 1, type=int)
     per_page = current_app.config.get('POSTS_PER_PAGE', 10)
     
-    # Sadece onaylı kulüplerin ve admin'in paylaşımları
-    approved_accounts_filter = db.or_(
-        Account.account_type == 'admin',
-        Account.is_approved == True
-    )
+    # Sadece onaylı kulüplerin ve admin'in paylaşımları (is_public onay akışında güncel tutulur)
+    posts_query = with_post_images(with_post_authors(Post.query.filter(Post.is_public == True)))
 
-    pagination = Post.query.join(Account).filter(
-        approved_accounts_filter
-    ).order_by(Post.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
+    # Eski sayfa numaralı linkler (?page=3) çalışmaya devam etsin
+    if 'page' in request.args:
+        page = request.args.get('page', 1, type=int)
+        pagination = posts_query.order_by(Post.created_at.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        return render_template('main/home.html',
+                             posts=pagination.items,
+                             pagination=pagination,
+                             feed=None)
+
+    # Cursor tabanlı akış: ?before=<cursor> daha eski, ?after=<cursor> daha yeni
+    feed = keyset_paginate(
+        posts_query, Post, per_page,
+        before=request.args.get('before'),
+        after=request.args.get('after')
     )
     
-    posts = pagination.items
-    
     return render_template('main/home.html', 
-                         posts=posts, 
-                         pagination=pagination)
+                         posts=feed.items, 
+                         pagination=None,
+                         feed=feed)
 
 
 @main_bp.route('/club/<slug>')
+@conditional_get(_club_validator)
+@cached_page()
 def club_profile(slug):
     
     # Kulübü bul
@@ -43,11 +85,14 @@ def club_profile(slug):
         from flask import abort
         abort(404)  #404 Not Found
     
+    # Slug değişse de kulübün sayfaları id ile temizlenebilsin
+    add_page_tags(f'club:{club.id}')
+    
     # Kulübün paylaşımları
     page = request.args.get('page', 1, type=int)
     per_page = current_app.config.get('POSTS_PER_PAGE', 10)
     
-    pagination = Post.query.filter_by(account_id=club.account_id).order_by(Post.created_at.desc()).paginate(
+    pagination = with_post_images(Post.query.filter_by(account_id=club.account_id)).order_by(Post.created_at.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
@@ -60,36 +105,15 @@ def club_profile(slug):
 
 
 @main_bp.route('/clubs')
+@cached_page('clubs')
 def clubs():
     
     page = request.args.get('page', 1, type=int)
     sort_by = request.args.get('sort', 'name', type=str)
     per_page = current_app.config.get('CLUBS_PER_PAGE', 12)
     
-    # Sadece onaylı kulüpler
-    query = Club.query.join(Account).filter(
-        Account.is_approved == True
-    )
-    
-    # Sıralama
-    if sort_by == 'members':
-        query = query.order_by(Club.member_count.desc(), Club.name)
-    elif sort_by == 'posts':
-        # Post sayısına göre sıralama
-        from sqlalchemy import func
-        query = query.outerjoin(Post).group_by(Club.id).order_by(
-            func.count(Post.id).desc(), Club.name
-        )
-    elif sort_by == 'newest':
-        query = query.order_by(Club.created_at.desc(), Club.name)
-    elif sort_by == 'oldest':
-        query = query.order_by(Club.created_at.asc(), Club.name)
-    else:  # name (varsayılan)
-        query = query.order_by(Club.name)
-    
-    pagination = query.paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    # Sadece onaylı kulüpler; sıralama (isim, üye, paylaşım, yeni, eski) önbellekteki kopyada yapılır
+    pagination = paginate_directory(sort_by, page, per_page)
     
     clubs = pagination.items
     
@@ -106,14 +130,22 @@ def search():
     """
     query = request.args.get('q', '').strip()
     
+    max_age = current_app.config.get('SEARCH_CACHE_MAX_AGE', 60)
+    
     if not query:
         return jsonify([])
     
-    # Kulüpleri ara (sadece onaylı)
-    clubs = Club.query.join(Account).filter(
-        Account.is_approved == True,
-        Club.name.ilike(f'%{query}%')
-    ).limit(10).all()
+    # Önce bellekteki önek indeksinden cevap ver
+    results = club_autocomplete.search(query, limit=10)
+    if results:
+        return cacheable_json(results, max_age)
+    
+    # İndeks soğuksa veya önek eşleşmesi yoksa (yazım hatası vb.) veritabanında ara
+    # Kulüpleri ara (sadece onaylı), en alakalı sonuçlar önce
+    clubs_query, rank = search_clubs(
+        Club.query.join(Account).filter(Account.is_approved == True), query
+    )
+    clubs = clubs_query.order_by(rank.desc(), Club.name).limit(10).all()
     
     # JSON formatında döndür
     results = []
@@ -126,10 +158,41 @@ def search():
             'member_count': club.member_count
         })
     
+    return cacheable_json(results, max_age)
+
+
+@main_bp.route('/search/posts')
+def search_posts_api():
+    """
+    Paylaşım arama (başlık ve içerik), JSON döndürür
+    """
+    query = request.args.get('q', '').strip()
+    
+    if not query:
+        return jsonify([])
+    
+    # Sadece herkese açık paylaşımlar
+    posts_query, rank = search_posts(
+        with_post_authors(Post.query.filter(Post.is_public == True)), query
+    )
+    posts = posts_query.order_by(rank.desc(), Post.created_at.desc()).limit(20).all()
+    
+    results = []
+    for post in posts:
+        results.append({
+            'id': post.id,
+            'title': post.title,
+            'excerpt': post.get_excerpt(150),
+            'author': post.get_author_name(),
+            'author_slug': post.get_author_slug(),
+            'created_at': post.created_at.isoformat()
+        })
+    
     return jsonify(results)
 
 
 @main_bp.route('/about')
+@cached_page('static')
 def about():
     """
     Hakkımızda sayfası (opsiyonel)
@@ -138,6 +201,7 @@ def about():
 
 
 @main_bp.route('/contact')
+@cached_page('static')
 def contact():
     """
     İletişim sayfası (opsiyonel)
@@ -151,6 +215,8 @@ def weather_api():
     Hava durumu API endpoint'i
     JSON formatında hava durumu verilerini döndürür
     """
-    city = request.args.get('city', 'Trabzon')
+    city = request.args.get('city')
     weather_data = get_weather_data(city=city)
-    return jsonify(weather_data)
\ No newline at end of file
+    # Hata cevabı tarayıcıda uzun süre saklanmasın
+    max_age = 30 if weather_data.get('error') else current_app.config.get('WEATHER_CACHE_MAX_AGE', 300)
+    return cacheable_json(weather_data, max_age)
\ No newline at end of file
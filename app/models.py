@@ -1,11 +1,18 @@
 """
 Database Models
 """
+import hashlib
+import json
+import uuid
+from collections import Counter
 from app import db
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from slugify import slugify
+from sqlalchemy import func, case, delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 
 class Account(UserMixin, db.Model):
@@ -62,22 +69,82 @@ class Account(UserMixin, db.Model):
             return True
         return False
 
+    @staticmethod
+    def set_clubs_approval(account_ids, is_approved):
+        """
+        Kulüp hesaplarının onayını ve paylaşımlarının görünürlüğünü toplu UPDATE ile değiştirir.
+        Güncellenen (var olan kulüp) hesap id'lerini döndürür, commit çağıran tarafta yapılır
+        """
+        updated = db.session.execute(
+            update(Account)
+            .where(Account.id.in_(account_ids), Account.account_type == 'club')
+            .values(is_approved=is_approved)
+            .returning(Account.id)
+        ).scalars().all()
+        if updated:
+            Post.set_accounts_visibility(updated, is_approved)
+        return updated
+
+    @staticmethod
+    def delete_clubs(account_ids):
+        """
+        Kulüp hesaplarını paylaşımları, geri bildirimleri ve mesajlarıyla birlikte toplu DELETE ile siler.
+        (silinen hesap id'leri, silinen kulüp id'leri, bırakılacak dosya anahtarları) döndürür.
+        Dosyalar burada bırakılmaz (storage.delete_upload), commit çağıran tarafta yapılır
+        """
+        rows = db.session.query(Account.id, Club.id, Club.logo)\
+            .outerjoin(Club, Club.account_id == Account.id)\
+            .filter(Account.id.in_(account_ids), Account.account_type == 'club')\
+            .with_for_update(of=Account).all()
+        if not rows:
+            return [], [], []
+        ids = [account_id for account_id, _, _ in rows]
+        club_ids = [club_id for _, club_id, _ in rows if club_id]
+        keys = [logo for _, _, logo in rows if logo]
+        keys += db.session.scalars(
+            db.select(PostImage.path).join(Post).where(Post.account_id.in_(ids))
+        ).all()
+
+        # Silinen kulüplerden gelen okunmamış mesajlar alıcıların sayaçlarından düşülür
+        Message.discount_unread_from(ids)
+
+        # post_images, conversations ve account_counters veritabanında CASCADE ile silinir
+        db.session.execute(delete(Message).where(
+            (Message.sender_id.in_(ids)) | (Message.recipient_id.in_(ids))
+        ))
+        db.session.execute(delete(Post).where(Post.account_id.in_(ids)))
+        if club_ids:
+            db.session.execute(delete(Feedback).where(Feedback.club_id.in_(club_ids)))
+            db.session.execute(delete(Club).where(Club.id.in_(club_ids)))
+        db.session.execute(delete(Account).where(Account.id.in_(ids)))
+        return ids, club_ids, keys
+
 
 class Club(db.Model):
    
     __tablename__ = 'clubs'
+    __table_args__ = (
+        # Slug önek (LIKE 'base-%') aramaları için
+        db.Index('ix_clubs_slug_pattern', 'slug', postgresql_ops={'slug': 'varchar_pattern_ops'}),
+        # Gelen kutusunda karşı tarafın kulübü var mı (EXISTS) kontrolü için
+        db.Index('ix_clubs_account_id', 'account_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
     name = db.Column(db.String(200), nullable=False, index=True)
     slug = db.Column(db.String(200), unique=True, nullable=False, index=True)
     logo = db.Column(db.String(255))
+    # Logonun boyutları ve WebP/JPEG varyantları (app/utils/images.py üretir)
+    logo_variants = db.Column(db.JSON(none_as_null=True))
     
     
     about = db.Column(db.Text)  
     achievements = db.Column(db.Text)  
     location = db.Column(db.String(255))  
     member_count = db.Column(db.Integer, default=0) 
+    # Paylaşım ekleme/silme yollarında güncel tutulur (flask reconcile-post-counts ile düzeltilir)
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
     
     
     phone = db.Column(db.String(20))
@@ -98,18 +165,89 @@ class Club(db.Model):
     def __repr__(self):
         return f'<Club {self.name}>'
     
-    def generate_slug(self):
-        """URL-friendly slug oluştur"""
-        base_slug = slugify(self.name) #Türkçe karakterleri İngilizce karşılıklarına çevirir, boşlukları - yapar ve tüm harfleri küçültür.
-        slug = base_slug
+    @staticmethod
+    def _taken_slugs(base_slugs, exclude_id=None):
+        """Verilen temel slug'lar ve onların -N uzantılı hallerini tek sorguda getirir"""
+        conditions = [Club.slug.in_(base_slugs)]
+        conditions += [Club.slug.like(f"{base}-%") for base in base_slugs]
+        query = db.session.query(Club.slug).filter(db.or_(*conditions))
+        if exclude_id is not None:
+            query = query.filter(Club.id != exclude_id)
+        return {slug for (slug,) in query}
+    
+    @staticmethod
+    def _next_free_slug(base_slug, taken):
+        """Temel slug boşsa onu, değilse ilk boş -N uzantısını döndürür"""
+        if base_slug not in taken:
+            return base_slug
         counter = 1
-        
-        # Eğer slug varsa sonuna sayı ekle URL çakışması yaşanmaması için
-        while Club.query.filter_by(slug=slug).first() is not None:
-            slug = f"{base_slug}-{counter}"
+        while f"{base_slug}-{counter}" in taken:
             counter += 1
+        return f"{base_slug}-{counter}"
+    
+    def _slug_matches_name(self, base_slug):
+        """
+        Mevcut slug hâlâ isimden üretilmiş hali mi? base, ya da base başka bir kulübe aitse
+        üretecin verdiği base-N çakışma eki
+        """
+        if not self.slug:
+            return False
+        if self.slug == base_slug:
+            return True
+        prefix, _, suffix = self.slug.rpartition('-')
+        if prefix != base_slug or not suffix.isdigit() or suffix.startswith('0'):
+            return False
+        # 'Kulüp 2024' -> 'Kulüp' yeniden adlandırmasında '-2024' isimden gelir, çakışmadan değil
+        return db.session.query(
+            Club.query.filter(Club.slug == base_slug, Club.id != self.id).exists()
+        ).scalar()
+    
+    def generate_slug(self, force=False):
+        """URL-friendly slug oluştur, slug değiştiyse True döndürür"""
+        base_slug = slugify(self.name) #Türkçe karakterleri İngilizce karşılıklarına çevirir, boşlukları - yapar ve tüm harfleri küçültür.
+        
+        # İsim değişmediyse slug da değişmez
+        if not force and self._slug_matches_name(base_slug):
+            return False
+        
+        # Eğer slug varsa sonuna sayı ekle URL çakışması yaşanmaması için (çakışmaların hepsi tek sorguda)
+        taken = Club._taken_slugs([base_slug], exclude_id=self.id)
+        self.slug = Club._next_free_slug(base_slug, taken)
+        return True
+    
+    def assign_slug(self, retries=3):
+        """
+        Slug üretip savepoint içinde yazar.
+        Aynı anda başka bir kayıt aynı slug'ı aldıysa (unique hatası) yeniden dener
+        """
+        if self.id is not None:
+            db.session.flush()  # Diğer değişiklikler savepoint geri alınırsa kaybolmasın
+        
+        for attempt in range(retries):
+            if not self.generate_slug(force=attempt > 0):
+                return
+            try:
+                with db.session.begin_nested():
+                    db.session.add(self)
+                    db.session.flush()
+                return
+            except IntegrityError:
+                if attempt == retries - 1:
+                    raise
+    
+    @staticmethod
+    def generate_slugs(clubs):
+        """Toplu içe aktarma için: birçok yeni kulübe tek sorguyla slug atar"""
+        clubs = list(clubs)
+        base_slugs = {club: slugify(club.name) for club in clubs}
+        if not base_slugs:
+            return clubs
         
-        self.slug = slug
+        taken = Club._taken_slugs(set(base_slugs.values()))
+        for club in clubs:
+            club.slug = Club._next_free_slug(base_slugs[club], taken)
+            taken.add(club.slug)  # Aynı partideki kulüpler de birbiriyle çakışmasın
+        return clubs
     
     def get_posts(self):
         """Kulübün paylaşımlarını getir"""
@@ -118,7 +256,29 @@ class Club(db.Model):
     
     def get_post_count(self):
         """Toplam paylaşım sayısı"""
-        return Post.query.filter_by(account_id=self.account_id).count()
+        return self.post_count or 0
+    
+    @staticmethod
+    def adjust_post_count(account_id, delta):
+        """Hesabın kulübü varsa paylaşım sayacını tek UPDATE ile değiştirir (admin hesabında etkisiz)"""
+        return Club.query.filter(Club.account_id == account_id).update(
+            # updated_at profil değişikliğini gösterir, sayaç değişimi ona dokunmaz
+            {Club.post_count: Club.post_count + delta, Club.updated_at: Club.updated_at},
+            synchronize_session=False
+        )
+    
+    @staticmethod
+    def reconcile_post_counts():
+        """Tüm kulüplerin paylaşım sayaçlarını posts tablosundan yeniden hesaplar, düzeltilen kulüp sayısını döndürür"""
+        actual = db.session.query(func.count(Post.id))\
+            .filter(Post.account_id == Club.account_id)\
+            .scalar_subquery()
+        fixed = Club.query.filter(Club.post_count != actual).update(
+            {Club.post_count: actual, Club.updated_at: Club.updated_at},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return fixed
     
     def has_social_media(self):
         """Sosyal medya hesabı var mı?"""
@@ -129,19 +289,66 @@ class Club(db.Model):
 class Post(db.Model):
 
     __tablename__ = 'posts'
+    __table_args__ = (
+        # Ana sayfa akışındaki (created_at, id) cursor sayfalaması için
+        db.Index('ix_posts_created_at_id', 'created_at', 'id'),
+        # Kulüp profilindeki paylaşım listesi için
+        db.Index('ix_posts_account_id_created_at', 'account_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    image = db.Column(db.String(255)) 
+    # Yazar admin ya da onaylı kulüp mü? Ana sayfa akışı join yapmadan bu kolona bakar
+    is_public = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Resimler sırasıyla; silme işini veritabanındaki ON DELETE CASCADE yapar
+    images = db.relationship('PostImage', backref='post', order_by='PostImage.position',
+                             cascade='all, delete-orphan', passive_deletes=True)
+    
     def __repr__(self):
         return f'<Post {self.title}>'
     
+    @staticmethod
+    def set_account_visibility(account_id, is_public):
+        """Bir hesabın tüm paylaşımlarının görünürlüğünü tek bir UPDATE ile günceller"""
+        return Post.set_accounts_visibility([account_id], is_public)
+
+    @staticmethod
+    def set_accounts_visibility(account_ids, is_public):
+        """Hesapların tüm paylaşımlarının görünürlüğünü tek bir UPDATE ile günceller"""
+        return Post.query.filter(
+            Post.account_id.in_(account_ids),
+            Post.is_public != is_public
+        ).update(
+            # updated_at'i olduğu gibi bırak, yoksa paylaşımlar "Düzenlendi" görünür
+            {Post.is_public: is_public, Post.updated_at: Post.updated_at},
+            synchronize_session=False
+        )
+    
+    @staticmethod
+    def delete_many(post_ids):
+        """
+        Paylaşımları tek DELETE ile siler ve kulüplerin paylaşım sayaçlarını düşürür.
+        ({silinen id: hesap id}, bırakılacak resim anahtarları) döndürür, commit çağıran tarafta yapılır
+        """
+        keys = db.session.scalars(
+            db.select(PostImage.path).where(PostImage.post_id.in_(post_ids))
+        ).all()
+        deleted = dict(db.session.execute(
+            delete(Post).where(Post.id.in_(post_ids)).returning(Post.id, Post.account_id)
+        ).all())
+        per_account = {}
+        for account_id in deleted.values():
+            per_account[account_id] = per_account.get(account_id, 0) + 1
+        for account_id, count in per_account.items():
+            Club.adjust_post_count(account_id, -count)
+        return deleted, keys
+
     def get_author_name(self):
         """Paylaşımı yapan kulüp veya admin adını döndür"""
         if self.author.is_admin():
@@ -156,6 +363,13 @@ class Post(db.Model):
             return self.author.club.logo
         return None
     
+    def get_author_logo_variants(self):
+        """Kulüp logosunun varyant bilgisini döndür (henüz işlenmediyse None)"""
+        if self.author.is_club() and self.author.club:
+            return self.author.club.logo_variants
+        return None
+    
+    
     def get_club(self):
         """Eğer kulüp paylaşımıysa kulüp nesnesini döndür"""
         if self.author.is_club():
@@ -181,11 +395,21 @@ class Post(db.Model):
         return False
     
     def get_images(self):
-        """Paylaşım resimlerini liste olarak döndür"""
-        if not self.image:
-            return []
-        return [img.strip() for img in self.image.split(',') if img.strip()]
-            #boşlukları temizler                            #boşsa listeye eklemez
+        """Paylaşım resimlerinin yollarını sırasıyla döndür"""
+        return [img.path for img in self.images]
+    
+    def add_images(self, paths):
+        """Yeni resimleri mevcutların sonuna ekler"""
+        position = max((img.position for img in self.images), default=-1) + 1
+        for offset, path in enumerate(paths):
+            self.images.append(PostImage(path=path, position=position + offset))
+    
+    def touch(self):
+        """Sadece updated_at'i günceller (resim silme/sıralama paylaşımın kendisini yeniden yazmaz)"""
+        Post.query.filter_by(id=self.id).update(
+            {Post.updated_at: datetime.utcnow()}, synchronize_session=False
+        )
+    
     def get_excerpt(self, length=200):
         """İçeriğin kısa özeti"""
         if len(self.content) <= length:
@@ -193,9 +417,73 @@ class Post(db.Model):
         return self.content[:length] + '...'
 
 
+# Ana sayfa akışı: WHERE is_public ORDER BY created_at DESC, id DESC tek index taramasıyla
+db.Index('ix_posts_is_public_created_at',
+         Post.is_public, Post.created_at.desc(), Post.id.desc())
+
+
+class PostImage(db.Model):
+
+    __tablename__ = 'post_images'
+    __table_args__ = (
+        db.Index('ix_post_images_post_position', 'post_id', 'position'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('posts.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    path = db.Column(db.String(255), nullable=False)
+    # Boyutlar ve varyantlar resim işlendikten sonra dolar (app/utils/images.py)
+    width = db.Column(db.Integer)
+    height = db.Column(db.Integer)
+    bytes = db.Column(db.Integer)
+    variants = db.Column(db.JSON(none_as_null=True))
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PostImage {self.path}>'
+    
+    @staticmethod
+    def remove(post_id, image_id):
+        """Tek resmi siler, silinen resmin yolunu döndürür (bulunamazsa None)"""
+        return db.session.execute(
+            delete(PostImage)
+            .where(PostImage.id == image_id, PostImage.post_id == post_id)
+            .returning(PostImage.path)
+        ).scalar()
+    
+    @staticmethod
+    def move(post_id, image_id, offset):
+        """Resmi komşusuyla yer değiştirir (offset: -1 öne, 1 arkaya), değiştiyse True"""
+        images = db.session.query(PostImage.id, PostImage.position)\
+            .filter_by(post_id=post_id).order_by(PostImage.position, PostImage.id).all()
+        ids = [img.id for img in images]
+        if image_id not in ids:
+            return False
+        target = ids.index(image_id) + offset
+        if not 0 <= target < len(ids):
+            return False
+        
+        # Sadece iki satırın pozisyonu değişir
+        current, neighbour = images[ids.index(image_id)], images[target]
+        db.session.execute(
+            update(PostImage)
+            .where(PostImage.id.in_([current.id, neighbour.id]))
+            .values(position=case((PostImage.id == current.id, neighbour.position),
+                                  else_=current.position)),
+            execution_options={'synchronize_session': False}
+        )
+        return True
+
+
 class Message(db.Model):
 
     __tablename__ = 'messages'
+    __table_args__ = (
+        # Sohbet geçmişi (gönderen, alıcı) çifti için (created_at, id) sırasıyla okunur
+        db.Index('ix_messages_pair_created_at', 'sender_id', 'recipient_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
@@ -206,6 +494,36 @@ class Message(db.Model):
     
     def __repr__(self):
         return f'<Message {self.id} from {self.sender_id} to {self.recipient_id}>'
+    
+    @staticmethod
+    def mark_read(recipient_id, sender_id):
+        """Gönderenden gelen okunmamış mesajları tek UPDATE ile okundu yapar, etkilenen satır sayısını döndürür"""
+        updated = Message.query.filter(
+            Message.recipient_id == recipient_id,
+            Message.sender_id == sender_id,
+            Message.is_read == False
+        ).update({Message.is_read: True}, synchronize_session=False)
+        if updated:
+            AccountCounter.bump(recipient_id, unread_messages=-updated)
+        return updated
+
+    @staticmethod
+    def discount_unread_from(sender_ids):
+        """
+        Silinecek hesapların gönderdiği okunmamış mesajları diğer alıcıların sayaçlarından düşer.
+        Mesajlar silinmeden önce, aynı transaction'da çağrılır
+        """
+        unread = db.session.query(Message.recipient_id, func.count(Message.id)).filter(
+            Message.sender_id.in_(sender_ids), Message.is_read == False,
+            Message.recipient_id.notin_(sender_ids)
+        ).group_by(Message.recipient_id).all()
+        for recipient_id, count in unread:
+            AccountCounter.bump(recipient_id, unread_messages=-count)
+
+
+# Okunmamış mesajlar kısmi indeksi: sadece is_read = false satırları tutulur
+db.Index('ix_messages_unread', Message.recipient_id, Message.sender_id,
+         postgresql_where=(Message.is_read == False))
 
 
 class Feedback(db.Model):
@@ -221,4 +539,431 @@ class Feedback(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Gönderen hesaba erişim
-    sender = db.relationship('Account', foreign_keys=[sender_id])
\ No newline at end of file
+    sender = db.relationship('Account', foreign_keys=[sender_id])
+    
+    @staticmethod
+    def mark_read_for_club(club):
+        """Kulübün okunmamış geri bildirimlerini tek UPDATE ile okundu yapar, etkilenen satır sayısını döndürür"""
+        updated = Feedback.query.filter(
+            Feedback.club_id == club.id,
+            Feedback.is_read == False
+        ).update({Feedback.is_read: True}, synchronize_session=False)
+        if updated:
+            AccountCounter.bump(club.account_id, unread_feedbacks=-updated)
+        return updated
+
+
+# Okunmamış geri bildirimler kısmi indeksi
+db.Index('ix_feedbacks_unread', Feedback.club_id,
+         postgresql_where=(Feedback.is_read == False))
+
+class Conversation(db.Model):
+    """
+    İki hesap arasındaki sohbetin özeti (gelen kutusu için).
+    Hesap çifti her zaman (küçük id, büyük id) sırasıyla tutulur
+    """
+
+    __tablename__ = 'conversations'
+    __table_args__ = (
+        db.UniqueConstraint('account_a_id', 'account_b_id', name='uq_conversations_pair'),
+        db.Index('ix_conversations_a_activity', 'account_a_id', 'last_activity_at', 'id'),
+        db.Index('ix_conversations_b_activity', 'account_b_id', 'last_activity_at', 'id'),
+    )
+
+    PREVIEW_LENGTH = 200
+
+    id = db.Column(db.Integer, primary_key=True)
+    account_a_id = db.Column(db.Integer, db.ForeignKey('accounts.id', ondelete='CASCADE'), nullable=False)
+    account_b_id = db.Column(db.Integer, db.ForeignKey('accounts.id', ondelete='CASCADE'), nullable=False)
+    last_message_id = db.Column(db.Integer, db.ForeignKey('messages.id', ondelete='SET NULL'))
+    last_sender_id = db.Column(db.Integer)
+    last_preview = db.Column(db.String(PREVIEW_LENGTH))
+    last_activity_at = db.Column(db.DateTime, default=datetime.utcnow)
+    unread_a = db.Column(db.Integer, nullable=False, default=0)
+    unread_b = db.Column(db.Integer, nullable=False, default=0)
+
+    account_a = db.relationship('Account', foreign_keys=[account_a_id])
+    account_b = db.relationship('Account', foreign_keys=[account_b_id])
+
+    def __repr__(self):
+        return f'<Conversation {self.account_a_id}-{self.account_b_id}>'
+
+    @staticmethod
+    def pair(first_id, second_id):
+        """Hesap çiftini tabloda tutulduğu sıraya çevirir"""
+        return min(first_id, second_id), max(first_id, second_id)
+
+    def partner_of(self, account_id):
+        """Konuşulan karşı hesabı döndür"""
+        return self.account_b if account_id == self.account_a_id else self.account_a
+
+    def partner_id_of(self, account_id):
+        """Konuşulan karşı hesabın id'si (hesabı yüklemeden)"""
+        return self.account_b_id if account_id == self.account_a_id else self.account_a_id
+
+    def unread_for(self, account_id):
+        """Bu hesabın okumadığı mesaj sayısı"""
+        return self.unread_a if account_id == self.account_a_id else self.unread_b
+
+    @staticmethod
+    def for_account(account_id):
+        """
+        Hesabın kulüplerle olan sohbetleri, iki sorgu olarak: hesabın a ve b tarafında olduğu.
+        keyset_paginate her birini kendi (account_x_id, last_activity_at, id) indeksinden sıralı
+        okur ve UNION ALL ile birleştirir (OR ile tek sorgu bu indeksleri sıralı kullanamaz).
+        Kulübü olmayan karşı taraflar sayfalamadan önce SQL'de elenir
+        """
+        return [
+            Conversation.query.filter(
+                Conversation.account_a_id == account_id,
+                db.exists().where(Club.account_id == Conversation.account_b_id)
+            ),
+            Conversation.query.filter(
+                Conversation.account_b_id == account_id,
+                Conversation.account_a_id != account_id,  # Kendisiyle sohbet a tarafında geldi
+                db.exists().where(Club.account_id == Conversation.account_a_id)
+            ),
+        ]
+
+    @staticmethod
+    def record_message(message):
+        """
+        Yeni mesajı sohbet özetine işler (INSERT ... ON CONFLICT DO UPDATE).
+        Mesajla aynı transaction içinde çağrılmalı, commit çağıran tarafa aittir.
+        Alıcının bu sohbetteki güncel okunmamış sayısını döndürür
+        """
+        if message.id is None:
+            db.session.flush()  # id ve created_at değerleri için
+
+        a_id, b_id = Conversation.pair(message.sender_id, message.recipient_id)
+        unread_column = 'unread_a' if message.recipient_id == a_id else 'unread_b'
+        table = Conversation.__table__
+
+        stmt = pg_insert(table).values(
+            account_a_id=a_id,
+            account_b_id=b_id,
+            last_message_id=message.id,
+            last_sender_id=message.sender_id,
+            last_preview=message.content[:Conversation.PREVIEW_LENGTH],
+            last_activity_at=message.created_at,
+            unread_a=1 if unread_column == 'unread_a' else 0,
+            unread_b=1 if unread_column == 'unread_b' else 0
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint='uq_conversations_pair',
+            set_={
+                'last_message_id': stmt.excluded.last_message_id,
+                'last_sender_id': stmt.excluded.last_sender_id,
+                'last_preview': stmt.excluded.last_preview,
+                'last_activity_at': stmt.excluded.last_activity_at,
+                unread_column: table.c[unread_column] + 1
+            }
+        ).returning(table.c[unread_column])
+        return db.session.execute(stmt).scalar()
+
+    @staticmethod
+    def mark_read(account_id, partner_id):
+        """Hesabın bu sohbetteki okunmamış sayacını sıfırlar"""
+        a_id, b_id = Conversation.pair(account_id, partner_id)
+        unread_column = Conversation.unread_a if account_id == a_id else Conversation.unread_b
+        return Conversation.query.filter_by(account_a_id=a_id, account_b_id=b_id)\
+            .filter(unread_column != 0)\
+            .update({unread_column: 0}, synchronize_session=False)
+
+    @staticmethod
+    def rebuild():
+        """Tüm sohbet özetlerini messages tablosundan yeniden oluşturur"""
+        summaries = {}
+        messages = Message.query.order_by(Message.created_at, Message.id).yield_per(1000)
+        for msg in messages:
+            a_id, b_id = Conversation.pair(msg.sender_id, msg.recipient_id)
+            summary = summaries.setdefault((a_id, b_id), {
+                'account_a_id': a_id, 'account_b_id': b_id, 'unread_a': 0, 'unread_b': 0
+            })
+            summary.update(
+                last_message_id=msg.id,
+                last_sender_id=msg.sender_id,
+                last_preview=msg.content[:Conversation.PREVIEW_LENGTH],
+                last_activity_at=msg.created_at
+            )
+            if not msg.is_read:
+                summary['unread_a' if msg.recipient_id == a_id else 'unread_b'] += 1
+
+        Conversation.query.delete()
+        if summaries:
+            db.session.execute(Conversation.__table__.insert(), list(summaries.values()))
+        db.session.commit()
+        return len(summaries)
+
+
+class AccountCounter(db.Model):
+    """
+    Hesap başına bildirim sayaçları.
+    Ekleme ve okuma yollarında artırılıp azaltılır, kenar çubuğundaki rozetler COUNT(*) çalıştırmaz
+    """
+
+    __tablename__ = 'account_counters'
+
+    FIELDS = ('unread_messages', 'unread_feedbacks', 'total_feedbacks')
+
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id', ondelete='CASCADE'), primary_key=True)
+    unread_messages = db.Column(db.Integer, nullable=False, default=0)
+    unread_feedbacks = db.Column(db.Integer, nullable=False, default=0)
+    total_feedbacks = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<AccountCounter {self.account_id}>'
+
+    @staticmethod
+    def for_account(account_id):
+        """Hesabın sayaçları (satır yoksa sıfırlarla)"""
+        counter = db.session.get(AccountCounter, account_id)
+        if counter is None:
+            counter = AccountCounter(account_id=account_id, unread_messages=0,
+                                     unread_feedbacks=0, total_feedbacks=0)
+        return counter
+
+    @staticmethod
+    def bump(account_id, **deltas):
+        """
+        Sayaçları tek bir INSERT ... ON CONFLICT DO UPDATE ile artırır/azaltır (0'ın altına inmez).
+        Çağıran tarafın transaction'ı içinde çalışır, güncel değerleri döndürür
+        """
+        table = AccountCounter.__table__
+        values = {field: max(deltas.get(field, 0), 0) for field in AccountCounter.FIELDS}
+        stmt = pg_insert(table).values(account_id=account_id, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['account_id'],
+            set_={
+                field: func.greatest(table.c[field] + delta, 0)
+                for field, delta in deltas.items()
+            }
+        ).returning(*[table.c[field] for field in AccountCounter.FIELDS])
+        return db.session.execute(stmt).mappings().first()
+
+    @staticmethod
+    def repair():
+        """Tüm sayaçları messages/feedbacks tablolarından yeniden hesaplar, düzeltilen hesap sayısını döndürür"""
+        expected = {
+            account_id: dict.fromkeys(AccountCounter.FIELDS, 0)
+            for (account_id,) in db.session.query(Account.id)
+        }
+
+        unread_messages = db.session.query(Message.recipient_id, func.count(Message.id))\
+            .filter(Message.is_read == False).group_by(Message.recipient_id)
+        for account_id, count in unread_messages:
+            expected[account_id]['unread_messages'] = count
+
+        feedbacks = db.session.query(
+            Club.account_id,
+            func.count(Feedback.id),
+            func.count(Feedback.id).filter(Feedback.is_read == False)
+        ).join(Feedback, Feedback.club_id == Club.id).group_by(Club.account_id)
+        for account_id, total, unread in feedbacks:
+            expected[account_id]['total_feedbacks'] = total
+            expected[account_id]['unread_feedbacks'] = unread
+
+        current = {counter.account_id: counter for counter in AccountCounter.query}
+        fixed = 0
+        for account_id, values in expected.items():
+            counter = current.get(account_id)
+            if counter is None:
+                db.session.add(AccountCounter(account_id=account_id, **values))
+                fixed += 1
+            elif any(getattr(counter, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(counter, field, value)
+                fixed += 1
+
+        db.session.commit()
+        return fixed
+
+
+class StoredFile(db.Model):
+    """
+    Yüklenen dosyaların referans sayısı.
+    Aynı içerik bir kez saklanır, son referans kalkınca dosya silinir (app/utils/storage.py)
+    """
+
+    __tablename__ = 'stored_files'
+
+    key = db.Column(db.String(255), primary_key=True)
+    refs = db.Column(db.Integer, nullable=False, default=0)
+    bytes = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StoredFile {self.key} x{self.refs}>'
+
+    @staticmethod
+    def acquire(key, size=None):
+        """Referansı bir artırır (satır yoksa oluşturur), yeni referans sayısını döndürür"""
+        table = StoredFile.__table__
+        stmt = pg_insert(table).values(key=key, refs=1, bytes=size, created_at=datetime.utcnow())
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'refs': table.c.refs + 1}
+        ).returning(table.c.refs)
+        return db.session.execute(stmt).scalar()
+
+    @staticmethod
+    def release(*keys):
+        """
+        Her anahtarın referansını listede geçtiği kadar azaltır; son referansı biten satırları
+        siler ve silinebilecek dosyaların anahtarlarını döndürür. Satırlar tek sorguda, anahtar
+        sırasıyla kilitlenir (eşzamanlı toplu silmeler birbirini kilitlemesin) ve transaction
+        sonuna kadar kilitli kalır, aynı içeriğin eşzamanlı yüklemesi bekler
+        """
+        counts = Counter(keys)
+        if not counts:
+            return []
+        rows = StoredFile.query.filter(StoredFile.key.in_(counts))\
+            .order_by(StoredFile.key).with_for_update().all()
+        stored = {row.key: row for row in rows}
+
+        removable = []
+        for key, count in counts.items():
+            row = stored.get(key)
+            if row is None:
+                removable.append(key)  # Referans sayımı öncesinden kalan tekil dosya
+            elif row.refs > count:
+                row.refs -= count
+            else:
+                db.session.delete(row)
+                removable.append(key)
+        db.session.flush()
+        return removable
+
+
+class ExportJob(db.Model):
+    """
+    Arka planda hazırlanan dışa aktarma dosyası (app/utils/export_jobs.py).
+    Aynı parametrelerle bekleyen/çalışan tek bir iş olabilir, eşzamanlı istekler onu paylaşır
+    """
+
+    __tablename__ = 'export_jobs'
+    __table_args__ = (
+        # Eşzamanlı aynı istekler tek işte birleşir
+        db.Index('uq_export_jobs_active_fingerprint', 'fingerprint', unique=True,
+                 postgresql_where=db.text("status IN ('pending', 'running')")),
+        db.Index('ix_export_jobs_expires_at', 'expires_at'),
+    )
+
+    ACTIVE = ('pending', 'running')
+    SUBMIT_RETRIES = 3  # Aktif iş ekleme ile okuma arasında biterse deneme sayısı
+
+    id = db.Column(db.String(32), primary_key=True)  # Tahmin edilemez indirme adresi için uuid
+    kind = db.Column(db.String(20), nullable=False)  # 'clubs'
+    file_type = db.Column(db.String(10), nullable=False)
+    params = db.Column(db.JSON, nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='pending')  # pending, running, done, failed
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    path = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    requested_by = db.Column(db.Integer, db.ForeignKey('accounts.id', ondelete='SET NULL'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<ExportJob {self.id} {self.kind}.{self.file_type} {self.status}>'
+
+    @property
+    def progress(self):
+        """Yüzde olarak ilerleme"""
+        if self.status == 'done':
+            return 100
+        if not self.total:
+            return 0
+        return min(99, self.processed * 100 // self.total)
+
+    def is_downloadable(self):
+        return self.status == 'done' and self.expires_at is not None and self.expires_at > datetime.utcnow()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'progress': self.progress,
+            'processed': self.processed,
+            'total': self.total,
+            'error': self.error,
+        }
+
+    @staticmethod
+    def fingerprint_of(kind, file_type, params):
+        raw = json.dumps([kind, file_type, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def submit(kind, file_type, params, account_id=None):
+        """
+        Yeni iş oluşturur; aynı parametrelerle aktif bir iş varsa onu döndürür.
+        (iş, yeni_mi) döner, commit çağıran tarafta yapılır
+        """
+        fingerprint = ExportJob.fingerprint_of(kind, file_type, params)
+        table = ExportJob.__table__
+        for _ in range(ExportJob.SUBMIT_RETRIES):
+            stmt = pg_insert(table).values(
+                id=uuid.uuid4().hex, kind=kind, file_type=file_type, params=params,
+                fingerprint=fingerprint, status='pending', processed=0,
+                requested_by=account_id, created_at=datetime.utcnow()
+            ).on_conflict_do_nothing(
+                index_elements=['fingerprint'],
+                index_where=table.c.status.in_(ExportJob.ACTIVE)
+            ).returning(table.c.id)
+            job_id = db.session.execute(stmt).scalar()
+
+            if job_id is not None:
+                return db.session.get(ExportJob, job_id), True
+            existing = ExportJob.query.filter(
+                ExportJob.fingerprint == fingerprint, ExportJob.status.in_(ExportJob.ACTIVE)
+            ).first()
+            if existing is not None:
+                return existing, False
+        raise RuntimeError(f"Export job could not be submitted ({fingerprint})")
+
+
+class ContentVersion(db.Model):
+    """
+    Herkese açık sayfaların sürüm sayaçları: 'feed' (ana sayfa) ve 'club:<id>' (profil).
+    Koşullu GET doğrulayıcıları tablo taramak yerine tek satır okur (app/utils/http_cache.py)
+    """
+
+    __tablename__ = 'content_versions'
+
+    FEED = 'feed'
+
+    key = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ContentVersion {self.key} v{self.version}>'
+
+    @staticmethod
+    def club_key(club_id):
+        return f'club:{club_id}'
+
+    @staticmethod
+    def bump(*keys):
+        """
+        Anahtarların sürümünü tek INSERT ... ON CONFLICT DO UPDATE ile artırır.
+        Ayrı bir bağlantıda hemen commit edilir; değişiklik commit edildikten sonra çağrılmalı
+        """
+        if not keys:
+            return
+        table = ContentVersion.__table__
+        now = datetime.utcnow()
+        stmt = pg_insert(table).values([
+            {'key': key, 'version': 1, 'updated_at': now} for key in sorted(set(keys))
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'version': table.c.version + 1, 'updated_at': stmt.excluded.updated_at}
+        )
+        with db.engine.begin() as conn:
+            conn.execute(stmt)
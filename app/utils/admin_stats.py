@@ -0,0 +1,92 @@
+"""
+Admin İstatistik Önbelleği
+Dashboard sayaçları (kulüp, onaylı, bekleyen, paylaşım) FILTER'lı tek bir aggregate
+sorgu ile hesaplanır ve worker başına kısa süreli bir kopyada tutulur. Admin sayfaları
+(dashboard, kenar çubuğu rozeti) aynı kopyayı okur. Süresi dolan kopya hemen döner ve
+arka planda yenilenir; onay, silme ve yeni paylaşımlarda geçersiz kılınır.
+"""
+import threading
+import time
+from sqlalchemy import func
+from app import db
+from app.models import Account, Club, Post
+
+
+def _compute():
+    """Tüm sayaçlar tek sorguda: accounts LEFT JOIN clubs + paylaşım sayısı alt sorgusu"""
+    is_club = Account.account_type == 'club'
+    row = db.session.query(
+        func.count(Club.id).label('total_clubs'),
+        func.count(Account.id).filter(is_club, Account.is_approved == False).label('pending_clubs'),
+        func.count(Account.id).filter(is_club, Account.is_approved == True).label('approved_clubs'),
+        db.session.query(func.count(Post.id)).scalar_subquery().label('total_posts')
+    ).select_from(Account).outerjoin(Club, Club.account_id == Account.id).one()
+    return dict(row._mapping)
+
+
+class AdminStats:
+
+    def __init__(self):
+        self._app = None
+        self._snapshot = None  # (hesaplanma zamanı, sayaçlar)
+        self._generation = 0   # her geçersiz kılmada artar, eski yenileme sonucu yazılmaz
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        app.extensions['admin_stats'] = self
+        app.jinja_env.globals['admin_stats'] = self.get
+
+    def _store(self, generation, data):
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = (time.monotonic(), data)
+
+    def refresh_async(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            generation = self._generation
+
+        def run():
+            try:
+                with self._app.app_context():
+                    self._store(generation, _compute())
+            except Exception as e:
+                self._app.logger.warning(f"Admin stats refresh error: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, daemon=True, name='admin-stats-refresh').start()
+
+    def get(self):
+        """Sayaçlar sözlüğü: total_clubs, pending_clubs, approved_clubs, total_posts"""
+        with self._lock:
+            snapshot = self._snapshot
+            generation = self._generation
+
+        if snapshot is not None:
+            computed_at, data = snapshot
+            if time.monotonic() - computed_at > self._app.config.get('ADMIN_STATS_TTL', 30):
+                self.refresh_async()
+            return data
+
+        data = _compute()
+        self._store(generation, data)
+        return data
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+
+admin_stats = AdminStats()
+
+
+def invalidate_admin_stats():
+    """Kulüp onayı/silinmesi, yeni başvuru veya paylaşım ekleme/silme sonrası (commit'ten sonra) çağrılır"""
+    admin_stats.invalidate()
@@ -0,0 +1,161 @@
+"""
+Kulüp Otomatik Tamamlama İndeksi
+Ana sayfadaki arama kutusu her tuşta /search çağırır. Onaylı kulüp adları worker başına
+bellekte, Türkçe katlanmış anahtarlarla sıralı bir dizide tutulur ve önek araması
+bisect ile yapılır. İndeks hazır değilse (soğuk) çağıran taraf SQL aramasına döner.
+"""
+import bisect
+import threading
+import time
+from app import db
+from app.models import Account, Club
+from app.utils.search import fold
+
+
+class ClubAutocomplete:
+
+    # Tek harflik sorgularda taranacak en fazla anahtar
+    MAX_SCAN = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records = {}  # club_id -> JSON kaydı
+        self._names = {}    # club_id -> katlanmış ad
+        self._keys = []     # sıralı (anahtar, club_id) listesi
+        self._built_at = None
+        self._building = False
+        self._app = None
+
+    def init_app(self, app):
+        self._app = app
+        app.extensions['club_autocomplete'] = self
+        if app.config.get('AUTOCOMPLETE_ENABLED', True):
+            self.refresh_async()
+
+    @property
+    def is_warm(self):
+        return self._built_at is not None
+
+    def _is_stale(self):
+        max_age = self._app.config.get('AUTOCOMPLETE_REFRESH_SECONDS', 300)
+        return self._built_at is None or time.monotonic() - self._built_at > max_age
+
+    @staticmethod
+    def _record(club_id, name, slug, logo, location, member_count):
+        return {
+            'name': name,
+            'slug': slug,
+            'logo': logo,
+            'location': location,
+            'member_count': member_count
+        }
+
+    @staticmethod
+    def _keys_for(folded_name, club_id):
+        """Adın her kelimesinden başlayan bir anahtar: 'yazilim kulubu' -> ['yazilim kulubu', 'kulubu']"""
+        words = folded_name.split()
+        return [(' '.join(words[i:]), club_id) for i in range(len(words))]
+
+    def build(self):
+        """İndeksi veritabanından baştan oluşturur (uygulama bağlamı içinde çağrılmalı)"""
+        rows = db.session.query(
+            Club.id, Club.name, Club.slug, Club.logo, Club.location, Club.member_count
+        ).join(Account).filter(Account.is_approved == True).all()
+
+        records, names, keys = {}, {}, []
+        for row in rows:
+            records[row.id] = self._record(*row)
+            names[row.id] = fold(row.name)
+            keys.extend(self._keys_for(names[row.id], row.id))
+        keys.sort()
+
+        with self._lock:
+            self._records, self._names, self._keys = records, names, keys
+            self._built_at = time.monotonic()
+
+    def refresh_async(self):
+        """İndeksi arka planda yeniden oluşturur, bu sırada mevcut hali (veya SQL) kullanılır"""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+
+        def run():
+            try:
+                with self._app.app_context():
+                    self.build()
+            except Exception as e:
+                self._app.logger.warning(f"Autocomplete build error: {str(e)}")
+            finally:
+                self._building = False
+
+        threading.Thread(target=run, daemon=True, name='club-autocomplete-build').start()
+
+    def upsert(self, club):
+        """Kulüp kaydedildi/yeniden adlandırıldı/onaylandı: onaylıysa ekler, değilse çıkarır"""
+        if not club.account or not club.account.is_approved:
+            self.remove(club.id)
+            return
+
+        folded = fold(club.name)
+        record = self._record(club.id, club.name, club.slug, club.logo,
+                              club.location, club.member_count)
+        with self._lock:
+            self._remove_keys(club.id)
+            self._records[club.id] = record
+            self._names[club.id] = folded
+            for key in self._keys_for(folded, club.id):
+                bisect.insort(self._keys, key)
+
+    def remove(self, club_id):
+        """Kulüp silindi veya onayı kaldırıldı"""
+        with self._lock:
+            self._remove_keys(club_id)
+            self._records.pop(club_id, None)
+
+    def _remove_keys(self, club_id):
+        folded = self._names.pop(club_id, None)
+        if folded is None:
+            return
+        for key in self._keys_for(folded, club_id):
+            index = bisect.bisect_left(self._keys, key)
+            if index < len(self._keys) and self._keys[index] == key:
+                del self._keys[index]
+
+    def search(self, text, limit=10):
+        """
+        Önek araması. İndeks soğuksa None döndürür (çağıran SQL'e döner).
+        'yaz kul' gibi çok kelimeli sorgularda her kelime adın bir kelimesinin öneki olmalı
+        """
+        if not self.is_warm:
+            self.refresh_async()
+            return None
+        if self._is_stale():
+            self.refresh_async()  # Diğer worker'lardaki değişiklikler için periyodik yenileme
+
+        words = fold(text).split()
+        if not words:
+            return []
+        first, rest = words[0], words[1:]
+
+        with self._lock:
+            matches = {}
+            index = bisect.bisect_left(self._keys, (first,))
+            scanned = 0
+            while index < len(self._keys) and scanned < self.MAX_SCAN:
+                key, club_id = self._keys[index]
+                if not key.startswith(first):
+                    break
+                name_words = self._names[club_id].split()
+                if all(any(w.startswith(r) for w in name_words) for r in rest):
+                    # Adın başından eşleşenler önce gelsin
+                    starts_with = self._names[club_id].startswith(first)
+                    matches[club_id] = min(matches.get(club_id, 1), 0 if starts_with else 1)
+                index += 1
+                scanned += 1
+
+            ordered = sorted(matches, key=lambda cid: (matches[cid], self._names[cid]))
+            return [self._records[cid] for cid in ordered[:limit]]
+
+
+club_autocomplete = ClubAutocomplete()
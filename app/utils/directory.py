@@ -0,0 +1,82 @@
+"""
+Kulüp Rehberi Önbelleği
+/clubs sayfası için onaylı kulüplerin sadece kartlarda kullanılan alanlarını tutan
+sıkıştırılmış bir kopya. Beş sıralama seçeneği ve sayfalama bellekte yapılır.
+Onay, profil düzenleme ve paylaşım sayısı değişikliklerinde geçersiz kılınır.
+"""
+from flask import current_app
+from app import db
+from app.models import Account, Club
+from app.utils.cache import TTLCache
+from app.utils.pagination import ListPagination
+from app.utils.search import fold
+
+_directory = TTLCache(maxsize=1)
+
+SORT_KEYS = ('name', 'members', 'posts', 'newest', 'oldest')
+
+
+class ClubCard:
+    """clubs.html'deki bir kulüp kartı için gereken alanlar"""
+
+    __slots__ = ('slug', 'name', 'logo', 'logo_variants', 'location', 'member_count', 'about',
+                 'post_count', 'created_at', 'social', 'sort_name')
+
+    def __init__(self, row):
+        self.slug = row.slug
+        self.name = row.name
+        self.logo = row.logo
+        self.logo_variants = row.logo_variants
+        self.location = row.location
+        self.member_count = row.member_count or 0
+        # Kart en fazla 100 karakter gösterir, 101. karakter "..." kararı için yeterli
+        self.about = row.about[:101] if row.about else row.about
+        self.post_count = row.post_count or 0
+        self.created_at = row.created_at
+        self.social = any([row.instagram, row.twitter, row.linkedin, row.facebook, row.website])
+        self.sort_name = fold(row.name)
+
+    def get_post_count(self):
+        return self.post_count
+
+    def has_social_media(self):
+        return self.social
+
+
+def _build():
+    rows = db.session.query(
+        Club.slug, Club.name, Club.logo, Club.logo_variants, Club.location, Club.member_count, Club.about,
+        Club.post_count, Club.created_at, Club.instagram, Club.twitter, Club.linkedin,
+        Club.facebook, Club.website
+    ).join(Account).filter(Account.is_approved == True).all()
+
+    by_name = tuple(sorted((ClubCard(row) for row in rows), key=lambda c: c.sort_name))
+    # sorted() kararlı: eşitlikte isim sırası korunur
+    return {
+        'name': by_name,
+        'members': tuple(sorted(by_name, key=lambda c: c.member_count, reverse=True)),
+        'posts': tuple(sorted(by_name, key=lambda c: c.post_count, reverse=True)),
+        'newest': tuple(sorted(by_name, key=lambda c: c.created_at, reverse=True)),
+        'oldest': tuple(sorted(by_name, key=lambda c: c.created_at)),
+    }
+
+
+def get_directory():
+    """Sıralama anahtarına göre hazır kulüp kartı listeleri"""
+    snapshot = _directory.get('clubs')
+    if snapshot is None:
+        snapshot = _build()
+        _directory.set('clubs', snapshot, ttl=current_app.config.get('CLUB_DIRECTORY_TTL', 60))
+    return snapshot
+
+
+def paginate_directory(sort_by, page, per_page):
+    """Önbellekteki rehberi sıralayıp sayfalar"""
+    if sort_by not in SORT_KEYS:
+        sort_by = 'name'
+    return ListPagination(get_directory()[sort_by], page, per_page)
+
+
+def invalidate_directory():
+    """Onaylı kulüp listesi, kulüp bilgileri veya paylaşım sayıları değiştiğinde çağrılır"""
+    _directory.delete('clubs')
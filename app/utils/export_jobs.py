@@ -0,0 +1,244 @@
+"""
+Arka Plan Dışa Aktarma İşleri
+Büyük dışa aktarmalar istek içinde değil, ayrı bir process havuzunda hazırlanır.
+İlerleme export_jobs tablosuna yazılır, biten dosya EXPORT_FOLDER altında EXPORT_TTL
+süresince saklanır ve admin panelinden indirilir. Aynı parametrelerle aktif bir iş varsa
+yeni iş açılmaz (ExportJob.submit). Süresi dolan ve takılı kalan işler de havuzda
+temizlenir (ExportRunner.submit_cleanup) ya da flask cleanup-exports ile.
+"""
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from flask import Flask, current_app
+from sqlalchemy import update
+from app import db
+from app.models import ExportJob
+from app.utils.exports import EXPORT_FORMATS, club_export_count, club_export_rows
+
+# iş türü -> (satır sayısı, satır üretici); ikisi de iş parametrelerini keyword olarak alır
+EXPORTERS = {
+    'clubs': (club_export_count, club_export_rows),
+}
+
+# Bu kadar satırda bir ilerleme yazılır
+PROGRESS_EVERY = 500
+
+_worker_app = None
+
+
+def _worker_config(app):
+    """
+    Havuza gönderilecek ayarlar. spawn ile başlayan process create_app'i çalıştırmaz,
+    test_config gibi sonradan verilen ayarlar da buradan gider (pickle edilemeyenler atlanır)
+    """
+    config = {}
+    for key, value in app.config.items():
+        try:
+            pickle.dumps(value)
+        except Exception:
+            continue
+        config[key] = value
+    return config
+
+
+def _init_worker(config):
+    """Havuzdaki process için sadece veritabanı bağlantısı olan hafif uygulama"""
+    global _worker_app
+    app = Flask('app')
+    app.config.update(config)
+    db.init_app(app)
+    _worker_app = app
+
+
+class JobCancelled(Exception):
+    """İş bu process dışında sonlandırıldı (örn. cleanup_exports zaman aşımı saydı)"""
+
+
+def _update_job(job_id, **values):
+    """Sadece hâlâ çalışan işi günceller, iş artık çalışmıyorsa JobCancelled fırlatır"""
+    table = ExportJob.__table__
+    # Ayrı bağlantı: satırlar okunurken oturumdaki sunucu taraflı cursor açık kalmalı
+    with db.engine.begin() as conn:
+        result = conn.execute(
+            update(table).where(table.c.id == job_id, table.c.status == 'running').values(**values)
+        )
+    if result.rowcount != 1:
+        raise JobCancelled(job_id)
+
+
+def _track(job_id, rows):
+    processed = 0
+    for row in rows:
+        yield row
+        processed += 1
+        if processed % PROGRESS_EVERY == 0:
+            _update_job(job_id, processed=processed)
+
+
+def _run(job_id):
+    config = current_app.config
+    table = ExportJob.__table__
+    claimed = db.session.execute(
+        update(table)
+        .where(table.c.id == job_id, table.c.status == 'pending')
+        .values(status='running', started_at=datetime.utcnow())
+        .returning(table.c.kind, table.c.file_type, table.c.params)
+    ).first()
+    db.session.commit()
+    if claimed is None:
+        return  # Başka bir process aldı ya da zaman aşımına uğradı
+
+    count, rows = EXPORTERS[claimed.kind]
+    stream, _, filename = EXPORT_FORMATS[claimed.file_type]
+    params = claimed.params
+    total = count(**params)
+    _update_job(job_id, total=total)
+
+    folder = config['EXPORT_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    name = job_id + os.path.splitext(filename)[1]
+    temp_path = os.path.join(folder, name + '.part')
+    path = os.path.join(folder, name)
+    try:
+        with open(temp_path, 'wb') as output:
+            for chunk in stream(_track(job_id, rows(**params))):
+                output.write(chunk)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    db.session.rollback()
+
+    now = datetime.utcnow()
+    try:
+        _update_job(job_id, status='done', processed=total, path=name, finished_at=now,
+                    expires_at=now + timedelta(seconds=config.get('EXPORT_TTL', 3600)))
+    except JobCancelled:
+        os.remove(path)  # Satırı olmayan dosyayı cleanup_exports bulamaz
+        raise
+
+
+def run_export_job(job_id):
+    """Havuzdaki process'te çalışır"""
+    app = _worker_app or current_app._get_current_object()
+    with app.app_context():
+        try:
+            _run(job_id)
+        except JobCancelled:
+            db.session.rollback()
+            app.logger.warning(f"Export job stopped, no longer running ({job_id})")
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Export job error ({job_id}): {str(e)}")
+            now = datetime.utcnow()
+            table = ExportJob.__table__
+            with db.engine.begin() as conn:
+                # Zaman aşımıyla kapatılmış işin durumu ezilmesin
+                conn.execute(update(table).where(table.c.id == job_id, table.c.status.in_(ExportJob.ACTIVE)).values(
+                    status='failed', error=str(e)[:500], finished_at=now,
+                    expires_at=now + timedelta(seconds=app.config.get('EXPORT_TTL', 3600))
+                ))
+        finally:
+            db.session.remove()
+
+
+def run_cleanup():
+    """Havuzdaki process'te çalışır"""
+    app = _worker_app or current_app._get_current_object()
+    with app.app_context():
+        try:
+            removed = cleanup_exports()
+            app.logger.info(f"Export cleanup removed {removed} jobs")
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Export cleanup error: {str(e)}")
+        finally:
+            db.session.remove()
+
+
+class ExportRunner:
+    """Dışa aktarma işlerini process havuzuna gönderir (havuz ilk işte oluşturulur)"""
+
+    def __init__(self):
+        self._app = None
+        self._executor = None
+        self._last_cleanup = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._app = app
+        app.extensions['export_runner'] = self
+
+    def _pool(self, reset=False):
+        with self._lock:
+            if self._executor is None or reset:
+                # spawn: çocuk process ebeveynin veritabanı bağlantılarını ve thread'lerini devralmasın
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._app.config.get('EXPORT_WORKERS', 2),
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(_worker_config(self._app),)
+                )
+            return self._executor
+
+    def _submit(self, fn, *args):
+        try:
+            self._pool().submit(fn, *args)
+        except BrokenProcessPool:
+            self._app.logger.warning("Export pool was broken, restarting")
+            self._pool(reset=True).submit(fn, *args)
+
+    def submit(self, job_id):
+        """İşi kuyruğa ekler (commit'ten sonra çağrılmalı)"""
+        self._submit(run_export_job, job_id)
+
+    def submit_cleanup(self):
+        """cleanup_exports'u en fazla EXPORT_CLEANUP_INTERVAL saniyede bir havuza gönderir"""
+        now = time.monotonic()
+        with self._lock:
+            interval = self._app.config.get('EXPORT_CLEANUP_INTERVAL', 300)
+            if self._last_cleanup is not None and now - self._last_cleanup < interval:
+                return
+            self._last_cleanup = now
+        self._submit(run_cleanup)
+
+
+export_runner = ExportRunner()
+
+
+def export_path(job):
+    return os.path.join(current_app.config['EXPORT_FOLDER'], job.path)
+
+
+def cleanup_exports():
+    """
+    Süresi dolan işlerin dosyalarını ve satırlarını siler, takılı kalan aktif işleri
+    (örn. process çöktü) başarısız sayar. Silinen iş sayısını döndürür
+    """
+    config = current_app.config
+    now = datetime.utcnow()
+    ExportJob.query.filter(
+        ExportJob.status.in_(ExportJob.ACTIVE),
+        ExportJob.created_at < now - timedelta(seconds=config.get('EXPORT_JOB_TIMEOUT', 1800))
+    ).update({
+        ExportJob.status: 'failed',
+        ExportJob.error: 'Zaman aşımı',
+        ExportJob.finished_at: now,
+        ExportJob.expires_at: now + timedelta(seconds=config.get('EXPORT_TTL', 3600))
+    }, synchronize_session=False)
+
+    expired = ExportJob.query.filter(ExportJob.expires_at < now).all()
+    for job in expired:
+        if job.path:
+            try:
+                os.remove(export_path(job))
+            except FileNotFoundError:
+                pass
+        db.session.delete(job)
+    db.session.commit()
+    return len(expired)
@@ -0,0 +1,198 @@
+"""
+Kulüp Listesi Dışa Aktarma
+Satırlar sunucu taraflı cursor ile (yield_per) parça parça okunur ve istemciye akıtılır,
+bellek kullanımı kulüp sayısından bağımsızdır.
+- CSV: her satır üretildiği anda gönderilir
+- Excel: openpyxl write-only modu satırları geçici dosyaya yazar, zip kapandıktan sonra
+  dosya parça parça gönderilir. İlk bayt ancak o zaman gittiği için EXCEL_INLINE_MAX_ROWS'tan
+  büyük listeler arka plan işinde hazırlanır
+- PDF: reportlab sayfaları save()'e kadar bellekte tuttuğu için liste PDF_BATCH_PAGES
+  sayfalık parçalar halinde çizilir, parçalar tek PDF olarak akıtılır (pdf_join).
+  Çizim yine de yavaş olduğundan PDF_INLINE_MAX_ROWS'tan büyük listeler istek içinde değil,
+  arka plan işinde (export_jobs) hazırlanır. Font önbellekten gelir
+"""
+import csv
+import io
+import itertools
+import tempfile
+from flask import current_app
+from openpyxl import Workbook
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from app import db
+from app.models import Account, Club
+from app.utils.fonts import get_pdf_fonts
+from app.utils.pdf_join import join_pdfs
+from app.utils.search import search_clubs
+
+HEADERS = ['ID', 'Kulüp Adı', 'Slug', 'E-posta', 'Onay Durumu', 'Üye Sayısı', 'Konum', 'Telefon',
+           'Oluşturulma Tarihi']
+
+# Sunucu taraflı cursor'dan bir seferde çekilen satır sayısı
+BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+def filter_clubs(query, status, search):
+    """Tüm kulüpler sayfası ve dışa aktarmalar için ortak filtre, (sorgu, alaka puanı) döndürür"""
+    rank = None
+    if search:
+        query, rank = search_clubs(query, search)
+
+    if status == 'approved':
+        query = query.filter(Account.is_approved == True)
+    elif status == 'pending':
+        query = query.filter(Account.is_approved == False)
+    return query, rank
+
+
+def club_export_query(status='all', search=''):
+    """Dışa aktarılacak kulüp sütunları (hesap join'li), filtrelenmiş ve sırasız"""
+    query = db.session.query(
+        Club.id, Club.name, Club.slug, Account.email, Account.is_approved,
+        Club.member_count, Club.location, Club.phone, Club.created_at
+    ).join(Account)
+    query, _ = filter_clubs(query, status, search)
+    return query
+
+
+def club_export_count(status='all', search=''):
+    return club_export_query(status, search).count()
+
+
+def club_export_rows(status='all', search=''):
+    """Filtrelenmiş kulüpleri isim sırasıyla, dışa aktarma satırları olarak üretir"""
+    query = club_export_query(status, search)
+    for row in query.order_by(Club.name, Club.id).yield_per(BATCH_SIZE):
+        yield [
+            row.id, row.name, row.slug, row.email,
+            'Onaylı' if row.is_approved else 'Bekliyor',
+            row.member_count or 0, row.location, row.phone,
+            row.created_at.strftime('%Y-%m-%d %H:%M')
+        ]
+
+
+def stream_csv(rows):
+    """Satırları CSV olarak parça parça üretir (Excel'in Türkçe karakterleri tanıması için BOM ile)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(HEADERS)
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+def stream_xlsx(rows, title='Kulüpler'):
+    """Satırları write-only bir çalışma kitabına yazar ve dosyayı parça parça üretir"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(HEADERS)
+    for row in rows:
+        ws.append(row)
+
+    yield from _stream_file(wb.save)
+
+
+def _stream_file(save):
+    """save(dosya) ile geçici dosyaya yazılan çıktıyı parça parça üretir"""
+    with tempfile.TemporaryFile() as output:
+        save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+# PDF sütunları: (HEADERS içindeki sıra, genişlik pt); slug sayfaya sığmadığı için yok
+PDF_COLUMNS = ((0, 35), (1, 170), (3, 170), (4, 60), (5, 40), (6, 120), (7, 90), (8, 87))
+PDF_MARGIN = 30
+PDF_FONT_SIZE = 8
+PDF_ROW_HEIGHT = 14
+# Bir seferde bellekte çizilen sayfa sayısı (sayfa başına birkaç KB)
+PDF_BATCH_PAGES = 100
+
+
+def _fit(text, font, width):
+    """Metni sütun genişliğine sığacak şekilde kısaltır"""
+    if stringWidth(text, font, PDF_FONT_SIZE) <= width:
+        return text
+    ellipsis = '...'
+    while text and stringWidth(text + ellipsis, font, PDF_FONT_SIZE) > width:
+        text = text[:-1]
+    return text + ellipsis
+
+
+def stream_pdf(rows, title='Kulüp Listesi'):
+    """
+    Satırları yatay A4 sayfalara çizer ve PDF'i parça parça üretir.
+    Her PDF_BATCH_PAGES sayfa ayrı kaydedilip birleştirilir, bellek kullanımı sabittir
+    """
+    fonts = get_pdf_fonts(current_app)
+    page_width, page_height = landscape(A4)
+    rows = iter(rows)
+    carry = []  # Sonraki parçanın ilk satırı
+
+    def draw_row(pdf, y, values, font):
+        pdf.setFont(font, PDF_FONT_SIZE)
+        x = PDF_MARGIN
+        for index, width in PDF_COLUMNS:
+            pdf.drawString(x, y, _fit(fonts.text(values[index]), font, width - 4))
+            x += width
+
+    def start_page(pdf, number):
+        pdf.setFont(fonts.bold, 12)
+        pdf.drawString(PDF_MARGIN, page_height - PDF_MARGIN, fonts.text(title))
+        pdf.setFont(fonts.regular, PDF_FONT_SIZE)
+        pdf.drawRightString(page_width - PDF_MARGIN, page_height - PDF_MARGIN, fonts.text(f'Sayfa {number}'))
+        y = page_height - PDF_MARGIN - 24
+        draw_row(pdf, y, HEADERS, fonts.bold)
+        pdf.line(PDF_MARGIN, y - 4, page_width - PDF_MARGIN, y - 4)
+        return y - PDF_ROW_HEIGHT
+
+    def render_batch(first_page):
+        """En fazla PDF_BATCH_PAGES sayfa çizer, (pdf, son sayfa numarası) döndürür"""
+        output = io.BytesIO()
+        pdf = canvas.Canvas(output, pagesize=(page_width, page_height), pageCompression=1)
+        pdf.setTitle(fonts.text(title))
+        page = first_page
+        y = start_page(pdf, page)
+        for row in itertools.chain(carry, rows):
+            if y < PDF_MARGIN:
+                if page - first_page + 1 == PDF_BATCH_PAGES:
+                    carry[:] = [row]
+                    break
+                pdf.showPage()
+                page += 1
+                y = start_page(pdf, page)
+            draw_row(pdf, y, row, fonts.regular)
+            y -= PDF_ROW_HEIGHT
+        else:
+            carry.clear()
+        pdf.save()
+        return output.getvalue(), page
+
+    def batches():
+        page = 0
+        while page == 0 or carry:
+            document, page = render_batch(page + 1)
+            yield document
+
+    yield from join_pdfs(batches())
+
+
+# dosya türü -> (üretici, MIME tipi, dosya adı)
+EXPORT_FORMATS = {
+    'excel': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'kulupler.xlsx'),
+    'csv': (stream_csv, 'text/csv; charset=utf-8', 'kulupler.csv'),
+    'pdf': (stream_pdf, 'application/pdf', 'kulupler.pdf'),
+}
@@ -0,0 +1,94 @@
+"""
+PDF Font Önbelleği
+Türkçe karakter (ç, ğ, ı, İ, ö, ş, ü) içeren TTF font, fontTools ile sadece Latin
+karakterlerine indirilir (subset) ve reportlab'e bir kez kaydedilir. Her dışa aktarmada
+font dosyası yeniden ayrıştırılmaz; sonuç process ömrü boyunca bellekte kalır.
+Uygun font bulunamazsa Helvetica kullanılır ve metin ASCII'ye çevrilir.
+"""
+import io
+import os
+import threading
+from fontTools import subset
+from fontTools.ttLib import TTFont as FontFile
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from text_unidecode import unidecode
+
+# Ayarlanmamışsa sırayla denenen fontlar (normal, kalın)
+FONT_CANDIDATES = (
+    ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'),
+    ('/usr/share/fonts/TTF/DejaVuSans.ttf', '/usr/share/fonts/TTF/DejaVuSans-Bold.ttf'),
+    ('C:/Windows/Fonts/arial.ttf', 'C:/Windows/Fonts/arialbd.ttf'),
+    ('/Library/Fonts/Arial.ttf', '/Library/Fonts/Arial Bold.ttf'),
+)
+
+# Basic Latin, Latin-1, Latin Extended-A (Türkçe harfler) ve tipografik noktalama
+UNICODE_RANGES = ((0x20, 0x7E), (0xA0, 0xFF), (0x100, 0x17F), (0x2010, 0x2026), (0x20BA, 0x20BA))
+
+
+class PdfFonts:
+    """Kayıtlı font adları; unicode=False ise metin ASCII'ye çevrilmelidir"""
+
+    def __init__(self, regular, bold, unicode=True):
+        self.regular = regular
+        self.bold = bold
+        self.unicode = unicode
+
+    def text(self, value):
+        value = '' if value is None else str(value)
+        return value if self.unicode else unidecode(value)
+
+
+_fonts = None
+_lock = threading.Lock()
+
+
+def _subset(path):
+    """Fontu Türkçe için gereken karakterlere indirir, bellekteki TTF dosyasını döndürür"""
+    options = subset.Options()
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    options.layout_features = []  # reportlab OpenType tablolarını kullanmaz
+    options.drop_tables += ['FFTM']
+
+    font = FontFile(path)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=[c for start, end in UNICODE_RANGES for c in range(start, end + 1)])
+    subsetter.subset(font)
+
+    buffer = io.BytesIO()
+    font.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def _register(name, path):
+    pdfmetrics.registerFont(TTFont(name, _subset(path)))
+    return name
+
+
+def get_pdf_fonts(app):
+    """Fontları ilk çağrıda hazırlar, sonraki çağrılarda önbellekten döndürür"""
+    global _fonts
+    if _fonts is not None:
+        return _fonts
+
+    with _lock:
+        if _fonts is None:
+            configured = (app.config.get('PDF_FONT_PATH'), app.config.get('PDF_FONT_BOLD_PATH'))
+            candidates = (configured,) + FONT_CANDIDATES if configured[0] else FONT_CANDIDATES
+            for regular, bold in candidates:
+                if not os.path.exists(regular):
+                    continue
+                try:
+                    regular_name = _register('ExportSans', regular)
+                    bold_name = _register('ExportSans-Bold', bold) if bold and os.path.exists(bold) \
+                        else regular_name
+                    _fonts = PdfFonts(regular_name, bold_name)
+                    break
+                except Exception as e:
+                    app.logger.warning(f"PDF font error ({regular}): {str(e)}")
+            else:
+                app.logger.warning("No Turkish-capable PDF font found, falling back to Helvetica")
+                _fonts = PdfFonts('Helvetica', 'Helvetica-Bold', unicode=False)
+    return _fonts
@@ -0,0 +1,74 @@
+"""
+HTTP Koşullu GET Yardımcı Modülü
+Sayfalar render edilmeden önce ucuz bir doğrulayıcı (ETag / Last-Modified) hesaplanır,
+tarayıcı veya ters proxy elindeki kopyanın güncel olduğunu bildirirse Jinja'ya hiç
+girmeden 304 Not Modified döndürülür.
+"""
+import hashlib
+from functools import wraps
+from flask import current_app, g, request, session, make_response, jsonify, Response
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+
+def _make_etag(parts):
+    raw = repr((request.full_path, parts)).encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _set_public_cache(response, max_age=None, shared_max_age=None):
+    """Paylaşılan önbellek (proxy) için; giriş yapmış kullanıcıya ait kopya verilmesin diye Vary: Cookie"""
+    config = current_app.config
+    response.cache_control.public = True
+    response.cache_control.max_age = config.get('HTTP_CACHE_MAX_AGE', 0) if max_age is None else max_age
+    response.cache_control.s_maxage = config.get('HTTP_CACHE_SHARED_MAX_AGE', 30) \
+        if shared_max_age is None else shared_max_age
+    response.vary.add('Cookie')
+
+
+def conditional_get(validator):
+    """
+    View'i doğrulayıcıya göre koşullu hale getiren decorator.
+    validator(**view_kwargs) -> (parçalar, last_modified) veya None (doğrulama yapılmaz)
+    Sadece giriş yapmamış ziyaretçiler için; giriş yapmış kullanıcıların sayfası kişiseldir.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if current_user.is_authenticated:
+                response = make_response(f(*args, **kwargs))
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+                return response
+
+            # Bekleyen flash mesajı varsa sayfa mutlaka render edilmeli
+            validators = validator(**kwargs) if '_flashes' not in session else None
+            if validators is None:
+                return f(*args, **kwargs)
+
+            parts, last_modified = validators
+            etag = _make_etag(parts)
+            g.page_etag = etag  # Tam sayfa önbelleği de bu sürüme göre anahtarlanır
+
+            # If-None-Match gönderildiyse ETag belirleyicidir (silinen paylaşımlar Last-Modified'ı değiştirmez)
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            _set_public_cache(response)
+            return response
+        return decorated_function
+    return decorator
+
+
+def cacheable_json(data, max_age):
+    """JSON cevabına gövdeden ETag ekler, istemcideki kopya aynıysa 304 döndürür"""
+    response = jsonify(data)
+    _set_public_cache(response, max_age=max_age, shared_max_age=max_age)
+    response.add_etag()
+    return response.make_conditional(request)
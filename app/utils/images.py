@@ -0,0 +1,220 @@
+"""
+Resim İşleme Modülü
+Yüklenen orijinallerin EXIF/GPS gibi üst verileri temizlenir ve sabit genişliklerde
+WebP + JPEG kopyaları (varyant) üretilir. Varyant bilgisi veritabanına yazılır,
+şablonlar responsive_image() ile srcset ve width/height üretir.
+İşleme istek thread'inde değil, sınırlı bir worker havuzunda yapılır.
+"""
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from markupsafe import Markup, escape
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app import db
+from app.models import Club, Post, PostImage
+from app.utils.directory import invalidate_directory
+from app.utils.page_cache import invalidate_club_pages
+from app.utils.storage import get_storage, upload_url
+
+# (uzantı, Pillow formatı, MIME tipi)
+VARIANT_FORMATS = (('webp', 'WEBP', 'image/webp'), ('jpg', 'JPEG', 'image/jpeg'))
+
+DEFAULT_WIDTHS = {
+    'club_logos': (80, 160, 320, 640),
+    'post_images': (320, 640, 1280),
+}
+
+
+def variant_path(image_path, width, ext):
+    """'post_images/ab/cd/abcd.png' -> 'post_images/ab/cd/variants/abcd_640.webp'"""
+    folder, filename = os.path.split(image_path)
+    stem = os.path.splitext(filename)[0]
+    return f"{folder}/variants/{stem}_{width}.{ext}"
+
+
+def _encode(img, pil_format, **options):
+    buffer = io.BytesIO()
+    img.save(buffer, pil_format, **options)
+    buffer.seek(0)
+    return buffer
+
+
+def process_image(image_path):
+    """
+    Üst veriyi temizler ve varyantları üretir.
+    Dönen sözlük: {'width', 'height', 'bytes', 'variants': [{'width', 'height', 'webp', 'jpg'}, ...]}
+    Dosya okunamazsa None döner.
+    """
+    folder = image_path.split('/', 1)[0]
+    widths = current_app.config.get('IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS).get(folder)
+    storage = get_storage()
+
+    try:
+        with storage.open(image_path) as f:
+            data = f.read()
+        size = len(data)
+        with Image.open(io.BytesIO(data)) as original:
+            original_format = original.format
+            # Tekrar işlemede JPEG yeniden sıkıştırılmasın diye sadece üst verisi olanlar yazılır
+            has_metadata = bool(original.getexif()) or 'xmp' in original.info
+            # Telefon fotoğraflarındaki EXIF yönünü piksellere uygula
+            img = ImageOps.exif_transpose(original)
+    except (OSError, UnidentifiedImageError) as e:
+        current_app.logger.warning(f"Image processing error ({image_path}): {str(e)}")
+        return None
+
+    # Orijinal üst verisiz olarak aynı anahtarla yeniden yazılır (animasyonlu GIF'e dokunulmaz).
+    # Anahtar yüklenen dosyanın özetidir, aynı yüklemeler yine aynı temiz dosyaya düşer
+    if has_metadata and original_format in ('JPEG', 'PNG', 'WEBP'):
+        options = {'quality': 90, 'optimize': True} if original_format == 'JPEG' else {}
+        stripped = _encode(img, original_format, **options)
+        size = stripped.getbuffer().nbytes
+        storage.put(image_path, stripped)
+
+    width, height = img.size
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # JPEG saydamlık desteklemez, beyaz zemin üzerine yerleştir
+        rgba = img.convert('RGBA')
+        img = Image.new('RGB', rgba.size, (255, 255, 255))
+        img.paste(rgba, mask=rgba.split()[-1])
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Orijinalden büyük varyant üretilmez, en az bir varyant her zaman vardır
+    targets = sorted({min(w, width) for w in (widths or DEFAULT_WIDTHS['post_images'])})
+    variants = []
+    for target in targets:
+        target_height = max(1, round(height * target / width))
+        resized = img.resize((target, target_height), Image.Resampling.LANCZOS) if target != width else img
+        variant = {'width': target, 'height': target_height}
+        for ext, pil_format, _ in VARIANT_FORMATS:
+            path = variant_path(image_path, target, ext)
+            storage.put(path, _encode(resized, pil_format, quality=82, optimize=True))
+            variant[ext] = path
+        variants.append(variant)
+
+    return {'width': width, 'height': height, 'bytes': size, 'variants': variants}
+
+
+def responsive_image(image_path, meta=None, sizes='100vw', **attrs):
+    """
+    Şablonlar için <picture> etiketi üretir.
+    Varyant yoksa (henüz işlenmedi) orijinali gösteren düz <img> döner.
+    class_ gibi alt çizgili anahtarlar 'class' olarak yazılır.
+    """
+    attrs.setdefault('loading', 'lazy')
+    rendered = ' '.join(f'{escape(k.rstrip("_").replace("_", "-"))}="{escape(v)}"'
+                        for k, v in attrs.items())
+
+    if not meta or not meta.get('variants'):
+        src = upload_url(image_path)
+        return Markup(f'<img src="{escape(src)}" {rendered}>')
+
+    variants = meta['variants']
+    largest = variants[-1]
+    sources = []
+    for ext, _, mime in VARIANT_FORMATS:
+        srcset = ', '.join(
+            f"{upload_url(v[ext])} {v['width']}w" for v in variants
+        )
+        sources.append((ext, mime, srcset))
+
+    html = '<picture>'
+    for ext, mime, srcset in sources[:-1]:
+        html += f'<source type="{mime}" srcset="{escape(srcset)}" sizes="{escape(sizes)}">'
+    fallback_src = upload_url(largest['jpg'])
+    html += (f'<img src="{escape(fallback_src)}" srcset="{escape(sources[-1][2])}" '
+             f'sizes="{escape(sizes)}" width="{largest["width"]}" height="{largest["height"]}" '
+             f'{rendered}></picture>')
+    return Markup(html)
+
+
+class ImagePipeline:
+    """Resim işleme işlerini sınırlı bir thread havuzunda çalıştırır"""
+
+    def __init__(self):
+        self._app = None
+        self._executor = None
+        self._slots = None
+
+    def init_app(self, app):
+        self._app = app
+        app.extensions['image_pipeline'] = self
+        self._executor = ThreadPoolExecutor(max_workers=app.config.get('IMAGE_WORKERS', 2),
+                                            thread_name_prefix='image-pipeline')
+        # Kuyruk dolarsa iş atlanır, resim orijinalinden gösterilir (flask process-images tamamlar)
+        self._slots = threading.BoundedSemaphore(app.config.get('IMAGE_QUEUE_SIZE', 32))
+        app.jinja_env.globals['responsive_image'] = responsive_image
+
+    def submit(self, func, *args):
+        """İşi kuyruğa ekler (commit'ten sonra çağrılmalı), kuyruk doluysa False döner"""
+        if not self._slots.acquire(blocking=False):
+            self._app.logger.warning(f"Image queue full, skipped {func.__name__}{args}")
+            return False
+        future = self._executor.submit(self._run, func, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return True
+
+    def _run(self, func, *args):
+        with self._app.app_context():
+            try:
+                func(*args)
+            except Exception as e:
+                db.session.rollback()
+                self._app.logger.error(f"Image job error ({func.__name__}{args}): {str(e)}")
+
+
+image_pipeline = ImagePipeline()
+
+
+def process_post_images(post_id, force=False):
+    """Paylaşımın işlenmemiş resimlerinin varyantlarını üretip post_images satırlarına yazar"""
+    post = db.session.get(Post, post_id)
+    if post is None:
+        return
+    pending = [(img.id, img.path) for img in post.images if force or not img.variants]
+    club = post.get_club()
+
+    processed = False
+    for image_id, path in pending:
+        # Aynı dosya (içerik adresli) başka bir paylaşımda işlendiyse varyantları yeniden kullanılır
+        meta = None if force else db.session.query(PostImage.variants).filter(
+            PostImage.path == path, PostImage.variants.isnot(None)
+        ).limit(1).scalar()
+        meta = meta or process_image(path)
+        if meta is None:
+            continue
+        # Satır bazında güncelleme: paylaşımın kendisi ve diğer resimler yeniden yazılmaz
+        PostImage.query.filter_by(id=image_id).update({
+            PostImage.width: meta['width'],
+            PostImage.height: meta['height'],
+            PostImage.bytes: meta['bytes'],
+            PostImage.variants: meta
+        }, synchronize_session=False)
+        processed = True
+
+    if processed:
+        db.session.commit()
+        invalidate_club_pages(club.id if club else None)
+
+
+def process_club_logo(club_id, force=False):
+    """Kulüp logosunun varyantlarını üretip logo_variants kolonuna yazar"""
+    club = db.session.get(Club, club_id)
+    if club is None or not club.logo or (club.logo_variants and not force):
+        return
+    logo = club.logo
+    meta = process_image(logo)
+    if meta is None:
+        return
+
+    # Logo bu arada değiştiyse yazma (yeni logo için ayrı iş kuyruktadır)
+    Club.query.filter_by(id=club_id, logo=logo).update(
+        {Club.logo_variants: meta, Club.updated_at: Club.updated_at},
+        synchronize_session=False
+    )
+    db.session.commit()
+    invalidate_directory()
+    invalidate_club_pages(club_id)
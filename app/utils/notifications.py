@@ -0,0 +1,21 @@
+"""Bildirim Sayaçları Yardımcı Modülü"""
+from flask import g
+from flask_login import current_user
+from app.models import AccountCounter
+
+
+def get_notification_counts():
+    """
+    Giriş yapmış hesabın bildirim sayaçları.
+    İstek boyunca bir kez okunur, şablonlar ve view'lar aynı sonucu paylaşır
+    """
+    if not current_user.is_authenticated:
+        return None
+    if 'notification_counts' not in g:
+        g.notification_counts = AccountCounter.for_account(current_user.id)
+    return g.notification_counts
+
+
+def reset_notification_counts():
+    """Sayaçlar bu istek içinde değiştiyse önbelleği temizler"""
+    g.pop('notification_counts', None)
@@ -0,0 +1,160 @@
+"""
+Tam Sayfa Önbelleği
+Giriş yapmamış ziyaretçiler için herkese açık sayfaların render edilmiş HTML'i,
+URL (yol + sorgu) anahtarıyla boyutu sınırlı bir LRU önbellekte tutulur.
+Her kayıt etiketlerle işaretlenir ('home', 'clubs', 'club:<id>' ...) ve paylaşım/kulüp
+değişikliklerinde sadece ilgili etiketler silinir. Önbellek worker başınadır, diğer
+worker'lardaki kopyalar PAGE_CACHE_TTL sonunda yenilenir.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, request, session, make_response, Response
+from flask_login import current_user
+from app.models import ContentVersion
+
+
+class LRUPageCache:
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # anahtar -> (bitiş zamanı, gövde, durum, içerik tipi, etiketler)
+        self._tags = {}                # etiket -> anahtarlar
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, body, status, content_type, tags, ttl):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, body, status, content_type, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypasses': self.bypasses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[4]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+page_cache = LRUPageCache()
+
+
+def init_page_cache(app):
+    page_cache.maxsize = app.config.get('PAGE_CACHE_MAXSIZE', 256)
+
+
+def add_page_tags(*tags):
+    """View içinden, sadece render sırasında bilinen etiketleri eklemek için (örn. 'club:<id>')"""
+    g.setdefault('page_cache_tags', set()).update(tags)
+
+
+def invalidate_pages(*tags):
+    """Etiketli sayfaları önbellekten siler (commit'ten sonra çağrılmalı)"""
+    page_cache.invalidate(*tags)
+
+
+def invalidate_club_pages(*club_ids):
+    """
+    Kulüp veya paylaşımları değişti: ana sayfa, kulüp rehberi ve kulüplerin profil sayfaları.
+    Sayfa sürümleri de artırılır, tüm worker'larda ETag değişir ve eski kopya 304 ile sunulmaz
+    """
+    club_ids = [club_id for club_id in club_ids if club_id]
+    ContentVersion.bump(ContentVersion.FEED, *(ContentVersion.club_key(club_id) for club_id in club_ids))
+    page_cache.invalidate('home', 'clubs', *(f'club:{club_id}' for club_id in club_ids))
+
+
+def _can_use_cache():
+    # Giriş yapmış kullanıcılar ve bekleyen flash mesajı olan ziyaretçiler kişisel sayfa görür
+    return (current_app.config.get('PAGE_CACHE_ENABLED', True)
+            and request.method == 'GET'
+            and not current_user.is_authenticated
+            and '_flashes' not in session)
+
+
+def _can_store(response):
+    # CSRF token üretilen veya cookie yazan cevaplar paylaşılamaz
+    return (response.status_code == 200
+            and response.mimetype == 'text/html'
+            and not response.direct_passthrough
+            and 'Set-Cookie' not in response.headers
+            and 'csrf_token' not in g)
+
+
+def cached_page(*tags):
+    """Giriş yapmamış ziyaretçiler için view'in HTML çıktısını önbelleğe alan decorator"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not _can_use_cache():
+                page_cache.bypasses += 1
+                return f(*args, **kwargs)
+
+            # Şablonlarda _external=True linkler olduğu için host da anahtarın parçası.
+            # Koşullu GET doğrulayıcısı varsa anahtara eklenir, başka worker'daki
+            # değişikliklerden sonra eski kopya TTL'i beklemeden devreden çıkar
+            key = request.url + '#' + g.get('page_etag', '')
+            entry = page_cache.get(key)
+            if entry is not None:
+                _, body, status, content_type, _ = entry
+                response = Response(body, status=status, content_type=content_type)
+                response.headers['X-Page-Cache'] = 'HIT'
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if _can_store(response):
+                page_tags = set(tags) | g.get('page_cache_tags', set())
+                page_cache.set(key, response.get_data(), response.status_code,
+                               response.content_type, page_tags,
+                               current_app.config.get('PAGE_CACHE_TTL', 60))
+            response.headers['X-Page-Cache'] = 'MISS'
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,143 @@
+"""Keyset (cursor) Sayfalama Yardımcı Modülü"""
+import base64
+import binascii
+from datetime import datetime
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at, item_id):
+    """(created_at, id) ikilisini URL'de taşınabilir opak bir metne çevirir"""
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Opak cursor metnini (created_at, id) ikilisine geri çevirir, bozuksa None döner"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+class KeysetPagination:
+    """
+    (created_at, id) anahtarına (ya da column ile verilen zaman sütunu ve id'ye) göre sayfalama.
+    OFFSET ve COUNT(*) kullanmadığı için sayfa ne kadar derin olursa olsun maliyet sabittir.
+    """
+
+    def __init__(self, items, has_older, has_newer, column='created_at'):
+        self.items = items
+        self.has_older = has_older
+        self.has_newer = has_newer
+        self.column = column
+
+    @property
+    def older_cursor(self):
+        if not self.has_older or not self.items:
+            return None
+        last = self.items[-1]
+        return encode_cursor(getattr(last, self.column), last.id)
+
+    @property
+    def newer_cursor(self):
+        if not self.has_newer or not self.items:
+            return None
+        first = self.items[0]
+        return encode_cursor(getattr(first, self.column), first.id)
+
+
+def _fetch(queries, model, sort, condition, ascending, limit):
+    """
+    Anahtar koşuluna uyan ilk `limit` kaydı getirir. Birden fazla sorgu verilirse her biri
+    kendi indeksinden sıralı ve LIMIT'li okunur, UNION ALL sonucundan ilk `limit` kayıt alınır
+    """
+    if ascending:
+        order = (sort.asc(), model.id.asc())
+    else:
+        order = (sort.desc(), model.id.desc())
+
+    branches = []
+    for query in queries:
+        if condition is not None:
+            query = query.filter(condition)
+        branches.append(query.order_by(*order).limit(limit))
+    if len(branches) == 1:
+        return branches[0].all()
+    return branches[0].union_all(*branches[1:]).order_by(*order).limit(limit).all()
+
+
+def keyset_paginate(query, model, per_page, before=None, after=None, column='created_at'):
+    """
+    Sorguyu en yeniden eskiye doğru sayfalar.
+    before: bu cursor'dan daha eski kayıtlar (sonraki sayfa)
+    after: bu cursor'dan daha yeni kayıtlar (önceki sayfa)
+    query bir sorgu listesi de olabilir (örn. sohbetin iki yönü); OR ile birleştirilmiş
+    tek sorgu sıralı indeks taraması yapamadığında her parça ayrı taranır.
+    column: sıralamada id'den önce gelen zaman sütunu
+    """
+    queries = query if isinstance(query, (list, tuple)) else [query]
+    sort = getattr(model, column)
+    key = tuple_(sort, model.id)
+    older_than = decode_cursor(before)
+    newer_than = decode_cursor(after) if older_than is None else None
+
+    if newer_than is not None:
+        # Yeni kayıtlara doğru geri giderken artan sırada çekip sonra ters çeviririz
+        rows = _fetch(queries, model, sort, key > newer_than, True, per_page + 1)
+        has_newer = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        return KeysetPagination(items, has_older=True, has_newer=has_newer, column=column)
+
+    condition = key < older_than if older_than is not None else None
+
+    # Bir fazla kayıt çekerek sonraki sayfanın olup olmadığını COUNT olmadan anlarız
+    rows = _fetch(queries, model, sort, condition, False, per_page + 1)
+    has_older = len(rows) > per_page
+    return KeysetPagination(rows[:per_page], has_older=has_older,
+                            has_newer=older_than is not None, column=column)
+
+
+class ListPagination:
+    """
+    Bellekteki bir liste için Flask-SQLAlchemy Pagination ile aynı arayüz
+    (şablonlardaki sayfalama bloğu değişmeden kullanılabilsin diye)
+    """
+
+    def __init__(self, items, page, per_page):
+        self.total = len(items)
+        self.per_page = per_page
+        self.pages = -(-self.total // per_page)  # yukarı yuvarlanmış bölme
+        self.page = max(1, page)
+        start = (self.page - 1) * per_page
+        self.items = list(items[start:start + per_page])
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+    def iter_pages(self, left_edge=2, left_current=2, right_current=4, right_edge=2):
+        last = 0
+        for num in range(1, self.pages + 1):
+            if (num <= left_edge
+                    or self.page - left_current <= num <= self.page + right_current
+                    or num > self.pages - right_edge):
+                if last + 1 != num:
+                    yield None
+                yield num
+                last = num
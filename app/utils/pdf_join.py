@@ -0,0 +1,104 @@
+"""
+PDF Birleştirme
+reportlab'ın ayrı ayrı kaydettiği parçaları (sayfa grupları) tek PDF olarak akıtır.
+Her parçanın nesneleri yeniden numaralanır, parçaların sayfa ağaçları (/Pages) tek bir
+kök altında toplanır. Bellekte aynı anda sadece bir parça ve nesne konumları tutulur.
+Sadece reportlab çıktısı için yazıldı (klasik xref tablosu, nesne akışı yok)
+"""
+import re
+
+_REFERENCE = re.compile(rb'(\d+) 0 R\b')
+_STREAM = re.compile(rb'\bstream\r?\n')
+
+# Çıktıda ilk iki nesne: sayfa ağacının kökü ve katalog (en sonda yazılır)
+_ROOT_PAGES = 1
+_CATALOG = 2
+
+
+def _trailer_ref(document, key):
+    match = re.search(rb'/' + key + rb' (\d+) 0 R', document[document.rindex(b'trailer'):])
+    return int(match.group(1))
+
+
+def _objects(document):
+    """Parçadaki nesneleri {numara: 'N 0 obj' ile 'endobj' arası} olarak döndürür"""
+    start = int(document[document.rindex(b'startxref') + 9:].split()[0])
+    lines = document[start:].split(b'\n')
+    first, size = map(int, lines[1].split())
+    objects = {}
+    for number, entry in enumerate(lines[2:2 + size], first):
+        offset, _, kind = entry.split()
+        if kind == b'n':
+            body_start = document.index(b'obj', int(offset)) + 3
+            objects[number] = document[body_start:document.index(b'endobj', body_start)]
+    return objects
+
+
+def _renumber(body, numbers):
+    """Sözlük kısmındaki 'N 0 R' referanslarını çevirir, stream verisine dokunmaz"""
+    match = _STREAM.search(body)
+    head, stream = (body[:match.start()], body[match.start():]) if match else (body, b'')
+    head = _REFERENCE.sub(lambda ref: b'%d 0 R' % numbers[int(ref.group(1))], head)
+    return head + stream
+
+
+def join_pdfs(documents):
+    """
+    documents: kaydedilmiş PDF parçaları (bytes) üreten iterator.
+    Birleşik PDF'i parça parça üretir; belge bilgisi (/Info) ilk parçadan alınır
+    """
+    offset = 0
+    offsets = {}
+    kids = []
+    count = 0
+    info = None
+    next_number = _CATALOG + 1
+
+    def emit(number, body):
+        nonlocal offset
+        data = b'%d 0 obj' % number + body + b'endobj\n'
+        offsets[number] = offset
+        offset += len(data)
+        return data
+
+    head = b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'
+    offset = len(head)
+    yield head
+
+    for document in documents:
+        objects = _objects(document)
+        catalog = _trailer_ref(document, b'Root')
+        pages = int(re.search(rb'/Pages (\d+) 0 R', objects[catalog]).group(1))
+        document_info = _trailer_ref(document, b'Info')
+        skip = {catalog} if info is None else {catalog, document_info}
+
+        numbers = {}
+        for number in sorted(objects):
+            if number not in skip:
+                numbers[number] = next_number
+                next_number += 1
+        if info is None:
+            info = numbers[document_info]
+
+        chunk = []
+        for number, new_number in numbers.items():
+            # Belge bilgisinde referans yok, başlık metni referansa benzese de dokunulmaz
+            body = objects[number] if number == document_info else _renumber(objects[number], numbers)
+            if number == pages:
+                body = body.replace(b'/Type /Pages', b'/Parent %d 0 R /Type /Pages' % _ROOT_PAGES, 1)
+                count += int(re.search(rb'/Count (\d+)', body).group(1))
+                kids.append(new_number)
+            chunk.append(emit(new_number, body))
+        yield b''.join(chunk)
+
+    kid_refs = b' '.join(b'%d 0 R' % kid for kid in kids)
+    tail = [
+        emit(_ROOT_PAGES, b'\n<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>\n' % (count, kid_refs)),
+        emit(_CATALOG, b'\n<<\n/PageMode /UseNone /Pages %d 0 R /Type /Catalog\n>>\n' % _ROOT_PAGES),
+    ]
+    xref = [b'xref\n0 %d\n' % next_number, b'0000000000 65535 f \n']
+    xref += [b'%010d 00000 n \n' % offsets[number] for number in range(1, next_number)]
+    tail += xref
+    tail.append(b'trailer\n<<\n/Info %d 0 R /Root %d 0 R /Size %d\n>>\nstartxref\n%d\n%%%%EOF\n'
+                % (info, _CATALOG, next_number, offset))
+    yield b''.join(tail)
@@ -0,0 +1,158 @@
+"""
+Olay Yayın Modülü (pub/sub)
+Yeni mesaj ve okunmamış sayaç olaylarını hesabın açık SSE bağlantılarına iletir.
+
+- LocalBroker: tek worker için süreç içi kuyruklar
+- PostgresBroker: birden fazla worker için PostgreSQL LISTEN/NOTIFY.
+  Her worker tek bir dinleyici bağlantısı açar, boşta bekleyen SSE akışları veritabanı bağlantısı tutmaz.
+"""
+import json
+import queue
+import select
+import threading
+import time
+from flask import current_app
+from sqlalchemy import text
+
+
+class Subscription:
+    """Bir SSE akışının olay kuyruğu"""
+
+    def __init__(self, broker, account_id, maxsize=100):
+        self.broker = broker
+        self.account_id = account_id
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def get(self, timeout=None):
+        """Sıradaki olayı döndürür, süre dolarsa None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Süreç içi olay dağıtıcı (tek worker)"""
+
+    def __init__(self, app=None):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, account_id):
+        subscription = Subscription(self, account_id)
+        with self._lock:
+            self._subscribers.setdefault(account_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.account_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.account_id]
+
+    def publish(self, account_id, event, data):
+        """Olayı hesabın açık akışlarına gönderir (commit'ten sonra çağrılmalı)"""
+        self._dispatch(account_id, {'event': event, 'data': data})
+
+    def _dispatch(self, account_id, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(account_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(payload)
+            except queue.Full:
+                pass  # Okumayan yavaş istemci, olay atlanır
+
+
+class PostgresBroker(LocalBroker):
+    """LISTEN/NOTIFY ile worker'lar arası olay dağıtıcı"""
+
+    # NOTIFY yükü 8000 byte ile sınırlı
+    MAX_PAYLOAD = 7500
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.channel = app.config.get('EVENT_CHANNEL', 'club_events')
+        self._app = app
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, account_id):
+        self._ensure_listener()
+        return super().subscribe(account_id)
+
+    def publish(self, account_id, event, data):
+        payload = json.dumps({'account_id': account_id, 'event': event, 'data': data})
+        if len(payload.encode()) > self.MAX_PAYLOAD and 'content' in data:
+            # Uzun mesajlar kısaltılarak iletilir, tam metin sayfa yenilenince görünür
+            data = dict(data, content=data['content'][:1000] + '…', truncated=True)
+            payload = json.dumps({'account_id': account_id, 'event': event, 'data': data})
+
+        from app import db
+        with db.engine.connect() as conn:
+            conn.execute(text('SELECT pg_notify(:channel, :payload)'),
+                         {'channel': self.channel, 'payload': payload})
+            conn.commit()
+
+    def _ensure_listener(self):
+        # Dinleyici ilk abonelikte başlatılır (gunicorn fork'undan sonra)
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, daemon=True,
+                                                  name='event-broker-listener')
+                self._listener.start()
+
+    def _connect(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+        from app import db
+
+        with self._app.app_context():
+            url = db.engine.url.set(drivername='postgresql')
+        conn = psycopg2.connect(url.render_as_string(hide_password=False))
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}";')
+        return conn
+
+    def _listen(self):
+        while True:
+            conn = None
+            try:
+                conn = self._connect()
+                while True:
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        message = json.loads(notify.payload)
+                        self._dispatch(message['account_id'],
+                                       {'event': message['event'], 'data': message['data']})
+            except Exception as e:
+                self._app.logger.error(f"Event broker listener error: {str(e)}")
+                time.sleep(5)  # Bağlantı koptuysa biraz bekleyip yeniden bağlan
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+BROKERS = {
+    'local': LocalBroker,
+    'postgres': PostgresBroker,
+}
+
+
+def init_broker(app):
+    """Yapılandırmadaki EVENT_BROKER'a göre dağıtıcıyı oluşturur"""
+    broker_class = BROKERS[app.config.get('EVENT_BROKER', 'local')]
+    app.extensions['event_broker'] = broker_class(app)
+
+
+def get_broker():
+    return current_app.extensions['event_broker']
@@ -0,0 +1,37 @@
+"""
+Ortak Okuma Sorguları
+Liste sayfalarında N+1 sorgu oluşmaması için ilişkileri önceden (eager) yükler
+"""
+from sqlalchemy.orm import joinedload, contains_eager, selectinload
+from app.models import Account, Club, Post, Feedback
+
+
+def with_post_authors(query, joined=False):
+    """
+    Paylaşımların yazar hesabını ve kulübünü aynı sorguda yükler.
+    joined=True: sorgu zaten Account ile join edilmişse o join tekrar kullanılır
+    """
+    if joined:
+        return query.options(contains_eager(Post.author).joinedload(Account.club))
+    return query.options(joinedload(Post.author).joinedload(Account.club))
+
+
+def with_post_images(query):
+    """Sayfadaki tüm paylaşımların resimlerini tek bir ek sorguda (IN) yükler"""
+    return query.options(selectinload(Post.images))
+
+
+def with_club_accounts(query):
+    """Account ile join edilmiş kulüp sorgusunda hesap bilgisini aynı satırdan doldurur"""
+    return query.options(contains_eager(Club.account))
+
+
+def with_account_clubs(query):
+    """Hesapların kulüp profillerini aynı sorguda yükler"""
+    return query.options(joinedload(Account.club))
+
+
+def with_feedback_relations(query):
+    """Geri bildirimlerin kulübünü ve gönderen hesabını aynı sorguda yükler"""
+    return query.options(joinedload(Feedback.club), joinedload(Feedback.sender))
+
@@ -0,0 +1,62 @@
+"""
+Arama Yardımcı Modülü
+PostgreSQL tsvector + pg_trgm GIN indeksleri üzerinden kulüp ve paylaşım araması.
+
+Türkçe karakterler hem veritabanında (tr_fold SQL fonksiyonu) hem de burada (fold)
+aynı şekilde katlanır: ı/İ -> i, ş -> s, ğ -> g, ü -> u, ö -> o, ç -> c.
+İndeks ifadeleri ve fonksiyonlar migration ile oluşturulur (search_indexes).
+"""
+import re
+from sqlalchemy import func, or_
+from app.models import Club, Post
+
+# tr_fold SQL fonksiyonuyla birebir aynı eşleme
+_TURKISH_FOLD = str.maketrans('ıİIŞşĞğÜüÖöÇçÂâÎîÛû', 'iiissgguuooccaaiiuu')
+
+
+def fold(text):
+    """Türkçe'ye duyarlı büyük/küçük harf ve aksan katlama"""
+    return (text or '').translate(_TURKISH_FOLD).lower()
+
+
+def _prefix_tsquery(folded):
+    """'yazılım kul' -> 'yazilim:* & kul:*' (kullanıcı girdisi tsquery söz dizimine karışmaz)"""
+    terms = re.findall(r'[a-z0-9]+', folded)
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _like_pattern(folded):
+    escaped = folded.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _search(query, text, document, name):
+    folded = fold(text.strip())
+    conditions = [
+        name.like(_like_pattern(folded), escape='\\'),  # trigram indeksi kullanılır
+        name.op('%')(folded)                             # yazım hatalarına tolerans
+    ]
+    rank = func.similarity(name, folded)
+
+    tsquery_text = _prefix_tsquery(folded)
+    if tsquery_text:
+        tsquery = func.to_tsquery('simple', tsquery_text)
+        conditions.append(document.op('@@')(tsquery))
+        rank = rank + func.ts_rank(document, tsquery)
+
+    return query.filter(or_(*conditions)), rank
+
+
+def search_clubs(query, text):
+    """
+    Kulüp sorgusuna ad/hakkında/konum araması ekler.
+    (filtrelenmiş sorgu, alaka puanı ifadesi) döndürür; sıralama çağıran tarafa aittir
+    """
+    document = func.club_search_document(Club.name, Club.about, Club.location)
+    return _search(query, text, document, func.tr_fold(Club.name))
+
+
+def search_posts(query, text):
+    """Paylaşım sorgusuna başlık/içerik araması ekler, (sorgu, alaka puanı) döndürür"""
+    document = func.post_search_document(Post.title, Post.content)
+    return _search(query, text, document, func.tr_fold(Post.title))
@@ -0,0 +1,202 @@
+"""
+Dosya Depolama Modülü
+Yüklemeler diske yazılırken SHA-256 özeti hesaplanır ve dosya içerik adresli,
+parçalı bir yolda saklanır: 'post_images/ab/cd/abcd...ef.jpg'. Aynı dosya ikinci kez
+yüklendiğinde yeniden yazılmaz, stored_files tablosundaki referans sayısı artar.
+Son referans kalkınca dosya ve varyantları silinir.
+
+Depolama arka ucu değiştirilebilir (STORAGE_BACKEND):
+- 'local': UPLOAD_FOLDER altında dosya sistemi
+- 's3': S3 uyumlu nesne deposu (boto3 istemcisi; MinIO gibi yerel bir kopyayla denenebilir)
+"""
+import glob
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from flask import current_app, url_for
+from werkzeug.utils import secure_filename
+from app import db
+from app.models import StoredFile
+
+CHUNK_SIZE = 64 * 1024
+
+
+class LocalStorage:
+    """UPLOAD_FOLDER altında dosya sistemi"""
+
+    def __init__(self, app):
+        self.root = app.config['UPLOAD_FOLDER']
+        # Geçici dosyalar aynı dosya sisteminde olsun ki taşıma atomik (rename) olsun
+        self.tmp_dir = os.path.join(self.root, '.tmp')
+
+    def _path(self, key):
+        return os.path.join(self.root, key)
+
+    def temp_file(self):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self.tmp_dir, delete=False)
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def put_file(self, key, temp_path):
+        """Geçici dosyayı anahtarın yerine taşır"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+
+    def put(self, key, fileobj):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.temp_file() as temp:
+            shutil.copyfileobj(fileobj, temp)
+        os.replace(temp.name, path)
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def list(self, prefix):
+        return [os.path.relpath(path, self.root).replace(os.sep, '/')
+                for path in glob.glob(glob.escape(self._path(prefix)) + '*')]
+
+    def url(self, key):
+        return url_for('static', filename='uploads/' + key)
+
+
+class S3Storage:
+    """S3 uyumlu nesne deposu (put_object / get_object / head_object / delete_object)"""
+
+    def __init__(self, app, client=None):
+        if client is None:
+            import boto3
+            client = boto3.client('s3', endpoint_url=app.config.get('STORAGE_S3_ENDPOINT'))
+        self.client = client
+        self.bucket = app.config['STORAGE_S3_BUCKET']
+        self.base_url = app.config['STORAGE_PUBLIC_URL'].rstrip('/')
+
+    def temp_file(self):
+        return tempfile.NamedTemporaryFile(delete=False)
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self.client.exceptions.ClientError:
+            return False
+
+    def put_file(self, key, temp_path):
+        with open(temp_path, 'rb') as f:
+            self.put(key, f)
+        os.remove(temp_path)
+
+    def put(self, key, fileobj):
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=fileobj)
+
+    def open(self, key):
+        # Pillow geri sarılabilir (seek) bir dosya ister
+        body = self.client.get_object(Bucket=self.bucket, Key=key)['Body']
+        return io.BytesIO(body.read())
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def list(self, prefix):
+        response = self.client.list_objects_v2(Bucket=self.bucket, Prefix=prefix)
+        return [item['Key'] for item in response.get('Contents', [])]
+
+    def url(self, key):
+        return f"{self.base_url}/{key}"
+
+
+BACKENDS = {
+    'local': LocalStorage,
+    's3': S3Storage,
+}
+
+
+def init_storage(app):
+    """Yapılandırmadaki STORAGE_BACKEND'e göre depolama arka ucunu oluşturur"""
+    backend_class = BACKENDS[app.config.get('STORAGE_BACKEND', 'local')]
+    app.extensions['storage'] = backend_class(app)
+    app.jinja_env.globals['upload_url'] = upload_url
+
+
+def get_storage():
+    return current_app.extensions['storage']
+
+
+def upload_url(key):
+    """Şablonlar için yüklenen dosyanın adresi"""
+    return get_storage().url(key)
+
+
+def content_key(folder, digest, filename):
+    """'post_images', 'abcdef...', 'afiş.JPG' -> 'post_images/ab/cd/abcdef....jpg'"""
+    ext = os.path.splitext(secure_filename(filename))[1].lower()
+    return f"{folder}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+
+def save_upload(file, folder):
+    """
+    Yüklenen dosyayı özetini hesaplayarak kaydeder, anahtarını (yolunu) döndürür.
+    Referans çağıranın transaction'ında artar, commit çağıran tarafta yapılır.
+    """
+    if not file:
+        return None
+
+    storage = get_storage()
+    digest = hashlib.sha256()
+    size = 0
+    with storage.temp_file() as temp:
+        while True:
+            chunk = file.stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            temp.write(chunk)
+            size += len(chunk)
+
+    key = content_key(folder, digest.hexdigest(), file.filename)
+    # Önce referans alınır: aynı anda son referansı bırakan istek satır kilidinde bekler
+    StoredFile.acquire(key, size)
+    if storage.exists(key):
+        os.remove(temp.name)  # Aynı içerik zaten var
+    else:
+        storage.put_file(key, temp.name)
+    return key
+
+
+def _remove_files(key):
+    """Dosyayı ve varyantlarını depodan siler"""
+    storage = get_storage()
+    try:
+        storage.delete(key)
+        folder, filename = key.rsplit('/', 1)
+        stem = os.path.splitext(filename)[0]
+        for variant in storage.list(f"{folder}/variants/{stem}_"):
+            storage.delete(variant)
+    except Exception as e:
+        print(f"Resim silinirken hata: {e}")
+
+
+def delete_upload(*keys):
+    """
+    Referansları çağıranın transaction'ında bırakır, başka kayıt kullanmayan dosyaların
+    anahtarlarını döndürür. Dosyalar commit'ten sonra remove_uploads ile silinmelidir;
+    commit başarısız olursa dosya yerinde kalır
+    """
+    return StoredFile.release(*(key for key in keys if key))
+
+
+def remove_uploads(keys):
+    """delete_upload'un döndürdüğü dosyaları ve varyantlarını siler (commit'ten sonra)"""
+    for key in keys:
+        _remove_files(key)
@@ -0,0 +1,35 @@
+"""
+Giriş Yapmış Kullanıcı Önbelleği
+Her istekte Account ve Club için ayrı sorgu atılmasın diye hesabın kulübüyle birlikte
+kısa süreli bir kopyası tutulur. Kopya her istekte session'a sorgusuz (merge load=False) bağlanır.
+"""
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Account
+from app.utils.cache import TTLCache
+
+_accounts = TTLCache()
+
+
+def load_account(account_id):
+    """Hesabı (kulübüyle birlikte) önbellekten veya tek bir join sorgusuyla yükler"""
+    if not current_app.config.get('USER_CACHE_ENABLED', True):
+        return db.session.get(Account, account_id)
+
+    cached = _accounts.get(account_id)
+    if cached is None:
+        account = db.session.get(Account, account_id, options=[joinedload(Account.club)])
+        if account is None:
+            return None
+        # Session'dan ayrılan nesne önbellekte kalır, istek kendi kopyasıyla çalışır
+        db.session.expunge(account)
+        _accounts.set(account_id, account, ttl=current_app.config.get('USER_CACHE_TTL', 30))
+        cached = account
+
+    return db.session.merge(cached, load=False)
+
+
+def invalidate_account(account_id):
+    """Hesap veya kulübü değiştiğinde çağrılır (commit'ten sonra)"""
+    _accounts.delete(account_id)
@@ -1,30 +1,192 @@
-"""Hava Durumu Yardımcı Modülü"""
-import requests
+"""
+Hava Durumu Yardımcı Modülü
+Sonuçlar şehir bazında worker belleğinde tutulur. Süresi dolan kayıt hemen döndürülür
+ve arka planda yenilenir (stale-while-revalidate), böylece yavaş bir API isteği
+WSGI worker'ını bekletmez. Art arda hatalarda devre kesici API'yi bir süre rahat bırakır.
+Sadece WEATHER_CITIES listesindeki şehirler sorulabilir; API'nin 4xx cevapları (örn.
+bilinmeyen şehir) devre kesiciyi tetiklemez, kısa süreliğine hata olarak önbelleğe alınır.
+"""
 import os
-from flask import current_app
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from app.utils.search import fold
+
+
+class CircuitBreaker:
+    """Belirli sayıda art arda hatadan sonra bekleme süresi boyunca isteği engeller"""
+
+    def __init__(self, threshold=3, cooldown=60):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # Bekleme süresi dolduysa bir deneme isteğine izin ver (yarı açık)
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class WeatherService:
+
+    def __init__(self):
+        self._app = None
+        self._session = None
+        self.default_city = 'Trabzon'
+        self._cities = {}         # katlanmış ad -> şehir adı (izin verilen şehirler)
+        self._entries = {}        # şehir -> (son geçerlilik zamanı, veri)
+        self._refreshing = set()  # arka planda yenilenen şehirler
+        self._lock = threading.Lock()
+        self.breaker = CircuitBreaker()
+
+    def init_app(self, app):
+        self._app = app
+        app.extensions['weather'] = self
+        self.breaker = CircuitBreaker(app.config.get('WEATHER_FAILURE_THRESHOLD', 3),
+                                      app.config.get('WEATHER_COOLDOWN', 60))
+
+        # Bağlantılar (TCP/TLS) istekler arasında yeniden kullanılsın
+        pool_size = app.config.get('WEATHER_POOL_SIZE', 4)
+        self._session = requests.Session()
+        self._session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+
+        self.default_city = app.config.get('WEATHER_CITY', 'Trabzon')
+        cities = [self.default_city, *app.config.get('WEATHER_CITIES', ())]
+        self._cities = {fold(city): city for city in cities}
+
+        # İzin verilen şehirler ilk ziyaretçiden önce ısıtılır
+        if self._api_key():
+            for city in self._cities.values():
+                self.refresh_async(city)
+
+    def _api_key(self):
+        return os.environ.get('WEATHER_API_KEY') or self._app.config.get('WEATHER_API_KEY')
 
+    def resolve_city(self, city):
+        """'trabzon ', 'TRABZON' -> 'Trabzon'; listede olmayan şehir için None"""
+        return self._cities.get(fold(city or '').strip())
 
-def get_weather_data(city="Trabzon"):
-    """Hava durumu verilerini çeker"""
-    api_key = os.environ.get('WEATHER_API_KEY') or current_app.config.get('WEATHER_API_KEY')
-    
-    
-    if api_key:
+    @staticmethod
+    def _error(city, message):
+        return {'city': city, 'error': message}
+
+    def _store(self, city, data, ttl):
+        maxsize = self._app.config.get('WEATHER_CACHE_MAXSIZE', 64)
+        with self._lock:
+            if len(self._entries) >= maxsize and city not in self._entries:
+                oldest = min(self._entries, key=lambda c: self._entries[c][0])
+                del self._entries[oldest]
+            self._entries[city] = (time.monotonic() + ttl, data)
+
+    def _fetch(self, city):
+        """API'den veriyi çeker, hata durumunda exception fırlatır"""
+        config = self._app.config
+        params = {'q': f"{city},TR", 'appid': self._api_key(), 'units': 'metric', 'lang': 'tr'}
+        response = self._session.get(config.get('WEATHER_API_URL'), params=params,
+                                     timeout=config.get('WEATHER_TIMEOUT', 3))
+        response.raise_for_status()
+        data = response.json()
+        return {
+            'city': data.get('name', city),
+            'temperature': round(data['main']['temp']),
+            'description': data['weather'][0]['description'].title(),
+            'icon': data['weather'][0]['icon'],
+            'humidity': data['main']['humidity'],
+            'wind_speed': round(data.get('wind', {}).get('speed', 0) * 3.6),
+            'error': None
+        }
+
+    def _update(self, city):
+        """Veriyi çekip önbelleğe yazar, başarısızsa None döndürür (eski kayıt korunur)"""
+        if not self.breaker.allow():
+            return None
+        config = self._app.config
         try:
-            url = "http://api.openweathermap.org/data/2.5/weather"
-            params = {'q': f"{city},TR", 'appid': api_key, 'units': 'metric', 'lang': 'tr'}
-            response = requests.get(url, params=params, timeout=5)  #Hedef sunucuya bir HTTP GET isteği gönderir.
-            response.raise_for_status() #anında bir HTTPError exception fırlatır ve programı güvenli bir şekilde except bloğuna yönlendirir.
-            data = response.json() #ham metni (JSON formatı), Python'ın kolayca okuyabileceği bir Dictionary yapısına dönüştürür.
-            return {
-                'city': data.get('name', city),
-                'temperature': round(data['main']['temp']),
-                'description': data['weather'][0]['description'].title(),
-                'icon': data['weather'][0]['icon'],
-                'humidity': data['main']['humidity'],
-                'wind_speed': round(data.get('wind', {}).get('speed', 0) * 3.6),
-                'error': None
-            }
-        except:
-            pass
-    
\ No newline at end of file
+            data = self._fetch(city)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is None or status >= 500 or status == 429:
+                self.breaker.record_failure()
+                self._app.logger.warning(f"Weather API error ({city}): {str(e)}")
+                return None
+            # İstemci hatası (bilinmeyen şehir, geçersiz anahtar): API ayakta, devre açılmaz,
+            # aynı şehir her istekte yeniden sorulmasın diye hata kısa süre önbellekte kalır
+            self.breaker.record_success()
+            self._app.logger.warning(f"Weather API rejected request ({city}): {status}")
+            data = self._error(city, 'Hava durumu alınamadı')
+            self._store(city, data, config.get('WEATHER_NEGATIVE_TTL', 300))
+            return data
+        except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+            self.breaker.record_failure()
+            self._app.logger.warning(f"Weather API error ({city}): {str(e)}")
+            return None
+
+        self.breaker.record_success()
+        self._store(city, data, config.get('WEATHER_CACHE_TTL', 600))
+        return data
+
+    def refresh_async(self, city):
+        with self._lock:
+            if city in self._refreshing:
+                return
+            self._refreshing.add(city)
+
+        def run():
+            try:
+                self._update(city)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(city)
+
+        threading.Thread(target=run, daemon=True, name='weather-refresh').start()
+
+    def get(self, city):
+        if not self._api_key():
+            return self._error(city, 'API anahtarı tanımlı değil')
+
+        resolved = self.resolve_city(city)
+        if resolved is None:
+            return self._error(city, 'Bu şehir için hava durumu sunulmuyor')
+        city = resolved
+
+        with self._lock:
+            entry = self._entries.get(city)
+
+        if entry is not None:
+            expires_at, data = entry
+            if time.monotonic() > expires_at:
+                # Eski veri hemen döner, yenisi arka planda alınır (API hatasında eski veri kalır)
+                self.refresh_async(city)
+            return data
+
+        # Soğuk önbellek: ilk istek beklemek zorunda (devre açıksa beklemeden hata)
+        data = self._update(city)
+        return data or self._error(city, 'Hava durumu alınamadı')
+
+
+weather_service = WeatherService()
+
+
+def get_weather_data(city=None):
+    """Hava durumu verilerini döndürür (önbellekten), şehir verilmezse WEATHER_CITY"""
+    return weather_service.get(city or weather_service.default_city)
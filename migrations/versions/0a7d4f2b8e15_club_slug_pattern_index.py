@@ -0,0 +1,25 @@
+"""Slug önek aramaları için varchar_pattern_ops indeksi
+
+Revision ID: 0a7d4f2b8e15
+Revises: f2c6e8a4d791
+Create Date: 2026-10-17 14:26:31.809472
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7d4f2b8e15'
+down_revision = 'f2c6e8a4d791'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_clubs_slug_pattern', 'clubs', ['slug'], unique=False,
+                    postgresql_ops={'slug': 'varchar_pattern_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_clubs_slug_pattern', table_name='clubs')
@@ -0,0 +1,57 @@
+"""Kulüp ve paylaşım araması için tsvector/pg_trgm GIN indeksleri
+
+Revision ID: 1b9e6c3f7a52
+Revises: 0a7d4f2b8e15
+Create Date: 2026-10-17 15:08:12.273940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b9e6c3f7a52'
+down_revision = '0a7d4f2b8e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Türkçe katlama: app/utils/search.py içindeki fold() ile aynı eşleme
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tr_fold(text) RETURNS text AS $$
+            SELECT lower(translate($1, 'ıİIŞşĞğÜüÖöÇçÂâÎîÛû', 'iiissgguuooccaaiiuu'))
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION club_search_document(name text, about text, location text)
+        RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('simple', tr_fold(coalesce(name, ''))), 'A') ||
+                   setweight(to_tsvector('simple', tr_fold(coalesce(location, ''))), 'B') ||
+                   setweight(to_tsvector('simple', tr_fold(coalesce(about, ''))), 'C')
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION post_search_document(title text, content text)
+        RETURNS tsvector AS $$
+            SELECT setweight(to_tsvector('simple', tr_fold(coalesce(title, ''))), 'A') ||
+                   setweight(to_tsvector('simple', tr_fold(coalesce(content, ''))), 'B')
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+    """)
+
+    op.execute("CREATE INDEX ix_clubs_search_document ON clubs USING gin (club_search_document(name, about, location))")
+    op.execute("CREATE INDEX ix_clubs_name_trgm ON clubs USING gin (tr_fold(name) gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_posts_search_document ON posts USING gin (post_search_document(title, content))")
+    op.execute("CREATE INDEX ix_posts_title_trgm ON posts USING gin (tr_fold(title) gin_trgm_ops)")
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_posts_title_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_posts_search_document")
+    op.execute("DROP INDEX IF EXISTS ix_clubs_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_clubs_search_document")
+    op.execute("DROP FUNCTION IF EXISTS post_search_document(text, text)")
+    op.execute("DROP FUNCTION IF EXISTS club_search_document(text, text, text)")
+    op.execute("DROP FUNCTION IF EXISTS tr_fold(text)")
@@ -0,0 +1,36 @@
+"""Kulüplere post_count sayacı
+
+Revision ID: 2c8f1a6d4b93
+Revises: 1b9e6c3f7a52
+Create Date: 2026-10-17 16:02:45.631208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c8f1a6d4b93'
+down_revision = '1b9e6c3f7a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('clubs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE clubs SET post_count = (
+            SELECT count(*) FROM posts WHERE posts.account_id = clubs.account_id
+        )
+    """)
+
+    with op.batch_alter_table('clubs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_clubs_post_count'), ['post_count'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('clubs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_clubs_post_count'))
+        batch_op.drop_column('post_count')
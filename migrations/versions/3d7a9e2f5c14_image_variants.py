@@ -0,0 +1,32 @@
+"""Logo ve paylaşım resimleri için varyant bilgisi
+
+Revision ID: 3d7a9e2f5c14
+Revises: 2c8f1a6d4b93
+Create Date: 2026-10-17 16:41:09.275314
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d7a9e2f5c14'
+down_revision = '2c8f1a6d4b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('clubs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('logo_variants', sa.JSON(), nullable=True))
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('image_variants')
+
+    with op.batch_alter_table('clubs', schema=None) as batch_op:
+        batch_op.drop_column('logo_variants')
@@ -0,0 +1,26 @@
+"""Paylaşım akışı için (created_at, id) indeksi
+
+Revision ID: 3f1c9a7d2e64
+Revises: b30de148ca0c
+Create Date: 2026-10-17 10:12:40.182311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2e64'
+down_revision = 'b30de148ca0c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index('ix_posts_created_at_id', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_posts_created_at_id')
@@ -0,0 +1,76 @@
+"""Paylaşım resimleri için post_images tablosu
+
+Revision ID: 4e1b8c6a0d27
+Revises: 3d7a9e2f5c14
+Create Date: 2026-10-17 17:12:53.804117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e1b8c6a0d27'
+down_revision = '3d7a9e2f5c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('post_images',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('post_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('bytes', sa.Integer(), nullable=True),
+        sa.Column('variants', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('post_images', schema=None) as batch_op:
+        batch_op.create_index('ix_post_images_post_position', ['post_id', 'position'], unique=False)
+
+    # Virgülle birleştirilmiş yolları sırasıyla satırlara böl, üretilmiş varyantları taşı
+    op.execute("""
+        INSERT INTO post_images (post_id, position, path, width, height, variants, created_at)
+        SELECT p.id, t.ord - 1, btrim(t.path),
+               (p.image_variants -> btrim(t.path) ->> 'width')::int,
+               (p.image_variants -> btrim(t.path) ->> 'height')::int,
+               p.image_variants -> btrim(t.path),
+               p.created_at
+        FROM posts p
+        CROSS JOIN LATERAL unnest(string_to_array(p.image, ',')) WITH ORDINALITY AS t(path, ord)
+        WHERE p.image IS NOT NULL AND btrim(t.path) <> ''
+    """)
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('image_variants')
+        batch_op.drop_column('image')
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('image_variants', sa.JSON(), nullable=True))
+
+    op.execute("""
+        UPDATE posts SET
+            image = i.paths,
+            image_variants = i.variants
+        FROM (
+            SELECT post_id,
+                   string_agg(path, ',' ORDER BY position) AS paths,
+                   json_object_agg(path, variants) FILTER (WHERE variants IS NOT NULL) AS variants
+            FROM post_images
+            GROUP BY post_id
+        ) AS i
+        WHERE posts.id = i.post_id
+    """)
+
+    with op.batch_alter_table('post_images', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_images_post_position')
+
+    op.drop_table('post_images')
@@ -0,0 +1,42 @@
+"""Yüklenen dosyalar için referans sayacı
+
+Revision ID: 5f2c9d7b1e38
+Revises: 4e1b8c6a0d27
+Create Date: 2026-10-17 17:48:21.552907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2c9d7b1e38'
+down_revision = '4e1b8c6a0d27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stored_files',
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('refs', sa.Integer(), nullable=False),
+        sa.Column('bytes', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+    # Mevcut dosyalar eski (düz klasör) yollarında kalır, referansları sayılır
+    op.execute("""
+        INSERT INTO stored_files (key, refs, created_at)
+        SELECT path, count(*), now()
+        FROM (
+            SELECT logo AS path FROM clubs WHERE logo IS NOT NULL
+            UNION ALL
+            SELECT path FROM post_images
+        ) AS refs
+        GROUP BY path
+    """)
+
+
+def downgrade():
+    op.drop_table('stored_files')
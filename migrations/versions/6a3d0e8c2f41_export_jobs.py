@@ -0,0 +1,50 @@
+"""Arka plan dışa aktarma işleri
+
+Revision ID: 6a3d0e8c2f41
+Revises: 5f2c9d7b1e38
+Create Date: 2026-10-17 18:34:09.271846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a3d0e8c2f41'
+down_revision = '5f2c9d7b1e38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('export_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('file_type', sa.String(length=10), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('processed', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('path', sa.String(length=255), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['requested_by'], ['accounts.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.create_index('uq_export_jobs_active_fingerprint', ['fingerprint'], unique=True,
+                              postgresql_where=sa.text("status IN ('pending', 'running')"))
+        batch_op.create_index('ix_export_jobs_expires_at', ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_export_jobs_expires_at')
+        batch_op.drop_index('uq_export_jobs_active_fingerprint')
+
+    op.drop_table('export_jobs')
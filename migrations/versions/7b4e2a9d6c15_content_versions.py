@@ -0,0 +1,34 @@
+"""Herkese açık sayfalar için sürüm sayaçları ve kulüp paylaşımları indeksi
+
+Revision ID: 7b4e2a9d6c15
+Revises: 6a3d0e8c2f41
+Create Date: 2026-10-17 21:02:37.418203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b4e2a9d6c15'
+down_revision = '6a3d0e8c2f41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('content_versions',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index('ix_posts_account_id_created_at', ['account_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_posts_account_id_created_at')
+
+    op.drop_table('content_versions')
@@ -0,0 +1,39 @@
+"""Paylaşımlara is_public görünürlük kolonu
+
+Revision ID: 8b2e5d41c0a7
+Revises: 3f1c9a7d2e64
+Create Date: 2026-10-17 11:03:52.640918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e5d41c0a7'
+down_revision = '3f1c9a7d2e64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_public', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    # Mevcut paylaşımlar: admin veya onaylı kulüp hesaplarınınkiler herkese açık
+    op.execute("""
+        UPDATE posts SET is_public = true
+        WHERE account_id IN (
+            SELECT id FROM accounts
+            WHERE account_type = 'admin' OR is_approved = true
+        )
+    """)
+
+    op.create_index('ix_posts_is_public_created_at', 'posts',
+                    ['is_public', sa.text('created_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_posts_is_public_created_at', table_name='posts')
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('is_public')
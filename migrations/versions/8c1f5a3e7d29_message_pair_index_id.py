@@ -0,0 +1,28 @@
+"""Sohbet geçmişi indeksine id eklendi: (sender_id, recipient_id, created_at, id)
+
+Revision ID: 8c1f5a3e7d29
+Revises: 7b4e2a9d6c15
+Create Date: 2026-10-17 22:14:51.283406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1f5a3e7d29'
+down_revision = '7b4e2a9d6c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_pair_created_at')
+        batch_op.create_index('ix_messages_pair_created_at', ['sender_id', 'recipient_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_pair_created_at')
+        batch_op.create_index('ix_messages_pair_created_at', ['sender_id', 'recipient_id', 'created_at'], unique=False)
@@ -0,0 +1,38 @@
+"""Gelen kutusu indeksleri: (account_x_id, last_activity_at, id) ve clubs.account_id
+
+Revision ID: 9e3c7b5a1f48
+Revises: 8c1f5a3e7d29
+Create Date: 2026-10-17 23:05:12.417936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e3c7b5a1f48'
+down_revision = '8c1f5a3e7d29'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_a_activity')
+        batch_op.drop_index('ix_conversations_b_activity')
+        batch_op.create_index('ix_conversations_a_activity', ['account_a_id', 'last_activity_at', 'id'], unique=False)
+        batch_op.create_index('ix_conversations_b_activity', ['account_b_id', 'last_activity_at', 'id'], unique=False)
+
+    with op.batch_alter_table('clubs', schema=None) as batch_op:
+        batch_op.create_index('ix_clubs_account_id', ['account_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('clubs', schema=None) as batch_op:
+        batch_op.drop_index('ix_clubs_account_id')
+
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_b_activity')
+        batch_op.drop_index('ix_conversations_a_activity')
+        batch_op.create_index('ix_conversations_a_activity', ['account_a_id', 'last_activity_at'], unique=False)
+        batch_op.create_index('ix_conversations_b_activity', ['account_b_id', 'last_activity_at'], unique=False)
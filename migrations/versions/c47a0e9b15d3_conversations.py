@@ -0,0 +1,48 @@
+"""Gelen kutusu için conversations tablosu
+
+Revision ID: c47a0e9b15d3
+Revises: 8b2e5d41c0a7
+Create Date: 2026-10-17 11:48:20.357104
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47a0e9b15d3'
+down_revision = '8b2e5d41c0a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_a_id', sa.Integer(), nullable=False),
+    sa.Column('account_b_id', sa.Integer(), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_sender_id', sa.Integer(), nullable=True),
+    sa.Column('last_preview', sa.String(length=200), nullable=True),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=True),
+    sa.Column('unread_a', sa.Integer(), nullable=False),
+    sa.Column('unread_b', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['account_a_id'], ['accounts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['account_b_id'], ['accounts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['last_message_id'], ['messages.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('account_a_id', 'account_b_id', name='uq_conversations_pair')
+    )
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.create_index('ix_conversations_a_activity', ['account_a_id', 'last_activity_at'], unique=False)
+        batch_op.create_index('ix_conversations_b_activity', ['account_b_id', 'last_activity_at'], unique=False)
+
+    # Mevcut mesajlardan özetleri doldurmak için: flask rebuild-conversations
+
+
+def downgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_b_activity')
+        batch_op.drop_index('ix_conversations_a_activity')
+
+    op.drop_table('conversations')
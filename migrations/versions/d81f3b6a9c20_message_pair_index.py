@@ -0,0 +1,26 @@
+"""Sohbet geçmişi için (sender_id, recipient_id, created_at) indeksi
+
+Revision ID: d81f3b6a9c20
+Revises: c47a0e9b15d3
+Create Date: 2026-10-17 12:21:07.904415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f3b6a9c20'
+down_revision = 'c47a0e9b15d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_messages_pair_created_at', ['sender_id', 'recipient_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_pair_created_at')
@@ -0,0 +1,28 @@
+"""Okunmamış mesaj ve geri bildirimler için kısmi indeksler
+
+Revision ID: e5a92c07b3f8
+Revises: d81f3b6a9c20
+Create Date: 2026-10-17 12:52:44.116290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a92c07b3f8'
+down_revision = 'd81f3b6a9c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_messages_unread', 'messages', ['recipient_id', 'sender_id'],
+                    unique=False, postgresql_where=sa.text('is_read = false'))
+    op.create_index('ix_feedbacks_unread', 'feedbacks', ['club_id'],
+                    unique=False, postgresql_where=sa.text('is_read = false'))
+
+
+def downgrade():
+    op.drop_index('ix_feedbacks_unread', table_name='feedbacks')
+    op.drop_index('ix_messages_unread', table_name='messages')
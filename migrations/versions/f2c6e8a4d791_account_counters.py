@@ -0,0 +1,43 @@
+"""Hesap başına bildirim sayaçları
+
+Revision ID: f2c6e8a4d791
+Revises: e5a92c07b3f8
+Create Date: 2026-10-17 13:40:18.552063
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6e8a4d791'
+down_revision = 'e5a92c07b3f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('account_counters',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('unread_messages', sa.Integer(), nullable=False),
+    sa.Column('unread_feedbacks', sa.Integer(), nullable=False),
+    sa.Column('total_feedbacks', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('account_id')
+    )
+
+    # Mevcut veriler için sayaçları doldur
+    op.execute("""
+        INSERT INTO account_counters (account_id, unread_messages, unread_feedbacks, total_feedbacks)
+        SELECT a.id,
+               (SELECT count(*) FROM messages m WHERE m.recipient_id = a.id AND m.is_read = false),
+               (SELECT count(*) FROM feedbacks f JOIN clubs c ON c.id = f.club_id
+                 WHERE c.account_id = a.id AND f.is_read = false),
+               (SELECT count(*) FROM feedbacks f JOIN clubs c ON c.id = f.club_id
+                 WHERE c.account_id = a.id)
+        FROM accounts a
+    """)
+
+
+def downgrade():
+    op.drop_table('account_counters')
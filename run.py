@@ -1,7 +1,9 @@
 
 import os
+import click
 from app import create_app, db
-from app.models import Account, Club, Post, Message, Feedback
+from app.models import (Account, Club, Post, PostImage, Message, Feedback, Conversation,
+                        AccountCounter, StoredFile, ExportJob)
 
 # Flask uygulamasını oluştur
 app = create_app()
@@ -18,8 +20,13 @@ def make_shell_context():
         'Account': Account,
         'Club': Club,
         'Post': Post,
+        'PostImage': PostImage,
+        'StoredFile': StoredFile,
+        'ExportJob': ExportJob,
         'Message': Message,
-        'Feedback': Feedback
+        'Feedback': Feedback,
+        'Conversation': Conversation,
+        'AccountCounter': AccountCounter
     }
 
 #Fonksiyonu normal bir Python fonksiyonu olmaktan çıkarır
@@ -123,13 +130,15 @@ def create_sample_data():
     post1 = Post(
         account_id=admin.id,
         title='Bahar Şenliği Duyurusu',
-        content='Üniversitemizin geleneksel Bahar Şenliği 15 Mayıs tarihinde düzenlenecektir. Tüm öğrencilerimizi bekliyoruz!'
+        content='Üniversitemizin geleneksel Bahar Şenliği 15 Mayıs tarihinde düzenlenecektir. Tüm öğrencilerimizi bekliyoruz!',
+        is_public=True
     )
     
     post2 = Post(
         account_id=club_account1.id,
         title='Hackathon 2024 Kayıtları Başladı',
-        content='24 saatlik hackathon etkinliğimiz için kayıtlar başlamıştır. Ödüllü yarışmaya katılmak için son kayıt tarihi 1 Haziran.'
+        content='24 saatlik hackathon etkinliğimiz için kayıtlar başlamıştır. Ödüllü yarışmaya katılmak için son kayıt tarihi 1 Haziran.',
+        is_public=club_account1.can_post()
     )
     
     # Örnek Geri Bildirim (Feedback)
@@ -141,6 +150,8 @@ def create_sample_data():
     )
     
     db.session.add_all([post1, post2, feedback])
+    Club.adjust_post_count(club_account1.id, 1)
+    AccountCounter.bump(club_account1.id, unread_feedbacks=1, total_feedbacks=1)
     db.session.commit()
     
     print("✅ Örnek veriler oluşturuldu!")
@@ -150,6 +161,80 @@ def create_sample_data():
     print("   Kulüp 2: muzik-kulubu / 12345 (Onay bekliyor)")
 
 
+@app.cli.command()
+def rebuild_conversations():
+    """
+    Sohbet özetlerini mevcut mesajlardan yeniden oluştur
+    Kullanım: flask rebuild-conversations
+    """
+    print("🔄 Sohbet özetleri yeniden oluşturuluyor...")
+    count = Conversation.rebuild()
+    print(f"✅ {count} sohbet özeti oluşturuldu!")
+
+
+@app.cli.command()
+def repair_counters():
+    """
+    Bildirim sayaçlarını mesaj ve geri bildirimlerden yeniden hesapla
+    Kullanım: flask repair-counters
+    """
+    print("🔧 Bildirim sayaçları kontrol ediliyor...")
+    fixed = AccountCounter.repair()
+    print(f"✅ {fixed} hesabın sayaçları düzeltildi!")
+
+
+@app.cli.command()
+def reconcile_post_counts():
+    """
+    Kulüplerin paylaşım sayaçlarını posts tablosuyla eşitle
+    Kullanım: flask reconcile-post-counts
+    """
+    print("🔧 Paylaşım sayaçları kontrol ediliyor...")
+    fixed = Club.reconcile_post_counts()
+    print(f"✅ {fixed} kulübün paylaşım sayısı düzeltildi!")
+
+
+@app.cli.command()
+@click.option('--force', is_flag=True, help='Varyantı olan resimleri de yeniden işle')
+def process_images(force):
+    """
+    Mevcut logo ve paylaşım resimlerinin varyantlarını üret
+    Kullanım: flask process-images [--force]
+    """
+    from app.utils.images import process_club_logo, process_post_images
+    
+    print("🖼️  Kulüp logoları işleniyor...")
+    clubs = db.session.query(Club.id).filter(Club.logo.isnot(None))
+    if not force:
+        clubs = clubs.filter(Club.logo_variants.is_(None))
+    club_ids = [club_id for (club_id,) in clubs]
+    for club_id in club_ids:
+        process_club_logo(club_id, force=force)
+    print(f"✅ {len(club_ids)} logo işlendi!")
+    
+    print("🖼️  Paylaşım resimleri işleniyor...")
+    images = db.session.query(PostImage.post_id)
+    if not force:
+        images = images.filter(PostImage.variants.is_(None))
+    post_ids = [post_id for (post_id,) in images.distinct()]
+    for post_id in post_ids:
+        process_post_images(post_id, force=force)
+    print(f"✅ {len(post_ids)} paylaşımın resimleri işlendi!")
+
+
+@app.cli.command()
+def cleanup_exports():
+    """
+    Süresi dolan dışa aktarma dosyalarını sil
+    Kullanım: flask cleanup-exports
+    """
+    from app.utils.export_jobs import cleanup_exports as cleanup
+
+    print("🧹 Süresi dolan dışa aktarmalar siliniyor...")
+    removed = cleanup()
+    print(f"✅ {removed} dışa aktarma silindi!")
+
+
 if __name__ == '__main__':
     #Bu dosya doğrudan çalıştırılıyorsa şu kodu başlat
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
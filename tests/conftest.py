@@ -0,0 +1,109 @@
+"""
+Test Ayarları
+Testler gerçek bir PostgreSQL veritabanına karşı çalışır (TEST_DATABASE_URL, yoksa
+TestingConfig'teki adres). Şema migration'larla kurulur, her testten sonra tablolar
+boşaltılır ve worker başına önbellekler temizlenir.
+"""
+import os
+import pytest
+from flask_migrate import upgrade
+from app import create_app, db
+from app.config import TestingConfig
+from app.models import Account, Club, Post
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    root = tmp_path_factory.mktemp('app')
+    app = create_app(test_config={
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('TEST_DATABASE_URL') or TestingConfig.SQLALCHEMY_DATABASE_URI,
+        'SQLALCHEMY_ECHO': False,
+        'WTF_CSRF_ENABLED': False,
+        'UPLOAD_FOLDER': str(root / 'uploads'),
+        'EXPORT_FOLDER': str(root / 'exports'),
+        'AUTOCOMPLETE_ENABLED': False,
+        'WEATHER_API_KEY': None,
+    })
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+    return app
+
+
+@pytest.fixture
+def clear_caches():
+    """Worker başına önbellekleri (sayfa, rehber, admin sayaçları, oturum hesabı) boşaltır"""
+    from app.utils.admin_stats import admin_stats
+    from app.utils.directory import _directory
+    from app.utils.page_cache import page_cache
+    from app.utils.user_cache import _accounts
+
+    def clear():
+        page_cache.clear()
+        _directory.clear()
+        admin_stats.invalidate()
+        _accounts.clear()
+    return clear
+
+
+@pytest.fixture(autouse=True)
+def _clean_database(app, clear_caches):
+    yield
+    with app.app_context():
+        db.session.remove()
+        tables = ', '.join(table.name for table in db.metadata.sorted_tables)
+        with db.engine.begin() as conn:
+            conn.execute(db.text(f'TRUNCATE {tables} RESTART IDENTITY CASCADE'))
+    clear_caches()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def app_ctx(app):
+    with app.app_context():
+        yield
+        db.session.remove()
+
+
+@pytest.fixture
+def make_club(app_ctx):
+    """Onaylı (varsayılan) bir kulüp hesabı oluşturur, isteğe göre paylaşımlarıyla"""
+    def make(name, approved=True, posts=0, **fields):
+        username = f"club{Account.query.count() + 1}"
+        account = Account(username=username, email=f'{username}@uni.edu.tr',
+                          account_type='club', is_approved=approved, password_hash='-')
+        club = Club(name=name, account=account, post_count=posts, **fields)
+        club.assign_slug()
+        for index in range(posts):
+            db.session.add(Post(author=account, title=f'{name} {index}', content='İçerik',
+                                is_public=approved))
+        db.session.commit()
+        return club
+    return make
+
+
+@pytest.fixture
+def make_admin(app_ctx):
+    def make():
+        admin = Account(username='admin', email='admin@uni.edu.tr', account_type='admin',
+                        is_approved=True, password_hash='-')
+        db.session.add(admin)
+        db.session.commit()
+        return admin
+    return make
+
+
+@pytest.fixture
+def login(client):
+    """Oturumu form yerine doğrudan açar (şifre hash'i testleri yavaşlatmasın)"""
+    def log_in(account):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(account.id)
+            session['_fresh'] = True
+    return log_in
@@ -0,0 +1,39 @@
+"""Admin kulüp silme ve sayaçlar"""
+import pytest
+from app import db
+from app.models import Account, AccountCounter, Message
+
+
+def send(sender, recipient, count=1):
+    for index in range(count):
+        db.session.add(Message(sender_id=sender.account_id, recipient_id=recipient.account_id,
+                               content=f'mesaj {index}'))
+        AccountCounter.bump(recipient.account_id, unread_messages=1)
+    db.session.commit()
+
+
+def unread_messages(club):
+    db.session.expire_all()
+    counter = db.session.get(AccountCounter, club.account_id)
+    return counter.unread_messages if counter else 0
+
+
+@pytest.mark.parametrize('bulk', [False, True])
+def test_club_delete_discounts_recipients_unread_messages(client, make_club, make_admin, login, bulk):
+    deleted = make_club('Müzik Kulübü')
+    reader = make_club('Yazılım Kulübü')
+    other = make_club('Tiyatro Kulübü')
+    send(deleted, reader, 3)
+    send(other, reader, 2)
+    send(reader, deleted)
+    login(make_admin())
+
+    if bulk:
+        response = client.post('/admin/clubs/bulk/delete', data={'ids': [deleted.account_id]})
+    else:
+        response = client.post(f'/admin/club/{deleted.account_id}/delete')
+
+    assert response.status_code == 302
+    assert db.session.get(Account, deleted.account_id) is None
+    assert Message.query.count() == 2
+    assert unread_messages(reader) == 2
@@ -0,0 +1,73 @@
+"""Sohbet geçmişinin ve gelen kutusunun keyset sayfalaması"""
+import re
+from datetime import datetime, timedelta
+from app import db
+from app.models import Conversation, Message
+
+
+def test_history_pages_merge_both_directions(app, client, make_club, login, monkeypatch):
+    monkeypatch.setitem(app.config, 'CHAT_MESSAGES_PER_PAGE', 3)
+    me = make_club('Yazılım Kulübü')
+    partner = make_club('Müzik Kulübü')
+    other = make_club('Tiyatro Kulübü')
+
+    start = datetime(2026, 1, 1, 12, 0)
+    expected = []
+    for index in range(10):
+        sender, recipient = (me, partner) if index % 3 else (partner, me)
+        # Aynı saniyede gönderilen mesajlar id ile sıralanır
+        message = Message(sender_id=sender.account_id, recipient_id=recipient.account_id,
+                          content=f'mesaj {index}', created_at=start + timedelta(seconds=index // 2))
+        db.session.add(message)
+        db.session.flush()
+        expected.append(message.id)
+    db.session.add(Message(sender_id=other.account_id, recipient_id=me.account_id,
+                           content='başka sohbet', created_at=start))
+    db.session.commit()
+    login(me.account)
+
+    seen = []
+    url = f'/club/chat/{partner.slug}/history'
+    while url:
+        page = client.get(url).get_json()
+        # Sayfa içinde eskiden yeniye, sayfalar yeniden eskiye
+        seen = [message['id'] for message in page['messages']] + seen
+        url = f"/club/chat/{partner.slug}/history?before={page['next_cursor']}" if page['has_more'] else None
+
+    assert seen == expected
+
+
+def test_inbox_pages_cover_both_sides_and_skip_partners_without_club(app, client, make_club, make_admin,
+                                                                    login, monkeypatch):
+    monkeypatch.setitem(app.config, 'CONVERSATIONS_PER_PAGE', 3)
+    partners = [make_club(f'Kulüp {index}') for index in range(4)]
+    me = make_club('Yazılım Kulübü')
+    partners += [make_club(f'Kulüp {index}') for index in range(4, 7)]
+    admin = make_admin()  # Kulübü yok, gelen kutusunda görünmez
+
+    start = datetime(2026, 1, 1, 12, 0)
+    expected = []
+    # me bazı sohbetlerde a, bazılarında b tarafında; aynı anda olanlar id ile sıralanır
+    for index, partner_id in enumerate([club.account_id for club in partners] + [admin.id, me.account_id]):
+        a_id, b_id = Conversation.pair(me.account_id, partner_id)
+        conversation = Conversation(account_a_id=a_id, account_b_id=b_id, last_preview=f'mesaj {index}',
+                                    last_activity_at=start + timedelta(minutes=index // 2))
+        db.session.add(conversation)
+        db.session.flush()
+        if partner_id != admin.id:
+            expected.append(conversation.id)
+    db.session.commit()
+    login(me.account)
+
+    pages = []
+    url = '/club/messages'
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        pages.append([int(number) for number in re.findall(r'mesaj (\d+)', html)])
+        older = re.search(r'href="(/club/messages\?before=[^"]+)"', html)
+        url = older.group(1) if older else None
+
+    # Kulübü olmayan karşı taraf sayfalamadan önce elenir, sayfalar eksik kalmaz
+    assert [len(page) for page in pages] == [3, 3, 2]
+    ids = {conversation.last_preview: conversation.id for conversation in Conversation.query}
+    assert [ids[f'mesaj {index}'] for page in pages for index in page] == list(reversed(expected))
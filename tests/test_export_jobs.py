@@ -0,0 +1,131 @@
+"""Arka plan dışa aktarma işleri (biri dışında havuz yerine aynı process'te çalıştırılır)"""
+import os
+import time
+import pytest
+from sqlalchemy import update
+from app import db
+from app.models import ExportJob
+from app.utils import export_jobs
+from app.utils.export_jobs import export_runner, run_export_job
+
+
+def fail_job(job_id):
+    """cleanup_exports'un zaman aşımına uğrayan işi kapatması gibi, ayrı bağlantıda"""
+    table = ExportJob.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(table).where(table.c.id == job_id).values(status='failed', error='Zaman aşımı'))
+
+
+@pytest.fixture
+def submit(app_ctx):
+    def submit_job(file_type='csv'):
+        job, _ = ExportJob.submit('clubs', file_type, {'status': 'all', 'search': ''})
+        db.session.commit()
+        return job.id
+    return submit_job
+
+
+@pytest.fixture
+def export_folder(app):
+    folder = app.config['EXPORT_FOLDER']
+    yield folder
+    for name in os.listdir(folder):
+        os.remove(os.path.join(folder, name))
+
+
+def job_row(job_id):
+    db.session.expire_all()
+    return db.session.get(ExportJob, job_id)
+
+
+@pytest.fixture
+def pool():
+    yield export_runner
+    if export_runner._executor is not None:
+        export_runner._executor.shutdown()
+        export_runner._executor = None
+
+
+def test_pool_worker_uses_the_app_config(make_club, submit, export_folder, pool):
+    """spawn ile açılan process test veritabanına bağlanıp dosyayı test klasörüne yazmalı"""
+    for index in range(3):
+        make_club(f'Kulüp {index}')
+    job_id = submit()
+
+    pool.submit(job_id)
+
+    deadline = time.monotonic() + 60
+    while job_row(job_id).status in ExportJob.ACTIVE:
+        assert time.monotonic() < deadline, 'iş zamanında bitmedi'
+        time.sleep(0.1)
+    job = job_row(job_id)
+    assert (job.status, job.processed) == ('done', 3)
+    assert os.listdir(export_folder) == [job.path]
+
+
+def test_job_writes_file_and_finishes(make_club, submit, export_folder):
+    for index in range(3):
+        make_club(f'Kulüp {index}')
+    job_id = submit()
+
+    run_export_job(job_id)
+
+    job = job_row(job_id)
+    assert (job.status, job.processed, job.total) == ('done', 3, 3)
+    with open(os.path.join(export_folder, job.path), encoding='utf-8-sig') as f:
+        assert f.read().count('\n') == 4
+
+
+def test_cancelled_job_stops_on_progress_update(make_club, submit, export_folder, monkeypatch):
+    for index in range(5):
+        make_club(f'Kulüp {index}')
+    job_id = submit()
+    count, rows = export_jobs.EXPORTERS['clubs']
+
+    def rows_then_cancel(**params):
+        for index, row in enumerate(rows(**params)):
+            if index == 2:
+                fail_job(job_id)
+            yield row
+
+    monkeypatch.setattr(export_jobs, 'PROGRESS_EVERY', 2)
+    monkeypatch.setitem(export_jobs.EXPORTERS, 'clubs', (count, rows_then_cancel))
+
+    run_export_job(job_id)
+
+    job = job_row(job_id)
+    assert (job.status, job.error, job.processed) == ('failed', 'Zaman aşımı', 2)
+    assert os.listdir(export_folder) == []
+
+
+def test_cancelled_job_does_not_overwrite_status_on_finish(make_club, submit, export_folder, monkeypatch):
+    make_club('Kulüp')
+    job_id = submit()
+    count, rows = export_jobs.EXPORTERS['clubs']
+
+    def rows_then_cancel(**params):
+        yield from rows(**params)
+        fail_job(job_id)
+
+    monkeypatch.setitem(export_jobs.EXPORTERS, 'clubs', (count, rows_then_cancel))
+
+    run_export_job(job_id)
+
+    job = job_row(job_id)
+    assert (job.status, job.path) == ('failed', None)
+    assert os.listdir(export_folder) == []
+
+
+def test_error_marks_running_job_failed(submit, monkeypatch):
+    job_id = submit()
+
+    def broken(**params):
+        raise RuntimeError('bozuk')
+        yield
+
+    monkeypatch.setitem(export_jobs.EXPORTERS, 'clubs', (lambda **params: 1, broken))
+
+    run_export_job(job_id)
+
+    job = job_row(job_id)
+    assert (job.status, job.error) == ('failed', 'bozuk')
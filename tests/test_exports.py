@@ -0,0 +1,58 @@
+"""Kulüp listesi dışa aktarma uç noktaları"""
+import io
+import pytest
+
+
+def test_small_pdf_streams_inline(client, make_club, make_admin, login):
+    make_club('Yazılım Kulübü')
+    login(make_admin())
+
+    response = client.get('/admin/clubs/download/pdf')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.get_data().startswith(b'%PDF')
+
+
+@pytest.mark.parametrize('file_type, limit', [('pdf', 'PDF_INLINE_MAX_ROWS'), ('excel', 'EXCEL_INLINE_MAX_ROWS')])
+def test_large_export_is_sent_to_background_job(app, client, make_club, make_admin, login, monkeypatch,
+                                                file_type, limit):
+    monkeypatch.setitem(app.config, limit, 2)
+    for index in range(3):
+        make_club(f'Kulüp {index}')
+    login(make_admin())
+
+    response = client.get(f'/admin/clubs/download/{file_type}?status=approved')
+
+    assert response.status_code == 302
+    assert '/admin/clubs/all' in response.headers['Location']
+    # CSV sınırdan etkilenmez
+    assert client.get('/admin/clubs/download/csv').status_code == 200
+
+
+def test_pdf_is_rendered_in_page_batches(app_ctx, make_club, monkeypatch):
+    from pypdf import PdfReader
+    from app.utils import exports
+
+    monkeypatch.setattr(exports, 'PDF_BATCH_PAGES', 2)
+    rows_per_page = 35
+    rows = ([index, f'Kulüp {index}', '', 'kulup@uni.edu.tr', 'Onaylı', 0, '', '', '2026-01-01 12:00']
+            for index in range(rows_per_page * 5))
+    batches = []
+    original = exports.join_pdfs
+
+    def count_batches(documents):
+        for document in documents:
+            batches.append(len(document))
+            yield document
+
+    monkeypatch.setattr(exports, 'join_pdfs', lambda documents: original(count_batches(documents)))
+
+    reader = PdfReader(io.BytesIO(b''.join(exports.stream_pdf(rows))), strict=True)
+
+    assert len(batches) == 3
+    assert len(reader.pages) == 5
+    assert reader.metadata.title == 'Kulüp Listesi'
+    for number, page in enumerate(reader.pages, 1):
+        assert f'Sayfa {number}' in page.extract_text()
+    assert 'Kulüp 174' in reader.pages[4].extract_text()
@@ -0,0 +1,72 @@
+"""Liste sayfalarının sorgu sayısı satır sayısından bağımsız olmalı (N+1 yok)"""
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models import Feedback, Post
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def add_clubs(make_club, make_admin):
+    """Her çağrıda kulüp, resimli paylaşım ve geri bildirim ekler"""
+    admin = make_admin()
+    admin_id = admin.id
+    created = []
+
+    def add(count):
+        for _ in range(count):
+            index = len(created)
+            club = make_club(f'Kulüp {index}', approved=index % 3 != 0, posts=2,
+                             logo=f'club_logos/{index:02d}.png')
+            for post in Post.query.filter_by(account_id=club.account_id):
+                post.add_images([f'post_images/{post.id}-a.jpg', f'post_images/{post.id}-b.jpg'])
+            db.session.add(Post(account_id=admin_id, title=f'Duyuru {index}', content='İçerik', is_public=True))
+            db.session.add(Feedback(sender_id=admin_id, club_id=club.id, title='Not', content='İçerik'))
+            created.append(club)
+        db.session.commit()
+    return admin, add
+
+
+@pytest.fixture
+def request_queries(client, clear_caches):
+    def request(url):
+        clear_caches()  # Önbellekteki kopya sorguları gizlemesin
+        with count_queries() as statements:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(statements)
+    return request
+
+
+@pytest.mark.parametrize('url', ['/', '/clubs', '/club/kulup-1'])
+def test_public_pages_run_constant_queries(add_clubs, request_queries, url):
+    _, add = add_clubs
+    add(2)
+    few = request_queries(url)
+    add(10)
+    assert request_queries(url) == few
+
+
+@pytest.mark.parametrize('url', ['/admin/dashboard', '/admin/clubs/all', '/admin/clubs/pending',
+                                 '/admin/posts', '/admin/feedbacks'])
+def test_admin_pages_run_constant_queries(add_clubs, request_queries, login, url):
+    admin, add = add_clubs
+    login(admin)
+    add(2)
+    few = request_queries(url)
+    add(10)
+    assert request_queries(url) == few
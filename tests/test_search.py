@@ -0,0 +1,75 @@
+"""Arama: Türkçe katlama ve alaka sıralaması"""
+import pytest
+from app import db
+from app.models import Account, Club, Post
+from app.utils.search import fold, search_clubs
+
+
+@pytest.mark.parametrize('text', [
+    'Yazılım Kulübü',
+    'IŞIK İĞDIR ÇAĞRI',
+    'şölen ğ ç ö ü ı i',
+    'Âşık Veysel Îmar Ûmran',
+    'ÖĞRENCİ TOPLULUĞU',
+    'MiXeD 123 _%\\',
+    '',
+])
+def test_python_fold_matches_sql_tr_fold(app_ctx, text):
+    assert db.session.scalar(db.select(db.func.tr_fold(text))) == fold(text)
+
+
+def club_names(text):
+    query, rank = search_clubs(Club.query.join(Account), text)
+    return [club.name for club in query.order_by(rank.desc(), Club.name)]
+
+
+@pytest.mark.parametrize('query', ['ışık', 'IŞIK', 'Işık', 'isik', 'ISIK'])
+def test_turkish_letters_match_their_folded_form(make_club, query):
+    make_club('Işık Fotoğrafçılık')
+    make_club('Müzik Kulübü')
+
+    assert club_names(query) == ['Işık Fotoğrafçılık']
+
+
+@pytest.mark.parametrize('query', ['çağrı öğrenci şöleni', 'cagri ogrenci soleni', 'ÇAĞRI ÖĞRENCİ', 'ogrenci sol'])
+def test_multi_word_turkish_queries(make_club, query):
+    make_club('Çağrı Öğrenci Şöleni', about='Üniversite günleri')
+    make_club('Satranç Kulübü')
+
+    assert club_names(query) == ['Çağrı Öğrenci Şöleni']
+
+
+def test_ascii_names_match_turkish_queries(make_club):
+    make_club('Gunes Enerjisi Toplulugu')
+
+    assert club_names('Güneş') == ['Gunes Enerjisi Toplulugu']
+
+
+def test_name_match_ranks_above_about_match(make_club):
+    make_club('Doğa Yürüyüşü', about='Kampçılık ve tırmanış etkinlikleri')
+    make_club('Kampçılık Kulübü', about='Doğada hafta sonu etkinlikleri')
+
+    assert club_names('kampçılık') == ['Kampçılık Kulübü', 'Doğa Yürüyüşü']
+
+
+def test_post_title_match_ranks_above_body_match(client, make_club):
+    club = make_club('Yazılım Kulübü')
+    for title, content in [
+        ('Hafta sonu duyurusu', 'Bu hafta yazılım atölyesi ve robotik sunumu var.'),
+        ('Yazılım Atölyesi', 'Kayıtlar başladı.'),
+        ('Konser', 'Müzik kulübü ile ortak etkinlik.'),
+    ]:
+        db.session.add(Post(account_id=club.account_id, title=title, content=content, is_public=True))
+    db.session.commit()
+
+    titles = [post['title'] for post in client.get('/search/posts?q=YAZILIM').get_json()]
+
+    assert titles == ['Yazılım Atölyesi', 'Hafta sonu duyurusu']
+
+
+def test_post_search_skips_hidden_posts(client, make_club):
+    club = make_club('Tiyatro Kulübü', approved=False)
+    db.session.add(Post(account_id=club.account_id, title='Gösteri', content='İçerik', is_public=False))
+    db.session.commit()
+
+    assert client.get('/search/posts?q=gösteri').get_json() == []
@@ -0,0 +1,37 @@
+"""Kulüp slug üretimi"""
+from app import db
+
+
+def rename(club, name):
+    club.name = name
+    club.assign_slug()
+    db.session.commit()
+    return club.slug
+
+
+def test_collisions_get_numbered_suffixes(make_club):
+    slugs = [make_club('Satranç Kulübü').slug for _ in range(3)]
+
+    assert slugs == ['satranc-kulubu', 'satranc-kulubu-1', 'satranc-kulubu-2']
+
+
+def test_collision_suffix_is_kept_on_save(make_club):
+    make_club('Satranç Kulübü')
+    second = make_club('Satranç Kulübü')
+
+    assert rename(second, 'Satranç Kulübü') == 'satranc-kulubu-1'
+
+
+def test_numeric_name_suffix_is_dropped_on_rename(make_club):
+    club = make_club('Kulüp 2024')
+    assert club.slug == 'kulup-2024'
+
+    assert rename(club, 'Kulüp') == 'kulup'
+
+
+def test_suffix_is_regenerated_when_base_is_free(make_club):
+    first = make_club('Müzik Kulübü')
+    second = make_club('Müzik Kulübü')
+    rename(first, 'Caz Kulübü')
+
+    assert rename(second, 'Müzik Kulübü') == 'muzik-kulubu'
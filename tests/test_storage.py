@@ -0,0 +1,134 @@
+import io
+import pytest
+from werkzeug.datastructures import FileStorage
+from app import db
+from app.models import Post, PostImage, StoredFile
+from app.utils.storage import S3Storage, delete_upload, get_storage, remove_uploads, save_upload
+
+
+def upload(data=b'resim', filename='afis.jpg'):
+    return FileStorage(io.BytesIO(data), filename=filename)
+
+
+def test_same_content_is_stored_once(app_ctx):
+    first = save_upload(upload(), 'post_images')
+    second = save_upload(upload(filename='kopya.JPG'), 'post_images')
+    db.session.commit()
+
+    assert first == second
+    assert db.session.get(StoredFile, first).refs == 2
+    assert delete_upload(first) == []  # Diğer referans dosyayı kullanıyor
+
+
+def test_files_survive_a_rolled_back_delete(app_ctx):
+    key = save_upload(upload(), 'post_images')
+    db.session.commit()
+
+    removable = delete_upload(key)
+    db.session.rollback()
+
+    assert removable == [key]
+    assert get_storage().exists(key)
+    assert db.session.get(StoredFile, key).refs == 1
+
+
+def test_post_delete_removes_files_after_commit(client, make_club, login):
+    club = make_club('Yazılım Kulübü')
+    key = save_upload(upload(), 'post_images')
+    post = Post(account_id=club.account_id, title='Afiş', content='İçerik', is_public=True)
+    post.add_images([key])
+    db.session.add(post)
+    db.session.commit()
+    login(club.account)
+
+    response = client.post(f'/club/post/{post.id}/delete')
+
+    assert response.status_code == 302
+    assert Post.query.count() == 0
+    assert PostImage.query.count() == 0
+    assert db.session.get(StoredFile, key) is None
+    assert not get_storage().exists(key)
+
+
+@pytest.fixture
+def s3_storage(app):
+    """Yerel S3 taklidi (moto) üzerinde S3Storage, testte uygulamanın deposu olarak kullanılır"""
+    boto3 = pytest.importorskip('boto3')
+    moto = pytest.importorskip('moto')
+    with moto.mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='uploads')
+        app.config.update(STORAGE_S3_BUCKET='uploads', STORAGE_PUBLIC_URL='https://cdn.example.com/')
+        local = app.extensions['storage']
+        app.extensions['storage'] = S3Storage(app, client=client)
+        try:
+            yield app.extensions['storage']
+        finally:
+            app.extensions['storage'] = local
+
+
+def test_s3_backend_round_trip(app_ctx, s3_storage):
+    key = save_upload(upload(b'logo'), 'club_logos')
+    db.session.commit()
+    folder, filename = key.rsplit('/', 1)
+    variant = f"{folder}/variants/{filename.split('.')[0]}_80.webp"
+    s3_storage.put(variant, io.BytesIO(b'varyant'))
+
+    assert s3_storage.exists(key)
+    assert s3_storage.open(key).read() == b'logo'
+    assert s3_storage.list(f"{folder}/variants/") == [variant]
+    assert s3_storage.url(key) == f'https://cdn.example.com/{key}'
+
+    removable = delete_upload(key)
+    assert s3_storage.exists(key)  # Commit'ten önce silinmez
+    db.session.commit()
+    remove_uploads(removable)
+
+    assert not s3_storage.exists(key)
+    assert s3_storage.list(folder) == []
+
+
+def test_admin_club_delete_removes_files_after_commit(client, make_club, make_admin, login):
+    club = make_club('Müzik Kulübü')
+    logo = save_upload(upload(b'logo'), 'club_logos')
+    image = save_upload(upload(b'afis'), 'post_images')
+    club.logo = logo
+    post = Post(account_id=club.account_id, title='Konser', content='İçerik', is_public=True)
+    post.add_images([image])
+    db.session.add(post)
+    db.session.commit()
+    login(make_admin())
+
+    response = client.post(f'/admin/club/{club.account_id}/delete')
+
+    assert response.status_code == 302
+    assert StoredFile.query.count() == 0
+    assert not get_storage().exists(logo)
+    assert not get_storage().exists(image)
+
+
+def test_bulk_delete_releases_references_in_its_transaction(client, make_club, make_admin, login, monkeypatch):
+    from app.utils.images import image_pipeline
+
+    deleted, kept = make_club('Müzik Kulübü'), make_club('Tiyatro Kulübü')
+    logo = save_upload(upload(b'logo'), 'club_logos')
+    deleted.logo = logo
+    for club in (deleted, kept):
+        shared = save_upload(upload(b'afis'), 'post_images')  # İki kulüp aynı afişi yükledi
+        post = Post(account_id=club.account_id, title='Afiş', content='İçerik', is_public=True)
+        post.add_images([shared])
+        db.session.add(post)
+    db.session.commit()
+    login(make_admin())
+    removals = []
+    # Kuyruğa alınan silme işi hiç çalışmasa bile sayaçlar commit'le birlikte doğru olmalı
+    monkeypatch.setattr(image_pipeline, 'submit', lambda func, keys: removals.append(keys) or True)
+
+    response = client.post('/admin/clubs/bulk/delete', data={'ids': [deleted.account_id]})
+
+    assert response.status_code == 302
+    db.session.expire_all()
+    assert db.session.get(StoredFile, logo) is None
+    assert db.session.get(StoredFile, shared).refs == 1
+    assert removals == [[logo]]
+    assert get_storage().exists(logo)  # Sadece sahipsiz dosya kalır
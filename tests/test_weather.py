@@ -0,0 +1,166 @@
+"""Hava durumu servisi, yerel bir taklit HTTP sunucusuna karşı"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from flask import Flask
+from app.utils.weather import WeatherService
+
+
+def weather_body(city, temp):
+    return {'name': city, 'main': {'temp': temp, 'humidity': 60},
+            'weather': [{'description': 'parçalı bulutlu', 'icon': '02d'}], 'wind': {'speed': 2}}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        city = parse_qs(urlparse(self.path).query)['q'][0].split(',')[0]
+        self.server.requests.append(city)
+        status, body, delay = self.server.routes.get(city, (404, {'cod': '404'}, 0))
+        time.sleep(delay)
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # İstemci zaman aşımıyla bağlantıyı kapattı
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.routes = {}
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def weather(stub, monkeypatch):
+    monkeypatch.delenv('WEATHER_API_KEY', raising=False)
+    app = Flask('weather-test')
+    app.config.update(
+        WEATHER_API_URL=f'http://127.0.0.1:{stub.server_address[1]}/weather',
+        WEATHER_CITY='Trabzon',
+        WEATHER_CITIES=['İstanbul', 'Rize'],
+        WEATHER_TIMEOUT=0.2,
+        WEATHER_CACHE_TTL=60,
+        WEATHER_NEGATIVE_TTL=60,
+        WEATHER_FAILURE_THRESHOLD=2,
+        WEATHER_COOLDOWN=0.3,
+    )
+    service = WeatherService()
+    service.init_app(app)  # Anahtar yokken ısıtma isteği atılmaz
+    app.config['WEATHER_API_KEY'] = 'test'
+    return service
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'koşul zamanında sağlanmadı'
+        time.sleep(0.01)
+
+
+def test_city_is_normalized_and_cached(weather, stub):
+    stub.routes['Trabzon'] = (200, weather_body('Trabzon', 14.6), 0)
+
+    assert weather.get(' trabzon ')['temperature'] == 15
+    assert weather.get('TRABZON')['city'] == 'Trabzon'
+    assert stub.requests == ['Trabzon']
+
+
+def test_unlisted_city_never_reaches_the_api(weather, stub):
+    data = weather.get('Atlantis')
+
+    assert data['error']
+    assert stub.requests == []
+
+
+def test_client_errors_are_cached_and_do_not_open_the_breaker(weather, stub):
+    for _ in range(3):
+        assert weather.get('Rize')['error']
+
+    assert stub.requests == ['Rize']  # 404 kısa süre önbellekte
+    assert weather.breaker.failures == 0
+    assert weather.breaker.allow()
+
+
+def test_timeout_fails_fast_and_counts_as_failure(weather, stub):
+    stub.routes['Trabzon'] = (200, weather_body('Trabzon', 10), 1)
+
+    started = time.monotonic()
+    data = weather.get('Trabzon')
+
+    assert data['error']
+    assert time.monotonic() - started < 0.8
+    assert weather.breaker.failures == 1
+
+
+def test_breaker_opens_then_half_opens(weather, stub):
+    stub.routes['Trabzon'] = (503, {}, 0)
+    weather.get('Trabzon')
+    weather.get('Trabzon')
+    assert len(stub.requests) == 2
+
+    # Açık devre: API'ye gidilmeden hata döner
+    assert weather.get('Trabzon')['error']
+    assert len(stub.requests) == 2
+
+    # Bekleme süresinden sonra tek deneme isteği (yarı açık); başarılıysa devre kapanır
+    time.sleep(0.35)
+    stub.routes['Trabzon'] = (200, weather_body('Trabzon', 9), 0)
+    assert weather.get('Trabzon')['temperature'] == 9
+    assert len(stub.requests) == 3
+    assert weather.breaker.opened_at is None
+
+
+def test_failed_half_open_probe_reopens_the_breaker(weather, stub):
+    stub.routes['Trabzon'] = (500, {}, 0)
+    weather.get('Trabzon')
+    weather.get('Trabzon')
+
+    time.sleep(0.35)
+    weather.get('Trabzon')  # Deneme isteği de başarısız
+    assert len(stub.requests) == 3
+    assert not weather.breaker.allow()
+
+
+def test_stale_entry_is_served_while_revalidating(weather, stub):
+    stub.routes['Trabzon'] = (200, weather_body('Trabzon', 10), 0)
+    weather._app.config['WEATHER_CACHE_TTL'] = 0
+    assert weather.get('Trabzon')['temperature'] == 10
+
+    stub.routes['Trabzon'] = (200, weather_body('Trabzon', 20), 0.2)
+    weather._app.config['WEATHER_TIMEOUT'] = 2
+    started = time.monotonic()
+    assert weather.get('Trabzon')['temperature'] == 10  # Eski veri beklemeden döner
+    assert time.monotonic() - started < 0.15
+
+    wait_for(lambda: weather._entries['Trabzon'][1]['temperature'] == 20)
+    assert len(stub.requests) == 2
+
+
+def test_failed_revalidation_keeps_stale_entry(weather, stub):
+    stub.routes['Trabzon'] = (200, weather_body('Trabzon', 10), 0)
+    weather._app.config['WEATHER_CACHE_TTL'] = 0
+    weather.get('Trabzon')
+
+    stub.routes['Trabzon'] = (500, {}, 0)
+    weather.get('Trabzon')
+    wait_for(lambda: not weather._refreshing and len(stub.requests) == 2)
+
+    assert weather.get('Trabzon')['temperature'] == 10